@@ -0,0 +1,165 @@
+import os
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from openai.types.chat import ChatCompletion
+
+from classifier import _build_messages, _to_classification, classification_response_format
+from email_generator import _build_email_messages, _to_email, email_request_options
+from pipeline import PipelineStats, build_record
+from utils.batch_api import TERMINAL_STATUSES, BatchTransport
+from utils.cache import ClassificationCache
+from utils.preclassify import PreClassifier
+from utils.exclusions import check_exclusion
+from utils.normalize import normalize_company
+from utils.csv_write import EmailCsvWriter, WriterGroup
+from utils.parquet_write import EmailParquetWriter
+from utils.records import SpeakerRecord
+from utils.metrics import get_metrics
+
+DEFAULT_POLL_INTERVAL = 30.0
+
+
+def _write_requests(path: Path, requests: Dict[str, dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        for custom_id, body in requests.items():
+            line = {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body}
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+
+def _run_stage(
+    stage: str,
+    requests: Dict[str, dict],
+    transport: BatchTransport,
+    job_dir: Path,
+    poll_interval: float,
+) -> Dict[str, ChatCompletion]:
+    """Submit one stage's requests as a batch and return responses by custom_id."""
+    if not requests:
+        return {}
+    path = job_dir / f"{stage}_requests.jsonl"
+    _write_requests(path, requests)
+    batch_id = transport.submit(path)
+    print(f"Submitted {stage} batch {batch_id} ({len(requests)} requests)")
+
+    status = transport.status(batch_id)
+    while status not in TERMINAL_STATUSES:
+        time.sleep(poll_interval)
+        status = transport.status(batch_id)
+    print(f"{stage} batch {batch_id} finished: {status}")
+
+    responses: Dict[str, ChatCompletion] = {}
+    for line in transport.results(batch_id):
+        custom_id = line.get("custom_id")
+        response = line.get("response") or {}
+        if response.get("status_code") == 200:
+            responses[custom_id] = ChatCompletion.model_validate(response["body"])
+            get_metrics().record_usage(stage, responses[custom_id].usage)
+        else:
+            error = line.get("error") or response.get("body")
+            print(f"Batch request {custom_id} failed: {error}")
+    return responses
+
+
+def run_batch_job(
+    rows: Iterable[Dict[str, str]],
+    out_path: str,
+    *,
+    transport: BatchTransport,
+    job_dir: Path,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    cache: Optional[ClassificationCache] = None,
+    preclassifier: Optional[PreClassifier] = None,
+    parquet_path: Optional[str] = None,
+) -> PipelineStats:
+    """
+    Run the pipeline through the OpenAI Batch API instead of live calls.
+
+    All classification requests are written to one JSONL job file and
+    submitted together (one per distinct company that neither `preclassifier`
+    nor `cache` can answer),
+    then all email requests for non-excluded rows. Results are merged back
+    by `custom_id` and written to `out_path` in input order. Rows whose
+    requests failed are reported and skipped. With `parquet_path` the rows
+    are also written there as Parquet, including the company summary.
+    """
+    model = os.getenv("MODEL_NAME")
+    rows = [SpeakerRecord.from_row(row) for row in rows]
+    stats = PipelineStats(rows=len(rows))
+    started = time.perf_counter()
+
+    # Stage 1: one classification request per distinct normalized company
+    classifications: Dict[str, dict] = {}
+    classify_requests: Dict[str, dict] = {}
+    companies: Dict[str, tuple[str, str]] = {}
+    requested = set()
+    for row in rows:
+        title, company = row.title, row.company
+        key = normalize_company(company)
+        if key in classifications or key in requested:
+            continue
+        requested.add(key)
+        cached = preclassifier.lookup(company) if preclassifier else None
+        if cached is None and cache:
+            cached = cache.get(company)
+        if cached is not None:
+            classifications[key] = cached
+            continue
+        custom_id = f"classify-{len(classify_requests)}"
+        companies[custom_id] = (key, company)
+        classify_requests[custom_id] = {
+            "model": model,
+            "messages": _build_messages(company, title),
+            "response_format": classification_response_format(),
+        }
+
+    responses = _run_stage("classify", classify_requests, transport, job_dir, poll_interval)
+    for custom_id, (key, company) in companies.items():
+        if custom_id in responses:
+            result = _to_classification(responses[custom_id], company)
+            classifications[key] = result
+            if cache:
+                cache.set(company, result)
+
+    # Stage 2: one email request per classified, non-excluded row
+    parsed_rows: Dict[int, dict] = {}
+    email_requests: Dict[str, dict] = {}
+    for index, row in enumerate(rows):
+        parsed = classifications.get(normalize_company(row.company))
+        if parsed is None:
+            continue
+        parsed_rows[index] = parsed
+        if not check_exclusion(parsed):
+            email_requests[f"email-{index}"] = {
+                "model": model,
+                "messages": _build_email_messages(row.name, row.title, parsed),
+                **email_request_options(),
+            }
+
+    emails = _run_stage("email", email_requests, transport, job_dir, poll_interval)
+
+    writer = EmailCsvWriter(out_path)
+    if parquet_path:
+        writer = WriterGroup(writer, EmailParquetWriter(parquet_path))
+    with writer:
+        for index, row in enumerate(rows):
+            parsed = parsed_rows.get(index)
+            if parsed is None:
+                stats.errors += 1
+                continue
+            custom_id = f"email-{index}"
+            if custom_id not in email_requests:
+                stats.excluded += 1
+                writer.write(build_record(row, parsed))
+            elif custom_id in emails:
+                stats.emails += 1
+                email = _to_email(emails[custom_id].choices[0].message.content)
+                writer.write(build_record(row, parsed, email))
+            else:
+                stats.errors += 1
+
+    stats.elapsed = time.perf_counter() - started
+    return stats
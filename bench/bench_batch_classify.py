@@ -0,0 +1,111 @@
+"""
+Compare per-row and batched company classification.
+
+Classifies the same list of companies once per request and then in batches
+of --batch-size, reporting requests, prompt/completion tokens and wall time
+for each mode. Uses OPENAI_API_KEY, MODEL_NAME and (optionally)
+OPENAI_BASE_URL from the environment, so it can be pointed at a local mock.
+
+    python bench/bench_batch_classify.py --companies 50 --batch-size 10
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv
+from classifier import _build_messages, _build_batch_messages, _to_batch_classifications
+from utils.clients import get_async_client, aclose_clients
+
+SAMPLE_COMPANIES = [
+    "Balfour Beatty", "Skanska", "AECOM", "Heathrow Airport", "University of Leeds",
+    "Trimble", "Mace Group", "Arup", "Transport for London", "Laing O'Rourke",
+    "Kier Group", "Network Rail", "Autodesk", "Costain", "Sir Robert McAlpine",
+]
+
+
+async def _create(messages):
+    return await get_async_client().chat.completions.create(
+        model=os.getenv("MODEL_NAME"),
+        messages=messages,
+        response_format={"type": "json_object"},
+    )
+
+
+async def run_per_row(items: List[Tuple[str, str]], concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(item):
+        async with sem:
+            return await _create(_build_messages(*item))
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(one(item) for item in items))
+    return _report(responses, time.perf_counter() - started, malformed=0)
+
+
+async def run_batched(items: List[Tuple[str, str]], batch_size: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    batches = [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+
+    async def one(batch):
+        async with sem:
+            response = await _create(_build_batch_messages(batch))
+            return response, _to_batch_classifications(response, batch)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(batch) for batch in batches))
+    malformed = sum(r is None for _, parsed in results for r in parsed)
+    return _report([resp for resp, _ in results], time.perf_counter() - started, malformed=malformed)
+
+
+def _report(responses, elapsed: float, *, malformed: int) -> dict:
+    prompt = sum(r.usage.prompt_tokens for r in responses if r.usage)
+    completion = sum(r.usage.completion_tokens for r in responses if r.usage)
+    return {
+        "requests": len(responses),
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "wall_s": round(elapsed, 3),
+        "malformed_items": malformed,
+    }
+
+
+async def amain(args: argparse.Namespace) -> None:
+    items = [
+        (f"{SAMPLE_COMPANIES[i % len(SAMPLE_COMPANIES)]}", "Project Manager")
+        for i in range(args.companies)
+    ]
+    try:
+        per_row = await run_per_row(items, args.concurrency)
+        batched = await run_batched(items, args.batch_size, args.concurrency)
+    finally:
+        await aclose_clients()
+
+    print(f"{'mode':<12}{'requests':>10}{'prompt':>10}{'completion':>12}{'wall s':>9}{'malformed':>11}")
+    for mode, r in (("per-row", per_row), (f"batch={args.batch_size}", batched)):
+        print(
+            f"{mode:<12}{r['requests']:>10}{r['prompt_tokens']:>10}"
+            f"{r['completion_tokens']:>12}{r['wall_s']:>9}{r['malformed_items']:>11}"
+        )
+    if per_row["prompt_tokens"]:
+        saved = 1 - batched["prompt_tokens"] / per_row["prompt_tokens"]
+        print(f"Prompt tokens saved by batching: {saved:.0%}")
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Benchmark per-row vs batched classification.")
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(amain(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Microbenchmark LLM-response JSON decoding on clean, fenced and malformed payloads.
+
+Decodes each payload --repeat times with the regex-based parser used before
+(kept below as `reference_parse`) and with `utils.safeparse.decode_json`,
+once with the stdlib decoder and once with orjson if it is installed.
+Payloads: a clean classification, a clean 50-company batch result, the
+same classification in a ```json fence and wrapped in prose, and a reply
+truncated mid-object. Reports microseconds per decode and exits non-zero
+if the new decoder gives a different result from the reference on a
+payload the reference could decode.
+
+    python bench/bench_json_decode.py --repeat 20000
+"""
+import re
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils.safeparse as safeparse
+from utils.safeparse import decode_json
+
+
+def reference_parse(content):
+    """safe_parse_json as it was before the strict-first decoder."""
+    if isinstance(content, (dict, list)):
+        return content
+    if isinstance(content, str):
+        cleaned = re.sub(r"```(?:json)?", "", content).strip("` \n")
+        match = re.search(r"\{[\s\S]*\}", cleaned)
+        if match:
+            try:
+                return json.loads(match.group())
+            except json.JSONDecodeError:
+                pass
+        return {"summary": content, "category": "Other", "exclusion": "none"}
+    return {"summary": str(content), "category": "Other", "exclusion": "none"}
+
+
+def payloads() -> List[Tuple[str, str]]:
+    single = json.dumps(
+        {
+            "company": "Balfour Beatty",
+            "summary": "Balfour Beatty is an international infrastructure group that builds {roads}, rail and buildings.",
+            "category": "Builder",
+        }
+    )
+    batch = json.dumps(
+        {
+            "results": [
+                {"index": i, "company": f"Company {i}", "summary": f"Company {i} builds things.", "category": "Builder"}
+                for i in range(1, 51)
+            ]
+        }
+    )
+    return [
+        ("clean", single),
+        ("clean batch (50)", batch),
+        ("fenced", f"```json\n{single}\n```"),
+        ("prose-wrapped", f"Sure! Here is the classification:\n{single}\nLet me know if you need anything else."),
+        ("truncated", single[: len(single) // 2]),
+    ]
+
+
+def _time(fn: Callable[[str], object], payload: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(payload)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark LLM-response JSON decoding.")
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    orjson_module = safeparse.orjson
+    decoders: Dict[str, Callable[[str], object]] = {"regex (before)": reference_parse}
+
+    def stdlib_decode(payload: str):
+        safeparse.orjson = None
+        try:
+            return decode_json(payload)
+        finally:
+            safeparse.orjson = orjson_module
+
+    decoders["decode_json (json)"] = stdlib_decode
+    if orjson_module is not None:
+        decoders["decode_json (orjson)"] = decode_json
+    else:
+        print("orjson not installed; pip install orjson to include it")
+
+    mismatches = 0
+    width = max(len(name) for name, _ in payloads())
+    print(f"{'payload'.ljust(width)}  " + "  ".join(f"{name:>22}" for name in decoders) + "   (us per decode)")
+    for name, payload in payloads():
+        expected = reference_parse(payload)
+        reference_ok = expected.get("exclusion") != "none"
+        timings = []
+        for decoder_name, decoder in decoders.items():
+            result = decoder(payload)
+            if decoder is not reference_parse and reference_ok and result != expected:
+                print(f"{decoder_name} disagrees with the reference on {name}")
+                mismatches += 1
+            timings.append(_time(decoder, payload, args.repeat))
+        print(f"{name.ljust(width)}  " + "  ".join(f"{t:>22.2f}" for t in timings))
+    if mismatches:
+        sys.exit(f"{mismatches} mismatches")
+
+
+if __name__ == "__main__":
+    main()
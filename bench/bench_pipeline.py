@@ -0,0 +1,216 @@
+"""
+End-to-end load test of main.py against the local fake LLM server.
+
+Starts bench/fake_llm.py on a free port, generates a synthetic speakers CSV
+for each --rows size, and runs main.py on it once per --variant and
+--repeat. Each variant is a name and extra main.py arguments, so
+concurrency, caching, batching or worker settings can be compared on the
+same input and the same simulated API:
+
+    python bench/bench_pipeline.py --rows 1000 10000 \\
+        --variant "default=" --variant "batch10=--classify-batch-size 10" \\
+        --variant "workers4=--workers 4" --latency lognormal:300:0.5 --rate-limit-rate 0.01
+
+Every run gets its own output directory and a cold classification cache.
+Reported per run: wall time, rows per second, p50/p95/p99 classify and
+email latency (from the run's metrics report), LLM requests by kind and
+status as seen by the server, retries, and the peak RSS of main.py (the
+largest of its processes with --workers). The full results go to
+out/bench/pipeline_report.json.
+"""
+import os
+import sys
+import json
+import time
+import shlex
+import socket
+import argparse
+import subprocess
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench.fake_llm import add_server_args
+from bench.gen_speakers import DEFAULT_UNMATCHED_RATE, write_speakers
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _http_json(url: str, method: str = "GET") -> dict:
+    with urllib.request.urlopen(urllib.request.Request(url, method=method), timeout=5) as resp:
+        return json.load(resp)
+
+
+def start_server(args: argparse.Namespace, log_path: Path) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    cmd = [
+        sys.executable, str(ROOT / "bench" / "fake_llm.py"), "--port", str(port),
+        "--latency", args.latency,
+        "--error-rate", str(args.error_rate),
+        "--rate-limit-rate", str(args.rate_limit_rate),
+        "--retry-after", str(args.retry_after),
+        "--malformed-rate", str(args.malformed_rate),
+        "--fenced-rate", str(args.fenced_rate),
+    ]
+    if args.seed is not None:
+        cmd += ["--seed", str(args.seed)]
+    proc = subprocess.Popen(cmd, stdout=open(log_path, "w"), stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 15
+    while True:
+        try:
+            _http_json(f"{url}/stats")
+            return proc, url
+        except OSError:
+            if proc.poll() is not None or time.monotonic() > deadline:
+                proc.kill()
+                sys.exit(f"Fake LLM server did not start; see {log_path}")
+            time.sleep(0.1)
+
+
+def run_main(csv_path: Path, extra: List[str], run_dir: Path, base_url: str) -> Tuple[float, int, float]:
+    """Run main.py once; returns (wall seconds, exit status, peak RSS in MB)."""
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{base_url}/v1",
+        "MODEL_NAME": "bench-model",
+        "CLASSIFY_CACHE_PATH": str(run_dir / "classifications.sqlite"),
+    }
+    cmd = [sys.executable, str(ROOT / "main.py"), "--input", str(csv_path), "--out-dir", str(run_dir), *extra]
+    started = time.perf_counter()
+    with open(run_dir / "main.log", "w") as log:
+        proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 gives this child's own rusage; ru_maxrss is in KiB on Linux
+        _pid, status, rusage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - started
+    return elapsed, os.waitstatus_to_exitcode(status), rusage.ru_maxrss / 1024
+
+
+def summarize(metrics: dict, server: dict, rows: int, elapsed: float, peak_rss_mb: float) -> Dict[str, object]:
+    stages = metrics.get("stages", {})
+    counters = metrics.get("counters", {})
+    result: Dict[str, object] = {
+        "rows": rows,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 2) if elapsed else 0.0,
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "emails": metrics.get("emails"),
+        "errors": metrics.get("errors"),
+        "server_requests": server.get("requests", 0),
+        "server_requests_by_kind": server.get("by_kind", {}),
+        "server_responses_by_status": server.get("by_status", {}),
+        "server_peak_in_flight": server.get("peak_in_flight", 0),
+        "retries": sum(v for k, v in counters.items() if k.startswith("llm_retries_total")),
+    }
+    for stage in ("classify", "email"):
+        for q in ("p50_s", "p95_s", "p99_s"):
+            result[f"{stage}_{q}"] = round(stages.get(stage, {}).get(q, 0.0), 4)
+    return result
+
+
+def _print_table(results: List[Dict[str, object]]) -> None:
+    columns = [
+        ("variant", "variant"), ("rows", "rows"), ("rows/s", "rows_per_second"), ("wall s", "elapsed_s"),
+        ("cls p95", "classify_p95_s"), ("cls p99", "classify_p99_s"), ("email p95", "email_p95_s"),
+        ("email p99", "email_p99_s"), ("requests", "server_requests"), ("retries", "retries"),
+        ("rss MB", "peak_rss_mb"),
+    ]
+    widths = [max(len(title), *(len(str(r.get(key, ""))) for r in results)) for title, key in columns]
+    print("  ".join(title.rjust(w) for (title, _), w in zip(columns, widths)))
+    for r in results:
+        print("  ".join(str(r.get(key, "")).rjust(w) for (_, key), w in zip(columns, widths)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load-test main.py against a local fake LLM server.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000], help="Input sizes, e.g. 1000 10000 100000")
+    parser.add_argument(
+        "--variant",
+        action="append",
+        default=None,
+        metavar="NAME=ARGS",
+        help="Named set of extra main.py arguments; repeat to compare (default: one run with no extra args)",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per variant and size")
+    parser.add_argument("--companies", type=int, default=0, help="Company pool size (default: rows / 10)")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0)
+    parser.add_argument("--personalize-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--unmatched-rate",
+        type=float,
+        default=DEFAULT_UNMATCHED_RATE,
+        help="Share of companies the pre-classifier can't place (default: %(default)s); 0 leaves classification to the rules",
+    )
+    parser.add_argument("--work-dir", default=str(ROOT / "out" / "bench"))
+    parser.add_argument("--report", default=None, help="JSON results path (default: <work dir>/pipeline_report.json)")
+    add_server_args(parser)
+    args = parser.parse_args()
+
+    variants = []
+    for spec in args.variant or ["default="]:
+        name, _, extra = spec.partition("=")
+        variants.append((name or "default", shlex.split(extra)))
+
+    work_dir = Path(args.work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    server, base_url = start_server(args, work_dir / "fake_llm.log")
+    results: List[Dict[str, object]] = []
+    try:
+        for rows in args.rows:
+            csv_path = work_dir / f"speakers_{rows}.csv"
+            write_speakers(
+                str(csv_path),
+                rows,
+                companies=args.companies,
+                duplicate_rate=args.duplicate_rate,
+                personalize_rate=args.personalize_rate,
+                unmatched_rate=args.unmatched_rate,
+                seed=args.seed if args.seed is not None else 7,
+            )
+            for name, extra in variants:
+                for attempt in range(args.repeat):
+                    run_dir = work_dir / "runs" / f"{name}-{rows}-{attempt}"
+                    run_dir.mkdir(parents=True, exist_ok=True)
+                    for stale in run_dir.glob("classifications.sqlite*"):
+                        stale.unlink()
+                    _http_json(f"{base_url}/stats/reset", method="POST")
+                    elapsed, status, peak_rss_mb = run_main(csv_path, extra, run_dir, base_url)
+                    server_stats = _http_json(f"{base_url}/stats")
+                    if status != 0:
+                        print(f"{name} on {rows} rows exited with status {status}; see {run_dir / 'main.log'}")
+                        continue
+                    with open(run_dir / "metrics.json", "r", encoding="utf-8") as f:
+                        metrics = json.load(f)
+                    result = {"variant": name, "args": extra, "run": attempt}
+                    result.update(summarize(metrics, server_stats, rows, elapsed, peak_rss_mb))
+                    results.append(result)
+                    print(
+                        f"{name} on {rows} rows: {result['rows_per_second']} rows/s, "
+                        f"{result['server_requests']} requests, peak RSS {result['peak_rss_mb']} MB"
+                    )
+    finally:
+        server.terminate()
+        server.wait()
+
+    if results:
+        print()
+        _print_table(results)
+    report_path = args.report or str(work_dir / "pipeline_report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({"config": vars(args), "results": results}, f, indent=2)
+    print(f"\nWrote results to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark row memory and output write time for large runs.
+
+Memory: holds --rows synthetic speakers the way the pipeline used to (the
+CSV `DictReader` row, the email dict and the output record dict per row)
+and as one `SpeakerRecord` per row, and reports the memory each takes
+(tracemalloc, so Python allocations only).
+
+Writes: writes the same records with `EmailCsvWriter` and, if pyarrow is
+installed, `EmailParquetWriter`, and reports write time, file size and the
+time to load each file back (`csv.DictReader` vs `pyarrow.parquet.read_table`).
+
+    python bench/bench_records.py --rows 100000
+"""
+import os
+import csv
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench.gen_speakers import HEADERS, generate_rows
+from utils.csv_write import EmailCsvWriter
+from utils.records import SpeakerRecord
+
+CLASSIFICATIONS = {
+    "Builder": "Builds and manages construction projects across the region.",
+    "Owner": "Commissions and operates large capital projects.",
+    "Partner": "Provides drone and data services to the construction industry.",
+}
+
+
+def _input_rows(count: int) -> List[Dict[str, str]]:
+    """Rows as `csv.DictReader` returns them, read back from a generated CSV."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "speakers.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=HEADERS)
+            writer.writeheader()
+            writer.writerows(generate_rows(count))
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+
+
+def _email(row: Dict[str, str]) -> Dict[str, str]:
+    name = row["Speaker Name"]
+    return {
+        "subject": f"{name}, see your jobsite from above",
+        "body": f"Hi {name}, DroneDeploy helps {row['Speaker Company']} capture every site. Stop by booth #42.",
+    }
+
+
+def hold_dicts(rows: List[Dict[str, str]]) -> list:
+    held = []
+    for i, row in enumerate(rows):
+        category = list(CLASSIFICATIONS)[i % 3]
+        email = _email(row)
+        record = {
+            "Speaker Name": row["Speaker Name"].strip(),
+            "Speaker Title": row["Speaker Title"].strip(),
+            "Speaker Company": row["Speaker Company"].strip(),
+            "Company Category": category,
+            "Email Subject": email["subject"],
+            "Email Body": email["body"],
+        }
+        held.append((row, email, record))
+    return held
+
+
+def hold_records(rows: List[Dict[str, str]]) -> list:
+    held = []
+    for i, row in enumerate(rows):
+        category = list(CLASSIFICATIONS)[i % 3]
+        email = _email(row)
+        record = SpeakerRecord.from_row(row)
+        record.category, record.summary = category, CLASSIFICATIONS[category]
+        record.subject, record.body = email["subject"], email["body"]
+        held.append(record)
+    return held
+
+
+def _measure(build: Callable[[List[Dict[str, str]]], list], count: int) -> float:
+    """MB allocated to hold `count` rows, from reading the input to the finished output."""
+    tracemalloc.start()
+    rows = _input_rows(count)
+    held = build(rows)
+    if build is hold_records:
+        # Records carry everything the output needs, so the input rows can go
+        del rows
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return current / 1024**2
+
+
+def _time_write(make_writer: Callable[[str], object], path: str, records: list) -> float:
+    started = time.perf_counter()
+    with make_writer(path) as writer:
+        writer.write_many(records)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark row memory and output write time.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    dicts_mb = _measure(hold_dicts, args.rows)
+    records_mb = _measure(hold_records, args.rows)
+    print(f"{args.rows} rows held in memory:")
+    print(f"  per-stage dicts: {dicts_mb:8.1f} MB")
+    print(f"  SpeakerRecord:   {records_mb:8.1f} MB ({records_mb / dicts_mb:.0%} of dicts)")
+
+    records = hold_records(_input_rows(args.rows))
+    writers = {"csv": (EmailCsvWriter, "email_output.csv")}
+    try:
+        from utils.parquet_write import EmailParquetWriter, require_pyarrow
+
+        _pa, pq = require_pyarrow()
+
+        writers["parquet"] = (EmailParquetWriter, "email_output.parquet")
+    except ImportError:
+        print("pyarrow not installed; pip install pyarrow to include Parquet")
+
+    print("\nwriter     write s   read s    size MB")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (writer_cls, filename) in writers.items():
+            path = os.path.join(tmp, filename)
+            write_s = _time_write(writer_cls, path, records)
+            started = time.perf_counter()
+            if name == "csv":
+                with open(path, "r", newline="", encoding="utf-8") as f:
+                    count = sum(1 for _ in csv.DictReader(f))
+            else:
+                count = pq.read_table(path).num_rows
+            read_s = time.perf_counter() - started
+            assert count == len(records), f"{name}: read back {count} rows"
+            size_mb = os.path.getsize(path) / 1024**2
+            print(f"{name:<9} {write_s:8.2f} {read_s:8.2f} {size_mb:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
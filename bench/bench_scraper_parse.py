@@ -0,0 +1,222 @@
+"""
+Benchmark the speaker-page parser on large synthetic fixture pages.
+
+Builds two pages with --speakers cards each: one in the current DCW grid
+layout and one that only the fallback selectors understand (cards as
+<li>, <article> and .speaker/.presenter blocks, mixed with navigation
+lists, scripts and duplicate entries). Each page is parsed by the
+selector-by-selector BeautifulSoup parser the scraper used before (kept
+below as `reference_parse`) and by the single-pass parser on every
+installed backend. Reports the time for each and exits non-zero if any
+backend's output differs from the reference.
+
+    python bench/bench_scraper_parse.py --speakers 5000
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+
+from utils.html_backends import available_backends, get_backend
+from utils.scraper import _parse_speakers_dc_week
+
+FIRST = ["Ada", "Grace", "Alan", "Linus", "Barbara", "Ken", "Margaret", "Dennis", "Radia", "Edsger"]
+LAST = ["Lovelace", "Hopper", "Turing", "Torvalds", "Liskov", "Thompson", "Hamilton", "Ritchie"]
+ROLES = ["Head of Digital", "BIM Manager", "CTO", "Director, Innovation", "Chief Data Officer"]
+COMPANIES = ["Balfour Beatty", "Mace", "AECOM", "Laing O'Rourke", "Skanska", "Arup", "Kier Group"]
+
+
+def _chrome(rng: random.Random) -> str:
+    """Navigation, scripts and footer noise that surrounds real listings."""
+    nav = "".join(f'<li class="menu-item"><a href="/p{i}">Menu {i}</a></li>' for i in range(40))
+    return (
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f"<script>var speakers = {rng.randint(0, 999)}; // <h3>not a name</h3></script>"
+        "<style>.speaker{color:red}</style>"
+    )
+
+
+def grid_page(count: int, seed: int = 3) -> str:
+    rng = random.Random(seed)
+    cards = []
+    for i in range(count):
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)} {i % (count // 2 or 1)}"
+        job = f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)}" if rng.random() < 0.9 else rng.choice(ROLES)
+        heading = f"<h3>{name}</h3>" if rng.random() < 0.95 else ""
+        cards.append(
+            f'<div class="speaker-grid-item col"><a href="/speaker/{i}/">'
+            f'<img src="/img/{i}.jpg" alt=" {name} "></a>'
+            f'<div class="speaker-grid-details">{heading}'
+            f'<p class="speaker-job">  {job}\n</p></div></div>'
+        )
+    pager = "".join(f'<a class="page-numbers" href="?page={n}">{n}</a>' for n in range(1, 6))
+    return (
+        f"<html><body>{_chrome(rng)}<main><div class='speaker-grid'>{''.join(cards)}</div>"
+        f"<nav class='pagination'>{pager}<a class='next' href='?page=2'>Next</a></nav></main></body></html>"
+    )
+
+
+def fallback_page(count: int, seed: int = 5) -> str:
+    rng = random.Random(seed)
+    cards = []
+    for i in range(count):
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)} {i % (count // 3 or 1)}"
+        role, company = rng.choice(ROLES), rng.choice(COMPANIES)
+        style = rng.randrange(5)
+        if style == 0:
+            cards.append(
+                f'<li class="speaker-card"><h3 class="speaker-name">{name}</h3>'
+                f'<span class="speaker-title">{role}</span><span class="speaker-company">{company}</span></li>'
+            )
+        elif style == 1:
+            cards.append(
+                f'<article class="presenter"><a href="/s/{i}"><h2>{name}</h2></a>'
+                f'<p class="title">{role}, {company}</p></article>'
+            )
+        elif style == 2:
+            cards.append(
+                f'<div class="speaker-profile"><span itemprop="name">{name}</span>'
+                f'<span itemprop="jobTitle">{role}</span><span itemprop="worksFor">{company}</span></div>'
+            )
+        elif style == 3:
+            cards.append(
+                f'<div class="speaker"><div class="name"> {name} <em>(keynote)</em></div>'
+                f'<div class="company">{company}</div></div>'
+            )
+        else:
+            cards.append(f'<li><h3>{name}</h3><p class="title">{role}</p></li>')
+    return (
+        f"<html><body>{_chrome(rng)}<section><ul class='speakers'>{''.join(cards)}</ul></section>"
+        "<div class='nav-links'><a href='/speakers/page/2/'>2</a></div></body></html>"
+    )
+
+
+def reference_parse(html: str) -> List[Dict[str, str]]:
+    """The scraper's previous parser, kept verbatim as the expected output."""
+
+    def _extract_text(el) -> str:
+        return " ".join(el.get_text(" ", strip=True).split()) if el else ""
+
+    soup = BeautifulSoup(html, "html.parser")
+    results: List[Dict[str, str]] = []
+
+    grid_items = soup.select('.speaker-grid-item')
+    if grid_items:
+        for card in grid_items:
+            name = _extract_text(card.select_one('.speaker-grid-details h3') or card.select_one('h3'))
+            if not name:
+                alt = card.select_one('img')
+                name = (alt.get('alt', '').strip() if alt else '')
+            job_text = _extract_text(card.select_one('p.speaker-job') or card.select_one('.speaker-job'))
+            title_text = job_text
+            company_text = ""
+            if job_text:
+                lower = job_text.lower()
+                idx = lower.rfind(' at ')
+                if idx != -1:
+                    title_text = job_text[:idx].strip(' ,')
+                    company_text = job_text[idx + 4 :].strip(' ,')
+            link = card.select_one('a[href]')
+            if name:
+                results.append({
+                    'name': name,
+                    'title': title_text,
+                    'company': company_text,
+                    'url': link.get('href', '') if link else '',
+                })
+        uniq = {}
+        for r in results:
+            uniq[(r['name'], r['company'].lower())] = r
+        return list(uniq.values())
+
+    card_selectors = [
+        ".speaker-card",
+        ".presenter-card",
+        ".speaker",
+        ".presenter",
+        "article",
+        "li",
+        "div[class*='speaker']",
+        "div[class*='presenter']",
+    ]
+    seen = set()
+    for sel in card_selectors:
+        for card in soup.select(sel):
+            name = _extract_text(
+                card.select_one(".speaker-name, .presenter-name, h3, h2, .name, [itemprop='name']")
+            )
+            title_text = _extract_text(
+                card.select_one(".speaker-title, .presenter-title, .title, [itemprop='jobTitle']")
+            )
+            company_text = _extract_text(
+                card.select_one(
+                    ".speaker-company, .presenter-company, .company, [itemprop='affiliation'], [itemprop='worksFor']"
+                )
+            )
+            if not company_text and "," in title_text:
+                maybe_title, maybe_company = [x.strip() for x in title_text.split(",", 1)]
+                if len(maybe_company) >= 2:
+                    title_text, company_text = maybe_title, maybe_company
+            key = (name, title_text, company_text)
+            if not name or key in seen:
+                continue
+            seen.add(key)
+            link = card.select_one("a[href]")
+            results.append({
+                "name": name,
+                "title": title_text,
+                "company": company_text,
+                "url": link.get("href", "") if link else "",
+            })
+
+    if results:
+        uniq = {}
+        for r in results:
+            uniq[(r["name"], r.get("company", "").lower())] = r
+        results = list(uniq.values())
+    return results
+
+
+def _timed(fn, html: str, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn(html)
+        best = min(best, time.perf_counter() - started)
+    return out, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the speaker-page parser backends.")
+    parser.add_argument("--speakers", type=int, default=5000, help="Cards per fixture page")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per parser; the best time is reported")
+    args = parser.parse_args()
+
+    backends = available_backends()
+    print(f"Installed backends: {', '.join(backends)}")
+    mismatches = 0
+    for label, html in (("grid", grid_page(args.speakers)), ("fallback", fallback_page(args.speakers))):
+        print(f"\n{label} page: {len(html) / 1024:.0f} KiB, {args.speakers} cards")
+        expected, ref_s = _timed(reference_parse, html, args.repeat)
+        print(f"  reference (bs4, per-selector): {ref_s * 1000:8.1f} ms  {len(expected)} speakers")
+        for name in backends:
+            backend = get_backend(name)
+            got, took = _timed(lambda h: _parse_speakers_dc_week(h, backend), html, args.repeat)
+            same = got == expected
+            mismatches += not same
+            print(
+                f"  single-pass ({name}):{'':<{12 - len(name)}}{took * 1000:8.1f} ms  "
+                f"{ref_s / took:5.1f}x  {'same output' if same else 'OUTPUT DIFFERS'}"
+            )
+    if mismatches:
+        sys.exit(f"{mismatches} backend(s) produced different output from the reference parser")
+
+
+if __name__ == "__main__":
+    main()
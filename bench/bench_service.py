@@ -0,0 +1,199 @@
+"""
+Load test of service.py against the local fake LLM server.
+
+Starts bench/fake_llm.py and service.py on free ports, then measures:
+
+- startup: time from launch until /health answers, and until the LLM
+  client is ready (the openai import happens after the port opens);
+- interactive latency: --requests calls split between /classify and
+  /generate-email, --concurrency at a time, over synthetic speakers;
+- bulk throughput: one --job-rows job submitted to /jobs and polled until
+  it is done.
+
+    python bench/bench_service.py --requests 2000 --concurrency 64 --job-rows 5000 \\
+        --latency lognormal:300:0.5
+
+Latencies are p50/p95/p99 as the client sees them. The results, with the
+service's own /metrics report and the fake server's request counts, go to
+out/bench/service_report.json.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+import urllib.request
+from pathlib import Path
+from typing import Dict, List
+
+import aiohttp
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench.bench_pipeline import _free_port, start_server
+from bench.fake_llm import add_server_args
+from bench.gen_speakers import generate_rows
+from utils.metrics import Metrics
+
+
+def start_service(llm_url: str, work_dir: Path, extra: List[str]) -> tuple:
+    """Launch service.py; returns (process, base URL, seconds to first /health, seconds to ready)."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{llm_url}/v1",
+        "MODEL_NAME": "bench-model",
+        "CLASSIFY_CACHE_PATH": str(work_dir / "service_classifications.sqlite"),
+    }
+    for stale in work_dir.glob("service_classifications.sqlite*"):
+        stale.unlink()
+    cmd = [sys.executable, str(ROOT / "service.py"), "--port", str(port), "--out-dir", str(work_dir / "service"), *extra]
+    started = time.perf_counter()
+    log = open(work_dir / "service.log", "w")
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    listening = None
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            with urllib.request.urlopen(f"{url}/health", timeout=5) as resp:
+                health = json.load(resp)
+            listening = listening or time.perf_counter() - started
+            if health["ready"]:
+                return proc, url, listening, time.perf_counter() - started
+        except OSError:
+            pass
+        if proc.poll() is not None or time.monotonic() > deadline:
+            proc.kill()
+            sys.exit(f"Service did not start; see {work_dir / 'service.log'}")
+        time.sleep(0.01)
+
+
+async def interactive(url: str, speakers: List[Dict[str, str]], concurrency: int) -> Dict[str, object]:
+    latencies = Metrics()
+    statuses: Dict[str, int] = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for i, row in enumerate(speakers):
+        body = {"name": row["Speaker Name"], "title": row["Speaker Title"], "company": row["Speaker Company"]}
+        queue.put_nowait(("/classify" if i % 2 else "/generate-email", body))
+
+    async def client(session: aiohttp.ClientSession) -> None:
+        while not queue.empty():
+            path, body = queue.get_nowait()
+            started = time.perf_counter()
+            async with session.post(f"{url}{path}", json=body) as resp:
+                await resp.read()
+            latencies.observe(path, time.perf_counter() - started)
+            key = f"{path} {resp.status}"
+            statuses[key] = statuses.get(key, 0) + 1
+
+    started = time.perf_counter()
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(speakers),
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_second": round(len(speakers) / elapsed, 2),
+        "statuses": statuses,
+        "latency": {path: latencies.stage_summary(path) for path in sorted(latencies.latencies)},
+    }
+
+
+async def bulk(url: str, speakers: List[Dict[str, str]]) -> Dict[str, object]:
+    async with aiohttp.ClientSession() as session:
+        started = time.perf_counter()
+        async with session.post(f"{url}/jobs", json={"rows": speakers}) as resp:
+            job = await resp.json()
+            if resp.status != 202:
+                return {"error": job}
+        while job["status"] in ("queued", "running"):
+            await asyncio.sleep(0.05)
+            async with session.get(f"{url}/jobs/{job['id']}") as resp:
+                job = await resp.json()
+        elapsed = time.perf_counter() - started
+    return {
+        "rows": len(speakers),
+        "status": job["status"],
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_second": round(len(speakers) / elapsed, 2),
+        "stats": job["stats"],
+        "error": job["error"],
+    }
+
+
+async def _get_json(url: str) -> dict:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as resp:
+            return await resp.json()
+
+
+def _print_latency(result: Dict[str, object]) -> None:
+    print(f"{'endpoint':<16} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for path, summary in result["latency"].items():
+        print(
+            f"{path:<16} {summary['count']:>6} {summary['p50_s'] * 1000:8.1f} "
+            f"{summary['p95_s'] * 1000:8.1f} {summary['p99_s'] * 1000:8.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load-test service.py against a local fake LLM server.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--requests", type=int, default=1000, help="Interactive requests to send")
+    parser.add_argument("--concurrency", type=int, default=32, help="Interactive requests in flight")
+    parser.add_argument("--job-rows", type=int, default=1000, help="Rows in the bulk job (0 to skip)")
+    parser.add_argument("--companies", type=int, default=0, help="Company pool size (default: rows / 10)")
+    parser.add_argument("--service-args", default="", help="Extra service.py arguments, e.g. '--classify-batch-size 10'")
+    parser.add_argument("--work-dir", default=str(ROOT / "out" / "bench"))
+    parser.add_argument("--report", default=None, help="JSON results path (default: <work dir>/service_report.json)")
+    add_server_args(parser)
+    args = parser.parse_args()
+
+    work_dir = Path(args.work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    seed = args.seed if args.seed is not None else 7
+    llm, llm_url = start_server(args, work_dir / "fake_llm.log")
+    service = None
+    try:
+        service, url, listening_s, ready_s = start_service(llm_url, work_dir, args.service_args.split())
+        print(f"Service answered /health after {listening_s:.2f}s, LLM client ready after {ready_s:.2f}s")
+        results: Dict[str, object] = {"startup": {"health_s": round(listening_s, 3), "ready_s": round(ready_s, 3)}}
+
+        speakers = list(generate_rows(args.requests, companies=args.companies, seed=seed))
+        results["interactive"] = asyncio.run(interactive(url, speakers, args.concurrency))
+        print(f"\n{args.requests} interactive requests at concurrency {args.concurrency}: "
+              f"{results['interactive']['requests_per_second']} requests/s")
+        _print_latency(results["interactive"])
+
+        if args.job_rows:
+            # A separate seed so the job's companies aren't all cached by the interactive phase
+            job_speakers = list(generate_rows(args.job_rows, companies=args.companies, seed=seed + 1))
+            results["bulk"] = asyncio.run(bulk(url, job_speakers))
+            print(f"\nBulk job of {args.job_rows} rows: {results['bulk']['status']} in "
+                  f"{results['bulk']['elapsed_s']}s ({results['bulk']['rows_per_second']} rows/s)")
+
+        results["service_metrics"] = asyncio.run(_get_json(f"{url}/metrics?format=json"))
+        results["server"] = asyncio.run(_get_json(f"{llm_url}/stats"))
+    finally:
+        if service is not None:
+            service.terminate()
+            service.wait()
+        llm.terminate()
+        llm.wait()
+
+    report_path = args.report or str(work_dir / "service_report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({"config": vars(args), "results": results}, f, indent=2)
+    print(f"\nWrote results to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
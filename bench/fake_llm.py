@@ -0,0 +1,267 @@
+"""
+Local OpenAI-compatible chat completions server for benchmarks and load tests.
+
+Answers POST /v1/chat/completions (plain and streamed) with canned JSON for
+the pipeline's request types: single and batched classification, email
+templates and emails. Categories are derived from the company name, so the
+same input always produces the same output. Latency, server errors, 429s
+and malformed or code-fenced replies can be injected to exercise retries
+and `safe_parse_json`. GET /stats returns request counts by kind and
+status, the peak number of requests in flight and the number of client
+connections used; POST /stats/reset clears them.
+
+Latency specs are in milliseconds: `fixed:200`, `uniform:50:400` or
+`lognormal:200:0.6` (median, sigma).
+
+    python bench/fake_llm.py --port 8765 --latency lognormal:300:0.5 --rate-limit-rate 0.02
+
+Then point the pipeline at it with OPENAI_BASE_URL=http://127.0.0.1:8765/v1.
+"""
+import re
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from aiohttp import web
+
+COMPETITORS = {"trimble", "autodesk", "pix4d", "propeller aero", "bentley systems"}
+PARTNER_WORDS = ("drone", "aerial", "robotics", "software", "data", "analytics")
+OWNER_WORDS = ("airport", "university", "council", "authority", "hospital", "department", "port of")
+_BATCH_LINE = re.compile(r"^(\d+)\. Company: (.*?); Title:", re.M)
+_SINGLE_COMPANY = re.compile(r"^Company: (.*)$", re.M)
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Sampler (in seconds) for a `kind:ms[:arg]` latency spec."""
+    kind, *args = spec.split(":")
+    try:
+        values = [float(a) for a in args]
+        if kind == "fixed" and len(values) == 1:
+            return lambda rng: values[0] / 1000
+        if kind == "uniform" and len(values) == 2:
+            return lambda rng: rng.uniform(values[0], values[1]) / 1000
+        if kind == "lognormal" and len(values) == 2:
+            median, sigma = values
+            return lambda rng: median * rng.lognormvariate(0, sigma) / 1000
+    except ValueError:
+        pass
+    raise ValueError(f"Bad latency spec {spec!r}; use fixed:MS, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA")
+
+
+def classify_name(company: str) -> Dict[str, str]:
+    lowered = company.lower()
+    if any(name in lowered for name in COMPETITORS):
+        category = "Competitor"
+    elif any(word in lowered for word in PARTNER_WORDS):
+        category = "Partner"
+    elif any(word in lowered for word in OWNER_WORDS):
+        category = "Owner"
+    else:
+        category = "Builder"
+    summary = f"{company} is a {category.lower()} in the construction industry with projects across the region."
+    return {"company": company, "summary": summary, "category": category}
+
+
+@dataclass
+class FakeLLMConfig:
+    latency: Callable[[random.Random], float] = field(default_factory=lambda: parse_latency("fixed:50"))
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 0.5
+    malformed_rate: float = 0.0
+    fenced_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+class FakeLLM:
+    def __init__(self, config: FakeLLMConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        # Client (host, port) pairs seen; one per TCP connection the clients opened
+        self.peers: set = set()
+        self.started = time.time()
+
+    def stats(self) -> dict:
+        return {
+            "requests": sum(self.requests.values()),
+            "by_kind": dict(self.requests),
+            "by_status": {str(status): count for status, count in self.statuses.items()},
+            "peak_in_flight": self.peak_in_flight,
+            "connections": len(self.peers),
+            "uptime_s": time.time() - self.started,
+        }
+
+    @staticmethod
+    def request_kind(messages: List[dict]) -> str:
+        system = messages[0]["content"] if messages else ""
+        user = messages[-1]["content"] if messages else ""
+        if "reusable email template" in user:
+            return "email_template"
+        if user.startswith("Companies:"):
+            return "classify_batch"
+        if "classifying a company" in system:
+            return "classify"
+        return "email"
+
+    def content_for(self, kind: str, messages: List[dict]) -> str:
+        user = messages[-1]["content"]
+        if kind == "classify":
+            match = _SINGLE_COMPANY.search(user)
+            data = classify_name(match.group(1).strip() if match else "Unknown")
+        elif kind == "classify_batch":
+            data = {
+                "results": [
+                    {"index": int(index), **classify_name(company.strip())}
+                    for index, company in _BATCH_LINE.findall(user)
+                ]
+            }
+        elif kind == "email_template":
+            data = {
+                "subject": "{first_name}, see what DroneDeploy does for {company}",
+                "body": "Hi {first_name}, {company_summary} Stop by booth #42 for a demo and a free gift.",
+            }
+        else:
+            speaker = user.split("\n", 1)[0].removeprefix("Speaker: ").split(" (")[0]
+            data = {
+                "subject": f"{speaker}, see your jobsite from above",
+                "body": f"Hi {speaker}, DroneDeploy turns drone flights into maps your team can act on. Stop by booth #42 for a demo and a free gift.",
+            }
+        content = json.dumps(data)
+        roll = self.rng.random()
+        if roll < self.config.malformed_rate:
+            # Cut off mid-object, like a reply that hit max_tokens
+            return content[: max(len(content) // 2, 1)]
+        if roll < self.config.malformed_rate + self.config.fenced_rate:
+            return f"Here you go:\n```json\n{content}\n```"
+        return content
+
+    @staticmethod
+    def usage(messages: List[dict], content: str) -> dict:
+        prompt = sum(len(m.get("content") or "") for m in messages) // 4
+        system = len(messages[0].get("content") or "") // 4 if messages else 0
+        # Providers cache whole 128-token blocks of a prefix of at least 1024 tokens
+        cached = system // 128 * 128 if system >= 1024 else 0
+        return {
+            "prompt_tokens": prompt,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": prompt + len(content) // 4,
+            "prompt_tokens_details": {"cached_tokens": cached},
+        }
+
+    async def chat(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        messages = body.get("messages") or []
+        kind = self.request_kind(messages)
+        self.requests[kind] += 1
+        if request.transport is not None:
+            self.peers.add(request.transport.get_extra_info("peername"))
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.config.latency(self.rng))
+            roll = self.rng.random()
+            if roll < self.config.rate_limit_rate:
+                self.statuses[429] += 1
+                return web.json_response(
+                    {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                    status=429,
+                    headers={"retry-after": str(self.config.retry_after)},
+                )
+            if roll < self.config.rate_limit_rate + self.config.error_rate:
+                self.statuses[500] += 1
+                return web.json_response({"error": {"message": "Injected failure", "type": "server_error"}}, status=500)
+            self.statuses[200] += 1
+            content = self.content_for(kind, messages)
+            usage = self.usage(messages, content)
+            if body.get("stream"):
+                return await self.stream(request, body, content, usage)
+            return web.json_response(
+                {
+                    "id": "chatcmpl-bench",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model") or "bench",
+                    "choices": [
+                        {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}
+                    ],
+                    "usage": usage,
+                }
+            )
+        finally:
+            self.in_flight -= 1
+
+    async def stream(self, request: web.Request, body: dict, content: str, usage: dict) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        base = {"id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": int(time.time()), "model": body.get("model") or "bench"}
+        for i in range(0, len(content), 16):
+            chunk = {**base, "choices": [{"index": 0, "delta": {"content": content[i : i + 16]}, "finish_reason": None}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        if (body.get("stream_options") or {}).get("include_usage"):
+            await response.write(f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    def app(self) -> web.Application:
+        async def stats(_request):
+            return web.json_response(self.stats())
+
+        async def reset(_request):
+            self.reset()
+            return web.json_response(self.stats())
+
+        app = web.Application(client_max_size=16 * 1024**2)
+        app.router.add_post("/v1/chat/completions", self.chat)
+        app.router.add_get("/stats", stats)
+        app.router.add_post("/stats/reset", reset)
+        return app
+
+
+def add_server_args(parser: argparse.ArgumentParser) -> None:
+    """Fault and latency options, shared with the harness that starts this server."""
+    parser.add_argument("--latency", default="fixed:50", help="Response latency spec in ms (default: fixed:50)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of replies with truncated JSON")
+    parser.add_argument("--fenced-rate", type=float, default=0.0, help="Fraction of replies wrapped in a ```json fence")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency and fault injection")
+
+
+def config_from_args(args: argparse.Namespace) -> FakeLLMConfig:
+    return FakeLLMConfig(
+        latency=parse_latency(args.latency),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        malformed_rate=args.malformed_rate,
+        fenced_rate=args.fenced_rate,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_server_args(parser)
+    args = parser.parse_args()
+    server = FakeLLM(config_from_args(args))
+    web.run_app(server.app(), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Generate a synthetic speakers CSV for load tests.
+
+Writes --rows rows in the pipeline's input format (Speaker Name, Speaker
+Title, Speaker Company, Personalize). Companies are drawn from a pool of
+about one per ten speakers, skewed so a few large companies send many
+speakers, with a share of known competitors and partners that the
+exclusion check drops. About half the generated names (--unmatched-rate)
+match no rule in data/company_rules.json, so a run sends classification
+requests as well as pre-classifying the rest locally. --duplicate-rate
+repeats earlier rows to exercise deduplication. The same --seed always
+produces the same file.
+
+    python bench/gen_speakers.py --rows 10000 --out out/bench/speakers_10k.csv
+"""
+import os
+import sys
+import csv
+import random
+import argparse
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.scraper import SPEAKER_CSV_HEADERS
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Priya", "Chen", "Maria", "Tom", "Aisha", "Lukas", "Grace", "Omar", "Ines"]
+LAST_NAMES = ["Smith", "Patel", "Garcia", "Okafor", "Nguyen", "Muller", "Brown", "Rossi", "Kowalski", "Haddad"]
+TITLES = [
+    "Project Manager", "Head of Digital Construction", "Site Engineer", "VP Operations",
+    "Director of Estates", "Survey Lead", "BIM Manager", "Chief Innovation Officer",
+]
+KNOWN = ["Trimble", "Autodesk", "Pix4D", "Propeller Aero", "Bentley Systems", "DJI", "Procore"]
+WORDS = ["Apex", "Summit", "Northern", "Harbor", "Granite", "Vertex", "Oak", "Meridian", "Atlas", "Crown"]
+PLACES = ["Leeds", "Denver", "Bristol", "Austin", "Glasgow", "Toronto", "Perth", "Dublin"]
+# Names data/company_rules.json classifies locally
+PATTERNS = [
+    "{word} Construction", "{word} {word2} Contractors", "{word} Civil Engineering", "{word} Builders Ltd",
+    "{place} International Airport", "University of {place}", "{place} City Council", "Port of {place}",
+]
+# Names no rule matches, which only the LLM classifier can place
+UNMATCHED_PATTERNS = [
+    "{word} Drone Services", "{word} Aerial Data", "{word} Engineering", "{word} {word2} Group",
+    "{word} Infrastructure", "{place} {word} Partners", "{word} Technologies", "{word} Holdings",
+]
+HEADERS = SPEAKER_CSV_HEADERS + ["Personalize"]
+DEFAULT_UNMATCHED_RATE = 0.5
+
+
+def company_pool(size: int, rng: random.Random, *, unmatched_rate: float = DEFAULT_UNMATCHED_RATE) -> List[str]:
+    pool = list(KNOWN)
+    seen = set(pool)
+    while len(pool) < size:
+        patterns = UNMATCHED_PATTERNS if rng.random() < unmatched_rate else PATTERNS
+        name = rng.choice(patterns).format(
+            word=rng.choice(WORDS), word2=rng.choice(WORDS), place=rng.choice(PLACES)
+        )
+        if name in seen:
+            name = f"{name} {len(pool)}"
+        seen.add(name)
+        pool.append(name)
+    # Known names shouldn't always be the most frequent companies
+    rng.shuffle(pool)
+    return pool
+
+
+def generate_rows(
+    rows: int,
+    *,
+    companies: int = 0,
+    duplicate_rate: float = 0.0,
+    personalize_rate: float = 0.0,
+    unmatched_rate: float = DEFAULT_UNMATCHED_RATE,
+    seed: int = 7,
+) -> Iterator[Dict[str, str]]:
+    rng = random.Random(seed)
+    pool = company_pool(companies or max(rows // 10, len(KNOWN) + 1), rng, unmatched_rate=unmatched_rate)
+    # Zipf-like weights: the first companies send the most speakers
+    cum_weights = list(accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(pool))))
+    previous: List[Dict[str, str]] = []
+    for index in range(rows):
+        if previous and rng.random() < duplicate_rate:
+            yield rng.choice(previous)
+            continue
+        row = {
+            "Speaker Name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index}",
+            "Speaker Title": rng.choice(TITLES),
+            "Speaker Company": rng.choices(pool, cum_weights=cum_weights)[0],
+            "Personalize": "yes" if rng.random() < personalize_rate else "",
+        }
+        if duplicate_rate:
+            previous.append(row)
+        yield row
+
+
+def write_speakers(path: str, rows: int, **options) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=HEADERS)
+        writer.writeheader()
+        writer.writerows(generate_rows(rows, **options))
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic speakers CSV.")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--out", default=None, help="Output path (default: out/bench/speakers_<rows>.csv)")
+    parser.add_argument("--companies", type=int, default=0, help="Company pool size (default: rows / 10)")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0)
+    parser.add_argument("--personalize-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--unmatched-rate",
+        type=float,
+        default=DEFAULT_UNMATCHED_RATE,
+        help="Share of generated companies that no pre-classifier rule matches",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    out = args.out or str(Path(__file__).resolve().parent.parent / "out" / "bench" / f"speakers_{args.rows}.csv")
+    write_speakers(
+        out,
+        args.rows,
+        companies=args.companies,
+        duplicate_rate=args.duplicate_rate,
+        personalize_rate=args.personalize_rate,
+        unmatched_rate=args.unmatched_rate,
+        seed=args.seed,
+    )
+    print(f"Wrote {args.rows} rows to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,68 @@
 import os
-import json
-from typing import Literal, TypedDict, Dict
-from openai import OpenAI, AsyncOpenAI
-from prompts import CLASSIFIER_PROMPT
-from utils.safeparse import safe_parse_json
+import asyncio
+from typing import Literal, TypedDict, Dict, List, Optional, Sequence, Tuple
+from prompts import CLASSIFIER_PROMPT, CLASSIFIER_BATCH_PROMPT
+from utils.clients import get_client, get_async_client
+from utils.safeparse import decode_json, response_format, safe_parse_json
+from utils.ratelimit import COMPLETION_TOKEN_ALLOWANCE, estimate_tokens, get_rate_limiter
+from utils.metrics import get_metrics
+from utils.normalize import normalize_company
+
+ALLOWED_CATEGORIES = {"Builder", "Owner", "Partner", "Competitor", "Other"}
+
+# JSON schemas for structured outputs (LLM_STRUCTURED_OUTPUTS=1)
+_CLASSIFICATION_PROPERTIES = {
+    "company": {"type": "string"},
+    "summary": {"type": "string"},
+    "category": {"type": "string", "enum": sorted(ALLOWED_CATEGORIES)},
+}
+CLASSIFICATION_SCHEMA = {
+    "type": "object",
+    "properties": _CLASSIFICATION_PROPERTIES,
+    "required": list(_CLASSIFICATION_PROPERTIES),
+    "additionalProperties": False,
+}
+BATCH_CLASSIFICATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"index": {"type": "integer"}, **_CLASSIFICATION_PROPERTIES},
+                "required": ["index", *_CLASSIFICATION_PROPERTIES],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["results"],
+    "additionalProperties": False,
+}
+_JSON_OBJECT = {"type": "json_object"}
+
+
+def classification_response_format() -> dict:
+    return response_format("company_classification", CLASSIFICATION_SCHEMA, default=_JSON_OBJECT)
+
 
 class CompanyClassification(TypedDict):
     company: str
     summary: str
     category: str
 
-def classify_company(company: str, title: str | None = None) -> CompanyClassification:
-    """
-    summarize and classify a company into Builder, Owner, Partner, or Competitor
-    """
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+def _build_messages(company: str, title: str | None) -> List[Dict[str, str]]:
     system_prompt =f"{CLASSIFIER_PROMPT}"
     user_prompt = f"\nCompany: {company}\nTitle: {title or ''}\n\nRespond only in valid JSON."
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
 
-    response = client.chat.completions.create(
-        model=os.getenv("MODEL_NAME"),
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        # Ask the model to return strict JSON
-        response_format={"type": "json_object"},
-    )
-    content = response.choices[0].message.content.strip()
 
+def _to_classification(response, company: str) -> CompanyClassification:
     # Parse and sanitize any code fences or malformed JSON
-    data = safe_parse_json(content)
+    data = safe_parse_json(response.choices[0].message.content or "")
 
     # Normalize output keys and values
     result: CompanyClassification = {
@@ -40,8 +72,142 @@ def classify_company(company: str, title: str | None = None) -> CompanyClassific
     }
 
     # Constrain category to allowed set
-    allowed = {"Builder", "Owner", "Partner", "Competitor", "Other"}
-    if result["category"] not in allowed:
+    if result["category"] not in ALLOWED_CATEGORIES:
         result["category"] = "Other"
 
     return result
+
+
+def classify_company(company: str, title: str | None = None) -> CompanyClassification:
+    """
+    summarize and classify a company into Builder, Owner, Partner, or Competitor
+    """
+    metrics = get_metrics()
+    with metrics.time("classify"):
+        response = get_client().chat.completions.create(
+            model=os.getenv("MODEL_NAME"),
+            messages=_build_messages(company, title),
+            # Ask the model to return strict JSON
+            response_format=classification_response_format(),
+        )
+    metrics.record_usage("classify", response.usage)
+    return _to_classification(response, company)
+
+
+async def aclassify_company(company: str, title: str | None = None) -> CompanyClassification:
+    """
+    Async variant of `classify_company` for use inside the pipeline event loop.
+    """
+    metrics = get_metrics()
+    messages = _build_messages(company, title)
+    with metrics.time("classify"):
+        response = await get_rate_limiter().call(
+            lambda: get_async_client().chat.completions.create(
+                model=os.getenv("MODEL_NAME"),
+                messages=messages,
+                response_format=classification_response_format(),
+            ),
+            tokens=estimate_tokens(messages),
+            stage="classify",
+        )
+    metrics.record_usage("classify", response.usage)
+    return _to_classification(response, company)
+
+
+def _build_batch_messages(items: Sequence[Tuple[str, str | None]]) -> List[Dict[str, str]]:
+    system_prompt = f"{CLASSIFIER_PROMPT}{CLASSIFIER_BATCH_PROMPT}"
+    lines = [
+        f"{i}. Company: {company}; Title: {title or ''}"
+        for i, (company, title) in enumerate(items, start=1)
+    ]
+    user_prompt = "Companies:\n" + "\n".join(lines) + "\n\nRespond only in valid JSON."
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _parse_batch_item(item, company: str) -> Optional[CompanyClassification]:
+    """Validate one batch result; return None if it is missing, malformed or for another company."""
+    if not isinstance(item, dict):
+        return None
+    category = str(item.get("category") or "").strip()
+    summary = item.get("summary")
+    if category not in ALLOWED_CATEGORIES or not isinstance(summary, str):
+        return None
+    # A result the model echoed for a different company must not be applied here
+    if normalize_company(str(item.get("company") or "")) != normalize_company(company):
+        return None
+    return {
+        "company": company.strip(),
+        "summary": summary.strip(),
+        "category": category,
+    }
+
+
+def _to_batch_classifications(
+    response, items: Sequence[Tuple[str, str | None]]
+) -> List[Optional[CompanyClassification]]:
+    data = decode_json(response.choices[0].message.content or "")
+    entries = data.get("results") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        return [None] * len(items)
+
+    # Match results by their echoed index, falling back to the echoed company name
+    by_index: Dict[int, object] = {}
+    by_company: Dict[str, object] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        index = entry.get("index")
+        if isinstance(index, int) and index not in by_index:
+            by_index[index] = entry
+        else:
+            by_company.setdefault(normalize_company(str(entry.get("company") or "")), entry)
+
+    results = []
+    for i, (company, _title) in enumerate(items, start=1):
+        result = _parse_batch_item(by_index.get(i), company)
+        if result is None:
+            result = _parse_batch_item(by_company.get(normalize_company(company)), company)
+        results.append(result)
+    return results
+
+
+async def aclassify_companies(
+    items: Sequence[Tuple[str, str | None]],
+) -> List[CompanyClassification]:
+    """
+    Classify several (company, title) pairs with a single request.
+
+    Results come back in input order. Items the model leaves out, returns
+    malformed (for example with a category outside the allowed set) or
+    answers under another company's name are re-classified one at a time
+    with `aclassify_company`.
+    """
+    if not items:
+        return []
+    metrics = get_metrics()
+    messages = _build_batch_messages(items)
+    with metrics.time("classify_batch"):
+        response = await get_rate_limiter().call(
+            lambda: get_async_client().chat.completions.create(
+                model=os.getenv("MODEL_NAME"),
+                messages=messages,
+                response_format=response_format(
+                    "company_classifications", BATCH_CLASSIFICATION_SCHEMA, default=_JSON_OBJECT
+                ),
+            ),
+            tokens=estimate_tokens(messages) + COMPLETION_TOKEN_ALLOWANCE * (len(items) - 1),
+            stage="classify_batch",
+        )
+    metrics.record_usage("classify_batch", response.usage)
+    results = _to_batch_classifications(response, items)
+
+    retry = [i for i, r in enumerate(results) if r is None]
+    if retry:
+        metrics.inc("classify_batch_fallbacks_total", len(retry))
+        singles = await asyncio.gather(*(aclassify_company(*items[i]) for i in retry))
+        for i, result in zip(retry, singles):
+            results[i] = result
+    return results
@@ -1,30 +1,48 @@
 import os
+import re
 import json
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Callable, List, Optional
 from openai import AsyncOpenAI
-from utils.safeparse import safe_parse_json
-from prompts import EMAIL_GEN_SYSTEM_PROMPT
+from utils.safeparse import decode_json, response_format, safe_parse_json
+from utils.clients import get_async_client
+from utils.ratelimit import estimate_tokens, get_rate_limiter
+from utils.metrics import get_metrics
+from prompts import EMAIL_GEN_SYSTEM_PROMPT, EMAIL_GEN_TASK_PROMPT
 
-async def gen_email(name: str, title: str, parsed: dict) -> dict:
-    async with AsyncOpenAI() as client:
-        email = await generate_email(
-            client, speaker_name=name, speaker_title=title, data=parsed
-        )
-        return email
+# Byte-identical for every request, so it forms a stable prefix that
+# provider-side prompt caching can reuse. Per-speaker details go last, in
+# the user message.
+EMAIL_SYSTEM_PROMPT = (
+    "You are a helpful outreach assistant. "
+    "Write short, friendly, value-focused emails for conference speakers. "
+    "Always respond as strict JSON with keys 'subject' and 'body'.\n"
+    f"{EMAIL_GEN_SYSTEM_PROMPT}{EMAIL_GEN_TASK_PROMPT}"
+)
 
-async def generate_email(
-    client: AsyncOpenAI,
-    *,
-    speaker_name: str,
-    speaker_title: str,
-    data: Any
-) -> Dict[str, str]:
-    """Generate an email using arbitrary JSON input.
+DEFAULT_SUBJECT = "Visit DroneDeploy at Booth #42"
 
-    The `data` argument can be any JSON-serializable object or a JSON string.
-    No specific keys are required; the JSON is included as context.
-    Returns a dict with keys: subject, body.
-    """
+# JSON schema for structured outputs (LLM_STRUCTURED_OUTPUTS=1)
+EMAIL_SCHEMA = {
+    "type": "object",
+    "properties": {"subject": {"type": "string"}, "body": {"type": "string"}},
+    "required": ["subject", "body"],
+    "additionalProperties": False,
+}
+
+
+def email_request_options() -> Dict[str, Any]:
+    """Extra create() arguments for email requests; empty unless structured outputs are on."""
+    fmt = response_format("outreach_email", EMAIL_SCHEMA)
+    return {"response_format": fmt} if fmt else {}
+
+async def gen_email(name: str, title: str, parsed: dict, *, stream: bool = False) -> dict:
+    generate = generate_email_stream if stream else generate_email
+    return await generate(
+        get_async_client(), speaker_name=name, speaker_title=title, data=parsed
+    )
+
+def _build_email_messages(speaker_name: str, speaker_title: str, data: Any) -> List[Dict[str, str]]:
     # Normalize input to something concise we can pass as context
     context_obj: Any
     if isinstance(data, str):
@@ -38,36 +56,148 @@ async def generate_email(
     except Exception:
         context_json = str(context_obj)
 
-    system_prompt = (
-        "You are a helpful outreach assistant. "
-        "Write short, friendly, value-focused emails for conference speakers. "
-        "Always respond as strict JSON with keys 'subject' and 'body'."
-        f"f{EMAIL_GEN_SYSTEM_PROMPT}"
-        
-    )
     user_prompt = (
         f"Speaker: {speaker_name or 'there'} ({speaker_title or ''})\n"
-        f"Context JSON: {context_json}\n\n"
-        "Write a 2–3 sentence invite to visit DroneDeploy's booth #42. "
-        "Focus on relevance to the speaker based on the context. Include a clear CTA."
+        f"Context JSON: {context_json}"
     )
+    return [
+        {"role": "system", "content": EMAIL_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
 
-    resp = await client.chat.completions.create(
-        model=os.getenv("MODEL_NAME"),
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-    )
 
-    content = (resp.choices[0].message.content or "").strip()
-    try:
-        data = json.loads(content)
-    except Exception:
+def _to_email(content: Any) -> Dict[str, str]:
+    """Subject and body from a model reply (or an already-decoded dict)."""
+    data = decode_json(content or "")
+    if not isinstance(data, dict):
         # If the model didn't return JSON, use the content as the body
-        data = {"subject": "Visit DroneDeploy at Booth #42", "body": content}
+        data = {"subject": DEFAULT_SUBJECT, "body": str(content or "")}
 
     return {
-        "subject": (data.get("subject") or "Visit DroneDeploy at Booth #42").strip(),
-        "body": (data.get("body") or "").strip(),
+        "subject": str(data.get("subject") or DEFAULT_SUBJECT).strip(),
+        "body": str(data.get("body") or "").strip(),
     }
+
+
+async def generate_email(
+    client: AsyncOpenAI,
+    *,
+    speaker_name: str,
+    speaker_title: str,
+    data: Any
+) -> Dict[str, str]:
+    """Generate an email using arbitrary JSON input.
+
+    The `data` argument can be any JSON-serializable object or a JSON string.
+    No specific keys are required; the JSON is included as context.
+    Returns a dict with keys: subject, body.
+    """
+    metrics = get_metrics()
+    messages = _build_email_messages(speaker_name, speaker_title, data)
+    with metrics.time("email"):
+        resp = await get_rate_limiter().call(
+            lambda: client.chat.completions.create(
+                model=os.getenv("MODEL_NAME"),
+                messages=messages,
+                **email_request_options(),
+            ),
+            tokens=estimate_tokens(messages),
+            stage="email",
+        )
+    metrics.record_usage("email", resp.usage)
+    return _to_email(resp.choices[0].message.content)
+
+
+def _string_end(text: str, start: int) -> Optional[int]:
+    """Index of the quote closing a JSON string whose body begins at `start`."""
+    i = start
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == '"':
+            return i
+        i += 1
+    return None
+
+
+class _EmailFieldScanner:
+    """Pulls completed `subject`/`body` string values out of a partially streamed JSON object."""
+
+    FIELDS = ("subject", "body")
+
+    def __init__(self, on_field: Optional[Callable[[str, str], None]] = None):
+        self.on_field = on_field
+        self.text = ""
+        self.fields: Dict[str, str] = {}
+        self._patterns = {name: re.compile(rf'"{name}"\s*:\s*"') for name in self.FIELDS}
+
+    def feed(self, chunk: str) -> None:
+        self.text += chunk
+        for name, pattern in self._patterns.items():
+            if name in self.fields:
+                continue
+            match = pattern.search(self.text)
+            if not match:
+                continue
+            end = _string_end(self.text, match.end())
+            if end is None:
+                continue
+            try:
+                value = json.loads(self.text[match.end() - 1 : end + 1])
+            except json.JSONDecodeError:
+                continue
+            self.fields[name] = value
+            if self.on_field:
+                self.on_field(name, value)
+
+
+async def generate_email_stream(
+    client: AsyncOpenAI,
+    *,
+    speaker_name: str,
+    speaker_title: str,
+    data: Any,
+    on_field: Optional[Callable[[str, str], None]] = None,
+) -> Dict[str, str]:
+    """Streaming variant of `generate_email`.
+
+    Consumes the completion as a token stream and calls `on_field(name, value)`
+    as soon as `subject` or `body` is complete. Time to first and last token
+    are recorded in the run metrics as `email_ttft` and `email_ttlt`.
+    Returns the same dict as `generate_email`.
+    """
+    metrics = get_metrics()
+    messages = _build_email_messages(speaker_name, speaker_title, data)
+
+    async def consume() -> tuple:
+        scanner = _EmailFieldScanner(on_field)
+        usage = None
+        first_token = None
+        started = time.perf_counter()
+        stream = await client.chat.completions.create(
+            model=os.getenv("MODEL_NAME"),
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **email_request_options(),
+        )
+        async for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                scanner.feed(delta)
+        metrics.observe("email_ttft", first_token if first_token is not None else time.perf_counter() - started)
+        metrics.observe("email_ttlt", time.perf_counter() - started)
+        return scanner.text, usage
+
+    with metrics.time("email"):
+        content, usage = await get_rate_limiter().call(
+            consume, tokens=estimate_tokens(messages), stage="email"
+        )
+    metrics.record_usage("email", usage)
+    return _to_email(content)
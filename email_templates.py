@@ -0,0 +1,247 @@
+import os
+import json
+import random
+import string
+from typing import Callable, Dict, Optional
+
+from email_generator import EMAIL_SCHEMA, EMAIL_SYSTEM_PROMPT, _build_email_messages, _to_email, gen_email
+from prompts import EMAIL_TEMPLATE_PROMPT
+from utils.clients import get_async_client
+from utils.metrics import get_metrics
+from utils.ratelimit import estimate_tokens, get_rate_limiter
+from utils.safeparse import decode_json, response_format
+from utils.singleflight import SingleFlight
+
+TEMPLATE_FIELDS = frozenset({"first_name", "title", "company", "company_summary"})
+
+# Stands in for {company_summary} when the classification has no summary
+# (e.g. an older cache entry), so those rows can still be templated
+CATEGORY_SUMMARIES = {
+    "Builder": "{company} delivers construction projects.",
+    "Owner": "{company} commissions and runs built assets.",
+    "Partner": "{company} works with construction and drone data.",
+    "Other": "{company} works across the built environment.",
+}
+
+# Called with (row fields, template email, LLM email) for sampled rows
+QualitySampler = Callable[[Dict[str, str], Dict[str, str], Dict[str, str]], None]
+
+
+def _template_fields(text: str) -> set:
+    return {field for _literal, field, _spec, _conv in string.Formatter().parse(text) if field is not None}
+
+
+def _valid_template(content: str) -> Optional[Dict[str, str]]:
+    """The model's template if it parses and only uses known placeholders."""
+    try:
+        data = decode_json(content or "")
+        subject, body = data["subject"].strip(), data["body"].strip()
+        fields = _template_fields(subject) | _template_fields(body)
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+    if not body or not fields <= TEMPLATE_FIELDS or "first_name" not in fields:
+        return None
+    return {"subject": subject, "body": body}
+
+
+def fill_template(template: Dict[str, str], values: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """Fill a template, or return None if it needs a value the row doesn't have."""
+    used = _template_fields(template["subject"]) | _template_fields(template["body"])
+    if any(not values.get(field) for field in used):
+        return None
+    return {"subject": template["subject"].format(**values), "body": template["body"].format(**values)}
+
+
+class JsonlSampleWriter:
+    """Default quality sampler: appends template/LLM pairs to a JSONL file for review."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = None
+
+    def __call__(self, fields: Dict[str, str], template_email: Dict[str, str], llm_email: Dict[str, str]) -> None:
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, "w", encoding="utf-8")
+        line = {"speaker": fields, "template": template_email, "llm": llm_email}
+        self._file.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class EmailTemplates:
+    """
+    Hybrid email generation: fill per-category templates, fall back to the LLM.
+
+    The first row of each company category triggers one LLM call that writes
+    a subject/body template for that category. The call reuses the email
+    system prompt, so the prompt prefix stays cacheable. Templates are kept
+    for the rest of the run, and later rows of the category are filled in
+    locally with the speaker's first name, title, company and the
+    classification summary (or the category's `CATEGORY_SUMMARIES` line when
+    it has none). Rows flagged for personalization, and rows a
+    template can't serve (no valid template for the category, or a
+    placeholder with no value), get full generation through `gen_email`.
+
+    With `sample_rate` > 0, that fraction of templated rows is also
+    generated in full and both versions are passed to `on_sample`, so
+    template quality can be compared against the LLM. The output always
+    uses the template version.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rate: float = 0.0,
+        on_sample: Optional[QualitySampler] = None,
+        seed: Optional[int] = None,
+    ):
+        self.sample_rate = sample_rate
+        self.on_sample = on_sample
+        self.templates: Dict[str, Optional[Dict[str, str]]] = {}
+        self.filled = 0
+        self.personalized = 0
+        self.fallbacks = 0
+        self.sampled = 0
+        # Estimated tokens the templated rows would have cost with full generation
+        self.estimated_tokens_avoided = 0
+        self._flights = SingleFlight(lambda category: category.strip().lower())
+        self._random = random.Random(seed)
+
+    async def _generate_template(self, category: str) -> Optional[Dict[str, str]]:
+        metrics = get_metrics()
+        messages = [
+            {"role": "system", "content": EMAIL_SYSTEM_PROMPT},
+            {"role": "user", "content": EMAIL_TEMPLATE_PROMPT.format(category=category)},
+        ]
+        template = None
+        try:
+            with metrics.time("email_template_gen"):
+                resp = await get_rate_limiter().call(
+                    lambda: get_async_client().chat.completions.create(
+                        model=os.getenv("MODEL_NAME"),
+                        messages=messages,
+                        response_format=response_format(
+                            "outreach_email_template", EMAIL_SCHEMA, default={"type": "json_object"}
+                        ),
+                    ),
+                    tokens=estimate_tokens(messages),
+                    stage="email_template_gen",
+                )
+        except Exception as e:
+            print(f"Could not generate the {category} email template, using full generation: {e}")
+        else:
+            metrics.record_usage("email_template_gen", resp.usage)
+            template = _valid_template(resp.choices[0].message.content)
+            if template is None:
+                print(f"Discarded an invalid {category} email template, using full generation")
+        self.templates[category] = template
+        return template
+
+    async def template_for(self, category: str) -> Optional[Dict[str, str]]:
+        """The run's template for `category`, generating it on first use."""
+        return await self._flights.do(category, lambda: self._generate_template(category))
+
+    async def email_for(
+        self,
+        name: str,
+        title: str,
+        company: str,
+        parsed: dict,
+        *,
+        personalize: bool = False,
+        stream: bool = False,
+    ) -> Dict[str, str]:
+        """Email for one speaker; same shape as `gen_email`."""
+        metrics = get_metrics()
+        if personalize:
+            self.personalized += 1
+            metrics.inc("email_template_total", result="personalized")
+            return await gen_email(name, title, parsed, stream=stream)
+
+        category = str(parsed.get("category") or "Other").strip() or "Other"
+        template = await self.template_for(category)
+        with metrics.time("email_template"):
+            company = company or str(parsed.get("company") or "")
+            summary = str(parsed.get("summary") or "").strip()
+            if not summary and company:
+                summary = CATEGORY_SUMMARIES.get(category, "").replace("{company}", company)
+            values = {
+                "first_name": (name.split() or [""])[0],
+                "title": title,
+                "company": company,
+                "company_summary": summary,
+            }
+            email = fill_template(template, values) if template else None
+        if email is None:
+            self.fallbacks += 1
+            metrics.inc("email_template_total", result="fallback")
+            return await gen_email(name, title, parsed, stream=stream)
+
+        email = _to_email(email)
+        self.filled += 1
+        metrics.inc("email_template_total", result="filled")
+        self.estimated_tokens_avoided += estimate_tokens(_build_email_messages(name, title, parsed))
+        if self.on_sample and self.sample_rate > 0 and self._random.random() < self.sample_rate:
+            try:
+                llm_email = await gen_email(name, title, parsed)
+            except Exception as e:
+                print(f"Quality sample for {name} failed: {e}")
+            else:
+                self.sampled += 1
+                self.on_sample({"name": name, "title": title, "company": company}, email, llm_email)
+        return email
+
+    def report(self) -> Dict[str, float]:
+        """Template usage plus token and latency comparisons against full generation."""
+        metrics = get_metrics()
+
+        def tokens(stage: str) -> float:
+            return metrics.counter("llm_tokens_total", stage=stage, kind="prompt") + metrics.counter(
+                "llm_tokens_total", stage=stage, kind="completion"
+            )
+
+        llm_emails = metrics.counter("llm_requests_total", stage="email")
+        # Measured cost per generated email when this run made any, else the estimate
+        avoided = (
+            tokens("email") / llm_emails * self.filled if llm_emails else self.estimated_tokens_avoided
+        )
+        spent = tokens("email_template_gen")
+        return {
+            "email_template_filled": self.filled,
+            "email_template_personalized": self.personalized,
+            "email_template_fallbacks": self.fallbacks,
+            "email_template_sampled": self.sampled,
+            "email_template_tokens_spent": spent,
+            "email_template_tokens_avoided": avoided,
+            # Net of the template calls; zero when too few rows were filled to pay for them
+            "email_template_tokens_saved": max(avoided - spent, 0),
+            "email_template_fill_p50_s": metrics.stage_summary("email_template")["p50_s"],
+            "email_llm_p50_s": metrics.stage_summary("email")["p50_s"],
+        }
+
+    def summary(self) -> str:
+        r = self.report()
+        net = r["email_template_tokens_avoided"] - r["email_template_tokens_spent"]
+        saved = f"~{net:.0f} tokens saved" if net >= 0 else f"templates cost ~{-net:.0f} more tokens than they saved"
+        line = (
+            f"Email templates: {self.filled} rows filled from {sum(t is not None for t in self.templates.values())} "
+            f"templates, {self.personalized} personalized, {self.fallbacks} fell back to full generation, "
+            f"{self.sampled} quality samples; {saved}, "
+            f"p50 {r['email_template_fill_p50_s'] * 1000:.2f} ms per templated email"
+        )
+        if r["email_llm_p50_s"]:
+            line += f" vs {r['email_llm_p50_s'] * 1000:.0f} ms per LLM email"
+        return line
+
+    def write_json(self, path: str) -> None:
+        """Save the run's templates (None for categories that fell back) for review."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.templates, f, indent=2, ensure_ascii=False)
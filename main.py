@@ -1,63 +1,370 @@
 import os
 import csv
-import json
 import asyncio
+import argparse
+from itertools import islice
 from dotenv import load_dotenv
-from classifier import classify_company
-from email_generator import gen_email
-from utils.safeparse import safe_parse_json
-from openai import AsyncOpenAI
-from utils.exclusions import check_exclusion
-from utils.csv_write import write_email_output_csv
+from pathlib import Path
+from pipeline import DEFAULT_CONCURRENCY, run_pipeline
+from batch_job import DEFAULT_POLL_INTERVAL, run_batch_job
+from utils.batch_api import OpenAIBatchTransport
+from utils.checkpoint import CheckpointJournal
+from utils.deadletter import DeadLetterFile
+from utils.ratelimit import DEFAULT_MAX_RETRIES, configure_rate_limiter
+from utils.metrics import get_metrics
+from utils.cache import open_classification_cache
+from utils.preclassify import load_preclassifier
+from utils.http_cache import HttpCache
+from utils.parquet_write import parquet_path_for, require_pyarrow
+from utils.scraper import DEFAULT_MAX_PAGES, DEFAULT_SPEAKERS_URL, iter_speaker_rows
+from email_templates import EmailTemplates, JsonlSampleWriter
+from sharding import expand_inputs, run_sharded
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Classify speakers' companies and generate outreach emails.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("PIPELINE_CONCURRENCY") or DEFAULT_CONCURRENCY),
+        help="Concurrent workers per stage (classification, email generation)",
+    )
+    parser.add_argument(
+        "--input",
+        action="extend",
+        nargs="+",
+        default=None,
+        metavar="PATH",
+        help="Input CSV files or globs, e.g. 'in/*.csv' (default: in/speakers.csv)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("PIPELINE_WORKERS") or 1),
+        help="Worker processes; rows are sharded across them and merged into one ordered CSV",
+    )
+    parser.add_argument(
+        "--output-per-input",
+        action="store_true",
+        help="Write one <input name>_email_output.csv per input file instead of one merged CSV",
+    )
+    parser.add_argument(
+        "--out-dir",
+        default=os.getenv("PIPELINE_OUT_DIR") or os.path.join(os.path.dirname(__file__), "out"),
+        metavar="DIR",
+        help="Directory for the output CSV, checkpoints, dead letters and metrics (default: out/)",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="Also write the output as Parquet (email_output.parquet, with the company summary); needs pyarrow",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Only process the first N rows (useful for testing a smaller subset)",
+    )
+    parser.add_argument(
+        "--classify-batch-size",
+        type=int,
+        default=int(os.getenv("CLASSIFY_BATCH_SIZE") or 1),
+        help="Classify N companies per LLM request (1 = one request per company)",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Run offline through the OpenAI Batch API (lower cost, higher latency)",
+    )
+    parser.add_argument(
+        "--batch-poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="Seconds between batch status checks in --batch mode",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=float(os.getenv("LLM_RPM") or 0) or None,
+        help="LLM requests per minute budget (default: no local limit, back off on 429s)",
+    )
+    parser.add_argument(
+        "--tpm",
+        type=float,
+        default=float(os.getenv("LLM_TPM") or 0) or None,
+        help="LLM tokens per minute budget (default: no local limit, back off on 429s)",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=int(os.getenv("LLM_MAX_RETRIES") or DEFAULT_MAX_RETRIES),
+        help="Retries per LLM call before a row goes to the dead-letter file",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=str,
+        default=None,
+        help="Where to write the run's metrics report (default: out/metrics.json)",
+    )
+    parser.add_argument(
+        "--prometheus",
+        type=str,
+        default=None,
+        help="Also write metrics in Prometheus text format to this path",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream email generation and write each row as soon as it is complete (completion order)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse rows finished by a previous run (from its checkpoint journal) and retry the rest",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Skip rows repeating an earlier speaker name and company (always on with several inputs or --workers)",
+    )
+    parser.add_argument(
+        "--no-preclassify",
+        action="store_true",
+        help="Send every company to the LLM instead of classifying known companies locally first",
+    )
+    parser.add_argument(
+        "--email-templates",
+        action="store_true",
+        help="Fill per-category email templates (one LLM call per category) instead of generating every email; "
+        "rows with a truthy Personalize column still get full generation",
+    )
+    parser.add_argument(
+        "--template-sample-rate",
+        type=float,
+        default=0.0,
+        help="With --email-templates, also fully generate this fraction of templated rows and "
+        "log both versions to out/template_samples.jsonl for quality review",
+    )
+    scrape = parser.add_argument_group("scraping", "Scrape speakers and process them as they arrive, instead of reading in/speakers.csv")
+    scrape.add_argument(
+        "--scrape",
+        nargs="?",
+        const=DEFAULT_SPEAKERS_URL,
+        default=None,
+        metavar="URL",
+        help=f"Speakers page to scrape (default URL: {DEFAULT_SPEAKERS_URL})",
+    )
+    scrape.add_argument("--crawl", action="store_true", help="With --scrape, follow pagination links")
+    scrape.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES, help="Page limit for --crawl")
+    scrape.add_argument(
+        "--details",
+        action="store_true",
+        help="With --scrape, fetch speaker pages to fill in missing titles/companies",
+    )
+    scrape.add_argument("--insecure", action="store_true", help="Skip SSL verification for scraping")
+    scrape.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="With --scrape, don't use the on-disk HTTP cache (.cache/http)",
+    )
+    scrape.add_argument(
+        "--save-speakers",
+        nargs="?",
+        const="in/speakers.csv",
+        default=None,
+        metavar="PATH",
+        help="With --scrape, also write the scraped speakers to a CSV (default: in/speakers.csv)",
+    )
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument("--no-cache", action="store_true", help="Don't read or write the classification cache")
+    cache.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore cached classifications but store fresh results",
+    )
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.resume and args.batch:
+        parser.error("--resume is not supported with --batch")
+    if args.dedupe and args.batch:
+        parser.error("--dedupe is not supported with --batch")
+    if args.scrape and args.batch:
+        parser.error("--scrape is not supported with --batch; run seed.py first")
+    args.sharded = args.workers > 1 or args.output_per_input or len(args.input or []) > 1 or any(
+        ch in pattern for pattern in args.input or [] for ch in "*?["
+    )
+    if args.email_templates and args.batch:
+        parser.error("--email-templates is not supported with --batch")
+    if not 0 <= args.template_sample_rate <= 1:
+        parser.error("--template-sample-rate must be between 0 and 1")
+    if args.parquet:
+        try:
+            require_pyarrow()
+        except ImportError as e:
+            parser.error(str(e))
+    if args.sharded and (args.batch or args.scrape or args.stream):
+        parser.error("--batch, --scrape and --stream read a single input in one process")
+    return args
+
+
+async def scraped_rows(args: argparse.Namespace):
+    """Speaker rows streamed from the scraper, honouring --limit."""
+    rows = iter_speaker_rows(
+        args.scrape,
+        crawl=args.crawl,
+        max_pages=args.max_pages,
+        follow_details=args.details,
+        insecure=args.insecure,
+        http_cache=None if args.no_http_cache else HttpCache(),
+        save_to=Path(os.path.dirname(__file__), args.save_speakers) if args.save_speakers else None,
+    )
+    try:
+        count = 0
+        async for row in rows:
+            if args.limit is not None and count >= args.limit:
+                break
+            count += 1
+            yield row
+    finally:
+        await rows.aclose()
+
 
 def main():
     load_dotenv()
-    os.getenv("OPENAI_API_KEY")
-    csv_path = os.path.join(os.path.dirname(__file__), "in", "speakers.csv")
+    args = parse_args()
+    csv_path = (args.input or [os.path.join(os.path.dirname(__file__), "in", "speakers.csv")])[0]
+    out_path = os.path.join(args.out_dir, "email_output.csv")
+    if args.sharded:
+        return main_sharded(args, out_path)
+    cache = None if args.no_cache else open_classification_cache(refresh=args.refresh_cache)
+    preclassifier = None if args.no_preclassify else load_preclassifier()
+    journal = None if args.batch else CheckpointJournal(
+        os.path.splitext(out_path)[0] + ".checkpoint.jsonl", resume=args.resume
+    )
+    dead_letters = DeadLetterFile(os.path.join(os.path.dirname(out_path), "dead_letter.jsonl"))
+    parquet_path = parquet_path_for(out_path) if args.parquet else None
+    limiter = configure_rate_limiter(rpm=args.rpm, tpm=args.tpm, max_retries=args.max_retries)
+    samples = JsonlSampleWriter(os.path.join(os.path.dirname(out_path), "template_samples.jsonl"))
+    templates = (
+        EmailTemplates(sample_rate=args.template_sample_rate, on_sample=samples)
+        if args.email_templates
+        else None
+    )
+
+    def run(rows):
+        return asyncio.run(
+            run_pipeline(
+                rows,
+                out_path,
+                concurrency=args.concurrency,
+                cache=cache,
+                classify_batch_size=args.classify_batch_size,
+                journal=journal,
+                dead_letters=dead_letters,
+                stream=args.stream,
+                preclassifier=preclassifier,
+                templates=templates,
+                parquet_path=parquet_path,
+                dedupe=args.dedupe,
+            )
+        )
+
     try:
-        with open(csv_path, "r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for i, row in enumerate(reader):
-                #use the below code to test a smaller subset
-                #if i >= 5:
-                    #break
-                name = (row.get("Speaker Name") or "").strip()
-                title = (row.get("Speaker Title") or "").strip()
-                company = (row.get("Speaker Company") or "").strip()
-
-                result = classify_company(company, title)
-                parsed = safe_parse_json(result)
-
-                out_path = os.path.join(os.path.dirname(__file__), "out", "email_output.csv")
-
-                if not check_exclusion(parsed):
-                    try:
-                        email = asyncio.run(gen_email(name, title, parsed))
-                        record = {
-                            "Speaker Name": name,
-                            "Speaker Title": title,
-                            "Speaker Company": company,
-                            "Company Category": parsed.get("category"),
-                            "Email Subject": email.get("subject", ""),
-                            "Email Body": email.get("body", ""),
-                        }
-                        write_email_output_csv(out_path, record)
-
-                    except Exception as e:
-                        print(f"Email generation error: {e}")
+        if args.scrape:
+            # Rows go straight from the scraper into classification; no input CSV
+            stats = run(scraped_rows(args))
+        else:
+            with open(csv_path, "r", newline="", encoding="utf-8") as f:
+                rows = islice(csv.DictReader(f), args.limit)
+                if args.batch:
+                    stats = run_batch_job(
+                        rows,
+                        out_path,
+                        transport=OpenAIBatchTransport(),
+                        job_dir=Path(out_path).parent / "batch",
+                        poll_interval=args.batch_poll_interval,
+                        cache=cache,
+                        preclassifier=preclassifier,
+                        parquet_path=parquet_path,
+                    )
                 else:
-                    record = {
-                        "Speaker Name": name,
-                        "Speaker Title": title,
-                        "Speaker Company": company,
-                        "Company Category": parsed.get("category"),
-                        "Email Subject": "",
-                        "Email Body": "",
-                    }
-                    write_email_output_csv(out_path, record)
-       
+                    stats = run(rows)
+        print(stats.summary())
+        if parquet_path:
+            print(f"Wrote Parquet output to {parquet_path}")
+        if cache:
+            print(cache.summary())
+        if not args.batch:
+            print(limiter.summary())
+        if dead_letters.count:
+            print(f"{dead_letters.count} rows failed after retries; see {dead_letters.path}")
+        if templates:
+            print(templates.summary())
+            templates.write_json(os.path.join(os.path.dirname(out_path), "email_templates.json"))
+            if samples.count:
+                print(f"Wrote {samples.count} template quality samples to {samples.path}")
+
+        report = stats.as_dict()
+        if cache:
+            report["classify_cache_hit_rate"] = cache.hit_rate
+        if templates:
+            report.update(templates.report())
+        metrics_path = args.metrics_json or os.path.join(os.path.dirname(out_path), "metrics.json")
+        get_metrics().write_json(metrics_path, **report)
+        print(f"Wrote metrics report to {metrics_path}")
+        if args.prometheus:
+            get_metrics().write_prometheus(args.prometheus, **report)
     except FileNotFoundError:
         print(f"Could not find CSV at {csv_path}")
+    finally:
+        if cache:
+            cache.close()
+        if journal:
+            journal.close()
+        dead_letters.close()
+        samples.close()
+
+
+def main_sharded(args: argparse.Namespace, out_path: str) -> None:
+    """Several inputs and/or worker processes; see `sharding.run_sharded`."""
+    try:
+        paths = expand_inputs(args.input or [os.path.join(os.path.dirname(__file__), "in", "speakers.csv")])
+    except FileNotFoundError as e:
+        print(e)
+        return
+    stats = run_sharded(
+        paths,
+        out_path,
+        workers=args.workers,
+        per_input=args.output_per_input,
+        limit=args.limit,
+        resume=args.resume,
+        concurrency=args.concurrency,
+        classify_batch_size=args.classify_batch_size,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        max_retries=args.max_retries,
+        use_cache=not args.no_cache,
+        refresh_cache=args.refresh_cache,
+        preclassify=not args.no_preclassify,
+        email_templates=args.email_templates,
+        template_sample_rate=args.template_sample_rate,
+        parquet=args.parquet,
+    )
+    print(stats.summary())
+
+    report = stats.as_dict()
+    hits = get_metrics().counter("classify_cache_lookups_total", result="hit")
+    misses = get_metrics().counter("classify_cache_lookups_total", result="miss")
+    if hits + misses:
+        report["classify_cache_hit_rate"] = hits / (hits + misses)
+    metrics_path = args.metrics_json or os.path.join(os.path.dirname(out_path), "metrics.json")
+    get_metrics().write_json(metrics_path, workers=args.workers, **report)
+    print(f"Wrote metrics report to {metrics_path}")
+    if args.prometheus:
+        get_metrics().write_prometheus(args.prometheus, **report)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,357 @@
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import AsyncIterable, Callable, Dict, Iterable, Optional, Union
+
+from classifier import aclassify_company, aclassify_companies
+from email_generator import gen_email
+from email_templates import EmailTemplates
+from utils.exclusions import check_exclusion
+from utils.csv_write import AsyncCsvSink, EmailCsvWriter, WriterGroup
+from utils.parquet_write import EmailParquetWriter
+from utils.clients import aclose_clients
+from utils.cache import ClassificationCache
+from utils.normalize import normalize_company
+from utils.singleflight import SingleFlight
+from utils.batcher import MicroBatcher
+from utils.checkpoint import CheckpointJournal, row_key
+from utils.deadletter import DeadLetterFile
+from utils.preclassify import PreClassifier
+from utils.records import SpeakerRecord
+
+DEFAULT_CONCURRENCY = 8
+
+# Marks the end of a stage queue; one is enqueued per worker.
+_DONE = object()
+
+# An input row: a CSV/scraper dict or an already-built record
+Row = Union[Dict[str, str], SpeakerRecord]
+
+
+@dataclass
+class PipelineStats:
+    rows: int = 0
+    emails: int = 0
+    excluded: int = 0
+    errors: int = 0
+    resumed: int = 0
+    duplicates: int = 0
+    classify_calls_saved: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "rows_per_second": self.rows_per_second}
+
+    def summary(self) -> str:
+        return (
+            f"Processed {self.rows} rows in {self.elapsed:.1f}s "
+            f"({self.rows_per_second:.2f} rows/s) — "
+            f"{self.emails} emails, {self.excluded} excluded, {self.errors} errors, "
+            f"{self.resumed} resumed, {self.duplicates} duplicate rows skipped, "
+            f"{self.classify_calls_saved} duplicate classifications coalesced"
+        )
+
+
+def speaker_fields(row: Dict[str, str]) -> tuple[str, str, str]:
+    name = (row.get("Speaker Name") or "").strip()
+    title = (row.get("Speaker Title") or "").strip()
+    company = (row.get("Speaker Company") or "").strip()
+    return name, title, company
+
+
+def build_record(record: SpeakerRecord, parsed: dict, email: Optional[dict] = None) -> SpeakerRecord:
+    """Fill in `record`'s classification and email; returns it for convenience."""
+    record.category = parsed.get("category") or ""
+    record.summary = parsed.get("summary") or ""
+    if email:
+        record.subject = email.get("subject", "")
+        record.body = email.get("body", "")
+    return record
+
+
+class CompanyClassifier:
+    """
+    Classify companies the cheapest way available.
+
+    The pre-classifier answers for companies it recognizes, then the cache;
+    anything left goes to the LLM, with concurrent lookups for the same
+    company (as keyed by `normalizer`) sharing one call, and with
+    `batch_size` > 1 grouped into batched requests. LLM results are stored
+    in the cache. With `memoize=False` results aren't also kept in memory,
+    for callers that live longer than one run.
+    """
+
+    def __init__(
+        self,
+        *,
+        cache: Optional[ClassificationCache] = None,
+        preclassifier: Optional[PreClassifier] = None,
+        normalizer: Callable[[str], str] = normalize_company,
+        batch_size: int = 1,
+        memoize: bool = True,
+    ):
+        self.cache = cache
+        self.preclassifier = preclassifier
+        self.flights = SingleFlight(normalizer, memoize=memoize)
+        self.batcher = MicroBatcher(aclassify_companies, batch_size=batch_size) if batch_size > 1 else None
+
+    async def _classify_and_store(self, company: str, title: str) -> dict:
+        if self.batcher:
+            result = await self.batcher.submit((company, title))
+        else:
+            result = await aclassify_company(company, title)
+        if self.cache:
+            self.cache.set(company, result)
+        return result
+
+    async def classify(self, company: str, title: str) -> dict:
+        result = self.preclassifier.lookup(company) if self.preclassifier else None
+        if result is not None:
+            return result
+        result = self.cache.get(company) if self.cache else None
+        if result is None:
+            result = await self.flights.do(company, lambda: self._classify_and_store(company, title))
+        return result
+
+
+async def run_pipeline(
+    rows: Union[Iterable[Row], AsyncIterable[Row]],
+    out_path: str,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[ClassificationCache] = None,
+    normalizer: Callable[[str], str] = normalize_company,
+    classify_batch_size: int = 1,
+    journal: Optional[CheckpointJournal] = None,
+    dead_letters: Optional[DeadLetterFile] = None,
+    stream: bool = False,
+    preclassifier: Optional[PreClassifier] = None,
+    templates: Optional[EmailTemplates] = None,
+    parquet_path: Optional[str] = None,
+    close_clients: bool = True,
+    dedupe: bool = False,
+) -> PipelineStats:
+    """
+    Classify each speaker's company and generate outreach emails on a single
+    event loop.
+
+    Classification and email generation run as separate stages, each with
+    `concurrency` workers, connected by bounded queues. Records are written
+    to `out_path` in input order regardless of completion order; the file is
+    only replaced once the whole run succeeds.
+
+    When `preclassifier` is given, companies it recognizes confidently are
+    classified locally and never reach the cache or the LLM.
+
+    When `cache` is given, classifications are looked up there before
+    calling the LLM and stored afterwards. Lookups for the same company
+    (as keyed by `normalizer`) share a single LLM call within the run.
+
+    With `classify_batch_size` > 1, companies are classified
+    `classify_batch_size` at a time in one request, and the classification
+    stage gets enough workers to keep `concurrency` batches in flight.
+
+    With `dedupe=True`, rows repeating an earlier (speaker name, company)
+    are skipped; otherwise every input row gets an output row. When
+    `journal` is given, each finished classification and output record is
+    checkpointed there, and rows the journal already has are reused instead
+    of calling the LLM again. Rows that still fail after the rate limiter's
+    retries are written to `dead_letters`.
+
+    With `stream=True` emails are generated from a token stream and each row
+    is written and flushed to `out_path` as soon as it is complete, in
+    completion order rather than input order.
+
+    When `templates` is given, emails are filled from per-category
+    templates and only rows flagged for personalization (or that no
+    template fits) get full LLM generation; see `EmailTemplates`.
+
+    Each row becomes a `SpeakerRecord` as it is read (rows may already be
+    records), and that one object is filled in by each stage and written
+    out. With `parquet_path`, rows are also written to a Parquet file that
+    includes the classification summary, a row group at a time.
+
+    The shared LLM clients are closed when the run ends; pass
+    `close_clients=False` when the event loop outlives the run (the
+    service's bulk jobs) so later requests keep the warm connections.
+
+    Each row is handled inside its own error boundary: a failure anywhere
+    in a row's handling (LLM call, journal write, record building) counts
+    as an error and sends the row to `dead_letters`. If a worker task
+    itself dies, the run fails rather than waiting on a full queue.
+
+    `rows` may be an async iterable (e.g. `utils.scraper.iter_speaker_rows`),
+    in which case classification starts as soon as the first row arrives.
+    Rows are only pulled while the classification queue has room, so a fast
+    source is held back rather than buffered. An async generator source is
+    closed when the run ends, including on failure.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    stats = PipelineStats()
+    classify_q: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    email_q: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    # Completed rows waiting for their predecessors, keyed by input index
+    pending: Dict[int, Optional[SpeakerRecord]] = {}
+    next_index = 0
+    emit_lock = asyncio.Lock()
+
+    classifier = CompanyClassifier(
+        cache=cache, preclassifier=preclassifier, normalizer=normalizer, batch_size=classify_batch_size
+    )
+    classify = classifier.classify
+
+    async def emit(index: int, record: Optional[SpeakerRecord]) -> None:
+        nonlocal next_index
+        if stream:
+            if record is not None:
+                await sink.put(record)
+            return
+        pending[index] = record
+        # Serialize hand-off so a blocked put can't be overtaken by a later row
+        async with emit_lock:
+            while next_index in pending:
+                ready = pending.pop(next_index)
+                next_index += 1
+                if ready is not None:
+                    await sink.put(ready)
+
+    # Set to the exception of a worker task that died, so puts fail instead of waiting forever
+    crashed: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def watch(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None and not crashed.done():
+            crashed.set_result(task.exception())
+
+    async def put(queue: asyncio.Queue, item) -> None:
+        if not queue.full():
+            queue.put_nowait(item)
+            return
+        putter = asyncio.ensure_future(queue.put(item))
+        await asyncio.wait([putter, crashed], return_when=asyncio.FIRST_COMPLETED)
+        if not putter.done():
+            putter.cancel()
+            raise RuntimeError("A pipeline worker failed") from crashed.result()
+        putter.result()
+
+    async def fail(index: int, record: SpeakerRecord, stage: str, error: Exception) -> None:
+        stats.errors += 1
+        if dead_letters:
+            dead_letters.add(record.input_row(), stage, error)
+        await emit(index, None)
+
+    async def classify_worker() -> None:
+        while True:
+            item = await classify_q.get()
+            if item is _DONE:
+                return
+            index, record = item
+            try:
+                done = journal.get(record.name, record.company) if journal else {}
+                if "record" in done:
+                    stats.resumed += 1
+                    await emit(index, SpeakerRecord.from_output(done["record"]))
+                    continue
+                if "classification" in done:
+                    parsed = done["classification"]
+                else:
+                    parsed = await classify(record.company, record.title)
+                    if journal:
+                        journal.record(record.name, record.company, "classification", parsed)
+                if check_exclusion(parsed):
+                    stats.excluded += 1
+                    build_record(record, parsed)
+                    if journal:
+                        journal.record(record.name, record.company, "record", record.as_output())
+                    await emit(index, record)
+                    continue
+            except Exception as e:
+                print(f"Classification error: {e}")
+                await fail(index, record, "classification", e)
+                continue
+            await put(email_q, (index, record, parsed))
+
+    async def email_worker() -> None:
+        while True:
+            item = await email_q.get()
+            if item is _DONE:
+                return
+            index, record, parsed = item
+            try:
+                if templates:
+                    email = await templates.email_for(
+                        record.name,
+                        record.title,
+                        record.company,
+                        parsed,
+                        personalize=record.personalize,
+                        stream=stream,
+                    )
+                else:
+                    email = await gen_email(record.name, record.title, parsed, stream=stream)
+                build_record(record, parsed, email)
+                if journal:
+                    journal.record(record.name, record.company, "record", record.as_output())
+                await emit(index, record)
+            except Exception as e:
+                print(f"Email generation error: {e}")
+                await fail(index, record, "email", e)
+                continue
+            stats.emails += 1
+
+    started = time.perf_counter()
+    classify_workers = concurrency * max(classify_batch_size, 1)
+    classifiers = [asyncio.create_task(classify_worker()) for _ in range(classify_workers)]
+    emailers = [asyncio.create_task(email_worker()) for _ in range(concurrency)]
+    for task in classifiers + emailers:
+        task.add_done_callback(watch)
+    try:
+        writer = EmailCsvWriter(out_path, flush_every=1, atomic=False) if stream else EmailCsvWriter(out_path)
+        if parquet_path:
+            writer = WriterGroup(writer, EmailParquetWriter(parquet_path))
+        with writer:
+            async with AsyncCsvSink(writer, batch_size=1 if stream else 100) as sink:
+                seen = set()
+                index = 0
+
+                async def feed(row: Row) -> None:
+                    nonlocal index
+                    stats.rows += 1
+                    record = row if isinstance(row, SpeakerRecord) else SpeakerRecord.from_row(row)
+                    if dedupe:
+                        key = row_key(record.name, record.company)
+                        if key in seen:
+                            stats.duplicates += 1
+                            return
+                        seen.add(key)
+                    await put(classify_q, (index, record))
+                    index += 1
+
+                if isinstance(rows, AsyncIterable):
+                    async for row in rows:
+                        await feed(row)
+                else:
+                    for row in rows:
+                        await feed(row)
+                for _ in classifiers:
+                    await put(classify_q, _DONE)
+                await asyncio.gather(*classifiers)
+                for _ in emailers:
+                    await put(email_q, _DONE)
+                await asyncio.gather(*emailers)
+    finally:
+        for task in classifiers + emailers:
+            task.cancel()
+        if hasattr(rows, "aclose"):
+            await rows.aclose()
+        if close_clients:
+            await aclose_clients()
+        stats.classify_calls_saved = classifier.flights.saved
+        stats.elapsed = time.perf_counter() - started
+
+    return stats
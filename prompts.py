@@ -52,3 +52,41 @@ Your JSON response must exactly follow this schema:
   "body": "<2–3 sentence casual email body text>"
 }
 """
+
+EMAIL_GEN_TASK_PROMPT = """
+---
+### Task
+Write a 2–3 sentence invite to visit DroneDeploy's booth #42. Focus on relevance to the speaker based on the context. Include a clear CTA.
+
+The speaker's name, title and company context follow in the next message.
+"""
+
+EMAIL_TEMPLATE_PROMPT = """
+Instead of an email for one speaker, write a reusable email template for every speaker whose company is in the "{category}" category.
+
+Use these placeholders, written exactly like this, and no others:
+- {{first_name}}: the speaker's first name
+- {{title}}: the speaker's job title
+- {{company}}: the speaker's company name
+- {{company_summary}}: one or two full sentences describing what the company does, which must stand on its own as complete sentences
+
+Follow the same email guidelines and JSON output format as above.
+"""
+
+CLASSIFIER_BATCH_PROMPT = """
+---
+### Batch Mode
+You will receive a numbered list of companies instead of a single company. Classify every company using the rules above.
+
+Return exactly one result per company, keeping the input numbering. Respond only in JSON in the following format:
+{
+  "results": [
+    {
+      "index": <number from the input list>,
+      "company": "<company name>",
+      "summary": "<1–2 sentence plain-English summary of what this company does>",
+      "category": "<one of: Builder, Owner, Partner, Competitor>"
+    }
+  ]
+}
+"""
@@ -0,0 +1,563 @@
+"""
+HTTP service: classify companies and generate outreach emails on demand.
+
+    python service.py --port 8080 --job-workers 2
+
+Endpoints:
+  POST /classify          {"company": ..., "title": ...}
+  POST /generate-email    {"name": ..., "title": ..., "company": ..., "personalize": false}
+  POST /jobs              JSON {"rows": [...]} or a speakers CSV body; 202 with the job id
+  GET  /jobs/{id}         Job status and stats
+  GET  /jobs/{id}/output  The job's email_output.csv, once it is done
+  GET  /health            Liveness, and whether the LLM client is ready
+  GET  /metrics           Prometheus text format (?format=json for the JSON report)
+
+The port opens before openai and the modules built on it are imported;
+they load in the background while /health reports "ready": false, and
+requests that arrive meanwhile wait for them. If that fails, /health and
+the LLM endpoints answer 503 and queued jobs are marked failed. Every
+request shares one warm LLM client, the rate limiter and the
+classification cache.
+"""
+import io
+import os
+import csv
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+from dotenv import load_dotenv
+
+from utils.cache import ClassificationCache, open_classification_cache
+from utils.deadletter import DeadLetterFile
+from utils.exclusions import check_exclusion
+from utils.metrics import get_metrics
+from utils.preclassify import load_preclassifier
+from utils.records import PERSONALIZE_COLUMN, SpeakerRecord, wants_personalization
+
+DEFAULT_PORT = 8080
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_JOB_QUEUE_SIZE = 100
+# Same as the batch script's per-stage default (pipeline.DEFAULT_CONCURRENCY)
+DEFAULT_CONCURRENCY = 8
+DEFAULT_MAX_JOB_ROWS = 100_000
+DEFAULT_MAX_JOBS_KEPT = 1000
+# Latency samples kept per stage for /metrics
+DEFAULT_METRICS_WINDOW = 10_000
+
+
+def _import_llm_modules() -> None:
+    # openai dominates startup time; everything that talks to the LLM imports it
+    import pipeline  # noqa: F401
+    import email_templates  # noqa: F401
+
+
+def _error(exc_cls, message: str, **kwargs) -> web.HTTPException:
+    return exc_cls(text=json.dumps({"error": message}), content_type="application/json", **kwargs)
+
+
+def _llm_error(error: Exception) -> web.HTTPException:
+    """An LLM call that failed after the rate limiter's retries."""
+    return _error(web.HTTPBadGateway, f"{type(error).__name__}: {error}")
+
+
+async def _json_body(request: web.Request) -> Any:
+    try:
+        return await request.json()
+    except ValueError:
+        raise _error(web.HTTPBadRequest, "Request body must be JSON")
+
+
+def _speaker(row: Any) -> SpeakerRecord:
+    """A speaker from the speakers CSV columns or the short keys name/title/company/personalize."""
+    if not isinstance(row, dict):
+        raise _error(web.HTTPBadRequest, "Each speaker must be a JSON object")
+    if any(key.startswith("Speaker ") for key in row):
+        return SpeakerRecord.from_row(row)
+    return SpeakerRecord(
+        name=str(row.get("name") or "").strip(),
+        title=str(row.get("title") or "").strip(),
+        company=str(row.get("company") or "").strip(),
+        personalize=wants_personalization({PERSONALIZE_COLUMN: str(row.get("personalize") or "")}),
+    )
+
+
+@dataclass
+class Job:
+    """A bulk job: rows run through `run_pipeline` into their own output directory."""
+
+    id: str
+    rows: List[SpeakerRecord]
+    out_path: str
+    status: str = "queued"  # queued, running, done or failed
+    row_count: int = 0
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    stats: Optional[dict] = None
+    failed_rows: int = 0
+    error: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "rows": self.row_count,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "stats": self.stats,
+            "failed_rows": self.failed_rows,
+            "error": self.error,
+            "output": f"/jobs/{self.id}/output" if self.status == "done" else None,
+        }
+
+
+class Service:
+    """
+    State shared by every request: the warm LLM client, the classification
+    cache and pre-classifier, email templates and the bulk job queue.
+
+    Bulk jobs wait on a queue of at most `job_queue_size` jobs (submissions
+    beyond that get a 503) and `job_workers` of them run at once, each with
+    `concurrency` workers per pipeline stage. The last `max_jobs_kept`
+    finished jobs can be looked up; their output stays on disk under
+    `out_dir/jobs/`.
+    """
+
+    def __init__(
+        self,
+        *,
+        out_dir: str,
+        job_workers: int = DEFAULT_JOB_WORKERS,
+        job_queue_size: int = DEFAULT_JOB_QUEUE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        classify_batch_size: int = 1,
+        max_job_rows: int = DEFAULT_MAX_JOB_ROWS,
+        max_jobs_kept: int = DEFAULT_MAX_JOBS_KEPT,
+        use_cache: bool = True,
+        preclassify: bool = True,
+        email_templates: bool = False,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_retries: Optional[int] = None,
+    ):
+        self.out_dir = out_dir
+        self.job_workers = job_workers
+        self.job_queue_size = job_queue_size
+        self.concurrency = concurrency
+        self.classify_batch_size = classify_batch_size
+        self.max_job_rows = max_job_rows
+        self.max_jobs_kept = max_jobs_kept
+        self.use_cache = use_cache
+        self.preclassify = preclassify
+        self.email_templates = email_templates
+        self.limits = {"rpm": rpm, "tpm": tpm, "max_retries": max_retries}
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.running = 0
+        self.started = time.time()
+        self.warmup_s: Optional[float] = None
+        self.cache: Optional[ClassificationCache] = None
+        self.preclassifier = None
+        self.classifier = None
+        self.templates = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._warm: Optional[asyncio.Task] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def _warm_up(self) -> None:
+        started = time.perf_counter()
+        await asyncio.to_thread(_import_llm_modules)
+        from email_templates import EmailTemplates
+        from pipeline import CompanyClassifier
+        from utils.clients import get_async_client
+        from utils.ratelimit import DEFAULT_MAX_RETRIES, configure_rate_limiter
+
+        # None means unset; 0 is a real setting (no retries), as in main.py
+        if self.limits["max_retries"] is None:
+            limits = dict(self.limits, max_retries=DEFAULT_MAX_RETRIES)
+        else:
+            limits = dict(self.limits)
+        configure_rate_limiter(**limits)
+        # The cache keeps results across requests; memoizing them in memory as well would grow forever
+        self.classifier = CompanyClassifier(
+            cache=self.cache,
+            preclassifier=self.preclassifier,
+            batch_size=self.classify_batch_size,
+            memoize=False,
+        )
+        self.templates = EmailTemplates() if self.email_templates else None
+        get_async_client()
+        self.warmup_s = time.perf_counter() - started
+        print(f"LLM client ready after {self.warmup_s:.2f}s")
+
+    async def ready(self) -> None:
+        """Wait until the LLM modules are loaded and the client is created."""
+        # Shield so a cancelled request doesn't cancel the shared warm-up
+        await asyncio.shield(self._warm)
+
+    async def _ready_for_request(self) -> None:
+        """`ready` for request handlers: a 503 if the warm-up failed."""
+        try:
+            await self.ready()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            raise _error(web.HTTPServiceUnavailable, f"The LLM client failed to start: {type(e).__name__}: {e}")
+
+    @property
+    def warm_up_error(self) -> Optional[BaseException]:
+        """Why the warm-up failed, or None if it succeeded or is still running."""
+        warm = self._warm
+        if warm is None or not warm.done() or warm.cancelled():
+            return None
+        return warm.exception()
+
+    @property
+    def is_ready(self) -> bool:
+        warm = self._warm
+        return warm is not None and warm.done() and not warm.cancelled() and warm.exception() is None
+
+    async def on_startup(self, _app: web.Application) -> None:
+        self.cache = open_classification_cache() if self.use_cache else None
+        self.preclassifier = load_preclassifier() if self.preclassify else None
+        self._queue = asyncio.Queue(maxsize=self.job_queue_size)
+        self._warm = asyncio.create_task(self._warm_up())
+        self._workers = [asyncio.create_task(self._job_worker()) for _ in range(self.job_workers)]
+
+    async def on_cleanup(self, _app: web.Application) -> None:
+        for task in [self._warm, *self._workers]:
+            task.cancel()
+        await asyncio.gather(self._warm, *self._workers, return_exceptions=True)
+        if "utils.clients" in sys.modules:
+            from utils.clients import aclose_clients
+
+            await aclose_clients()
+        if self.cache:
+            self.cache.close()
+
+    # Interactive endpoints
+
+    async def classify(self, request: web.Request) -> web.Response:
+        body = await _json_body(request)
+        record = _speaker(body)
+        if not record.company:
+            raise _error(web.HTTPBadRequest, "company is required")
+        await self._ready_for_request()
+        try:
+            classification = await self.classifier.classify(record.company, record.title)
+        except Exception as e:
+            raise _llm_error(e)
+        return web.json_response({"classification": classification, "excluded": check_exclusion(classification)})
+
+    async def generate_email(self, request: web.Request) -> web.Response:
+        """
+        Email for one speaker. A `classification` from /classify can be
+        passed back in to skip classifying again. Excluded companies get no
+        email.
+        """
+        from email_generator import gen_email
+
+        body = await _json_body(request)
+        record = _speaker(body)
+        classification = body.get("classification")
+        if classification is not None and not isinstance(classification, dict):
+            raise _error(web.HTTPBadRequest, "classification must be an object")
+        if not record.company and not classification:
+            raise _error(web.HTTPBadRequest, "company is required")
+        await self._ready_for_request()
+        try:
+            if not classification:
+                classification = await self.classifier.classify(record.company, record.title)
+            excluded = check_exclusion(classification)
+            email = None
+            if not excluded and self.templates:
+                email = await self.templates.email_for(
+                    record.name,
+                    record.title,
+                    record.company,
+                    classification,
+                    personalize=record.personalize,
+                )
+            elif not excluded:
+                email = await gen_email(record.name, record.title, classification)
+        except Exception as e:
+            raise _llm_error(e)
+        return web.json_response({"classification": classification, "excluded": excluded, "email": email})
+
+    # Bulk jobs
+
+    async def _job_rows(self, request: web.Request) -> List[SpeakerRecord]:
+        if request.content_type == "text/csv":
+            return [SpeakerRecord.from_row(row) for row in csv.DictReader(io.StringIO(await request.text()))]
+        body = await _json_body(request)
+        rows = body.get("rows") if isinstance(body, dict) else body
+        if not isinstance(rows, list):
+            raise _error(web.HTTPBadRequest, 'Send a list of speakers, {"rows": [...]}, or a text/csv body')
+        return [_speaker(row) for row in rows]
+
+    async def submit_job(self, request: web.Request) -> web.Response:
+        rows = await self._job_rows(request)
+        if not rows:
+            raise _error(web.HTTPBadRequest, "The job has no rows")
+        if self.warm_up_error is not None:
+            # Jobs would only be marked failed once a worker picked them up
+            get_metrics().inc("service_jobs_total", result="rejected")
+            raise _error(web.HTTPServiceUnavailable, f"The LLM client failed to start: {self.warm_up_error}")
+        if len(rows) > self.max_job_rows:
+            raise _error(web.HTTPRequestEntityTooLarge, f"Jobs are limited to {self.max_job_rows} rows",
+                         max_size=self.max_job_rows, actual_size=len(rows))
+        job_id = uuid.uuid4().hex
+        job = Job(
+            id=job_id,
+            rows=rows,
+            row_count=len(rows),
+            out_path=os.path.join(self.out_dir, "jobs", job_id, "email_output.csv"),
+        )
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            get_metrics().inc("service_jobs_total", result="rejected")
+            raise _error(web.HTTPServiceUnavailable, "The job queue is full; retry later", headers={"Retry-After": "30"})
+        get_metrics().inc("service_jobs_total", result="accepted")
+        self.jobs[job_id] = job
+        self._forget_old_jobs()
+        return web.json_response(job.as_dict(), status=202, headers={"Location": f"/jobs/{job_id}"})
+
+    def _forget_old_jobs(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished is not None]
+        for job_id in finished[: max(len(self.jobs) - self.max_jobs_kept, 0)]:
+            del self.jobs[job_id]
+
+    def _job(self, request: web.Request) -> Job:
+        job = self.jobs.get(request.match_info["job_id"])
+        if job is None:
+            raise _error(web.HTTPNotFound, "No such job")
+        return job
+
+    async def job_status(self, request: web.Request) -> web.Response:
+        return web.json_response(self._job(request).as_dict())
+
+    async def job_output(self, request: web.Request) -> web.StreamResponse:
+        job = self._job(request)
+        if job.status != "done":
+            raise _error(web.HTTPConflict, f"Job is {job.status}")
+        return web.FileResponse(job.out_path, headers={"Content-Type": "text/csv"})
+
+    async def _job_worker(self) -> None:
+        metrics = get_metrics()
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started = time.time()
+            self.running += 1
+            metrics.observe("service_job_wait", job.started - job.created)
+            dead_letters = DeadLetterFile(os.path.join(os.path.dirname(job.out_path), "dead_letter.jsonl"))
+            try:
+                # Inside the try: if the warm-up failed, each job fails rather than the worker
+                await self.ready()
+                from pipeline import run_pipeline
+
+                stats = await run_pipeline(
+                    job.rows,
+                    job.out_path,
+                    concurrency=self.concurrency,
+                    cache=self.cache,
+                    classify_batch_size=self.classify_batch_size,
+                    dead_letters=dead_letters,
+                    preclassifier=self.preclassifier,
+                    templates=self.templates,
+                    close_clients=False,
+                )
+            except asyncio.CancelledError:
+                job.status, job.error = "failed", "The service shut down"
+                raise
+            except Exception as e:
+                job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+                metrics.inc("service_jobs_total", result="failed")
+            else:
+                job.status, job.stats = "done", stats.as_dict()
+                metrics.inc("service_jobs_total", result="done")
+            finally:
+                job.finished = time.time()
+                job.failed_rows = dead_letters.count
+                # Only the output file is needed from here on
+                job.rows = []
+                dead_letters.close()
+                self.running -= 1
+                metrics.observe("service_job", job.finished - job.started)
+
+    # Operations
+
+    def gauges(self) -> Dict[str, float]:
+        gauges = {
+            "service_uptime_seconds": time.time() - self.started,
+            "service_ready": float(self.is_ready),
+            "service_jobs_queued": self._queue.qsize(),
+            "service_jobs_running": self.running,
+        }
+        if self.cache:
+            gauges["classify_cache_hit_rate"] = self.cache.hit_rate
+        return gauges
+
+    async def health(self, _request: web.Request) -> web.Response:
+        status, code = "ok", 200
+        if self.warm_up_error is not None:
+            # The LLM modules failed to load; requests would all fail
+            status, code = f"error: {self.warm_up_error}", 503
+        return web.json_response(
+            {
+                "status": status,
+                "ready": self.is_ready,
+                "warmup_s": self.warmup_s,
+                "uptime_s": time.time() - self.started,
+                "jobs_queued": self._queue.qsize(),
+                "jobs_running": self.running,
+            },
+            status=code,
+        )
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        if request.query.get("format") == "json":
+            return web.json_response(get_metrics().report(**self.gauges()))
+        return web.Response(text=get_metrics().to_prometheus(**self.gauges()), content_type="text/plain")
+
+    @web.middleware
+    async def _observe(self, request: web.Request, handler) -> web.StreamResponse:
+        route = request.match_info.route.name or "unmatched"
+        status = 500
+        started = time.perf_counter()
+        try:
+            response = await handler(request)
+            status = response.status
+            return response
+        except web.HTTPException as e:
+            status = e.status
+            raise
+        finally:
+            metrics = get_metrics()
+            metrics.observe(f"http_{route}", time.perf_counter() - started)
+            metrics.inc("http_requests_total", route=route, status=str(status))
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._observe], client_max_size=64 * 1024**2)
+        app.router.add_post("/classify", self.classify, name="classify")
+        app.router.add_post("/generate-email", self.generate_email, name="generate_email")
+        app.router.add_post("/jobs", self.submit_job, name="submit_job")
+        app.router.add_get("/jobs/{job_id}", self.job_status, name="job_status")
+        app.router.add_get("/jobs/{job_id}/output", self.job_output, name="job_output")
+        app.router.add_get("/health", self.health, name="health")
+        app.router.add_get("/metrics", self.metrics, name="metrics")
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve classification and email generation over HTTP.")
+    parser.add_argument("--host", default=os.getenv("SERVICE_HOST") or "127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVICE_PORT") or DEFAULT_PORT))
+    parser.add_argument(
+        "--job-workers",
+        type=int,
+        default=int(os.getenv("SERVICE_JOB_WORKERS") or DEFAULT_JOB_WORKERS),
+        help="Bulk jobs run at the same time",
+    )
+    parser.add_argument(
+        "--job-queue-size",
+        type=int,
+        default=int(os.getenv("SERVICE_JOB_QUEUE_SIZE") or DEFAULT_JOB_QUEUE_SIZE),
+        help="Bulk jobs that can wait for a worker; more are rejected with a 503",
+    )
+    parser.add_argument(
+        "--max-job-rows",
+        type=int,
+        default=int(os.getenv("SERVICE_MAX_JOB_ROWS") or DEFAULT_MAX_JOB_ROWS),
+        help="Largest bulk job accepted, in rows",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("PIPELINE_CONCURRENCY") or DEFAULT_CONCURRENCY),
+        help="Concurrent workers per stage within each bulk job",
+    )
+    parser.add_argument(
+        "--classify-batch-size",
+        type=int,
+        default=int(os.getenv("CLASSIFY_BATCH_SIZE") or 1),
+        help="Classify N companies per LLM request; concurrent /classify calls are batched too",
+    )
+    parser.add_argument(
+        "--out-dir",
+        default=os.getenv("PIPELINE_OUT_DIR") or os.path.join(os.path.dirname(__file__), "out"),
+        metavar="DIR",
+        help="Bulk job output goes to DIR/jobs/<job id>/ (default: out/)",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=float(os.getenv("LLM_RPM") or 0) or None,
+        help="LLM requests per minute budget (default: no local limit, back off on 429s)",
+    )
+    parser.add_argument(
+        "--tpm",
+        type=float,
+        default=float(os.getenv("LLM_TPM") or 0) or None,
+        help="LLM tokens per minute budget (default: no local limit, back off on 429s)",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=int(os.getenv("LLM_MAX_RETRIES")) if os.getenv("LLM_MAX_RETRIES") else None,
+        help="Retries per LLM call before a request fails; 0 disables retries (default: 6)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the classification cache")
+    parser.add_argument(
+        "--no-preclassify",
+        action="store_true",
+        help="Send every company to the LLM instead of classifying known companies locally first",
+    )
+    parser.add_argument(
+        "--email-templates",
+        action="store_true",
+        help="Fill per-category email templates instead of generating every email; "
+        "speakers with personalize set still get full generation",
+    )
+    args = parser.parse_args()
+    for name in ("job_workers", "job_queue_size", "max_job_rows", "concurrency", "classify_batch_size"):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name.replace('_', '-')} must be at least 1")
+    return args
+
+
+def main():
+    load_dotenv()
+    args = parse_args()
+    get_metrics().max_samples = DEFAULT_METRICS_WINDOW
+    service = Service(
+        out_dir=args.out_dir,
+        job_workers=args.job_workers,
+        job_queue_size=args.job_queue_size,
+        concurrency=args.concurrency,
+        classify_batch_size=args.classify_batch_size,
+        max_job_rows=args.max_job_rows,
+        use_cache=not args.no_cache,
+        preclassify=not args.no_preclassify,
+        email_templates=args.email_templates,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        max_retries=args.max_retries,
+    )
+    print(f"Serving on http://{args.host}:{args.port}")
+    web.run_app(service.app(), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+import os
+import csv
+import glob
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from email_templates import EmailTemplates, JsonlSampleWriter
+from pipeline import DEFAULT_CONCURRENCY, PipelineStats, run_pipeline
+from utils.cache import open_classification_cache
+from utils.checkpoint import CheckpointJournal, row_key
+from utils.csv_write import EmailCsvWriter, WriterGroup
+from utils.deadletter import DeadLetterFile
+from utils.metrics import Metrics, get_metrics
+from utils.normalize import normalize_company
+from utils.parquet_write import EmailParquetWriter, parquet_path_for, read_parquet_records
+from utils.preclassify import load_preclassifier
+from utils.ratelimit import DEFAULT_MAX_RETRIES, configure_rate_limiter
+from utils.records import SpeakerRecord
+
+
+def expand_inputs(patterns: Iterable[str]) -> List[Path]:
+    """Input files named by each path or glob, in argument order, without repeats."""
+    paths: List[Path] = []
+    for pattern in patterns:
+        if any(ch in pattern for ch in "*?["):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                raise FileNotFoundError(f"No input files match {pattern}")
+        else:
+            if not os.path.exists(pattern):
+                raise FileNotFoundError(f"Could not find CSV at {pattern}")
+            matches = [pattern]
+        for match in matches:
+            path = Path(match)
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+@dataclass
+class InputRows:
+    """Speaker rows from every input, deduplicated on (name, company)."""
+
+    rows: List[SpeakerRecord]
+    # Index into the input list of the file each row came from
+    sources: List[int]
+    duplicates: int = 0
+
+
+def read_inputs(paths: List[Path], *, limit: Optional[int] = None) -> InputRows:
+    """
+    Read every input CSV in order, keeping the first row for each
+    (speaker name, company) across all files. `limit` caps the number of
+    rows kept.
+    """
+    result = InputRows(rows=[], sources=[])
+    seen = set()
+    for source, path in enumerate(paths):
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if limit is not None and len(result.rows) >= limit:
+                    return result
+                record = SpeakerRecord.from_row(row)
+                key = row_key(record.name, record.company)
+                if key in seen:
+                    result.duplicates += 1
+                    continue
+                seen.add(key)
+                result.rows.append(record)
+                result.sources.append(source)
+    return result
+
+
+def plan_shards(rows: List[SpeakerRecord], shards: int) -> List[List[int]]:
+    """
+    Split row indices into at most `shards` groups of similar size.
+
+    All rows for one company (as keyed by `normalize_company`) go to the
+    same shard, so each company is classified once per run rather than once
+    per process. Companies are placed largest first on the least loaded
+    shard. Each shard's indices stay in input order; empty shards are
+    dropped.
+    """
+    by_company: Dict[str, List[int]] = {}
+    for index, row in enumerate(rows):
+        by_company.setdefault(normalize_company(row.company), []).append(index)
+
+    plan: List[List[int]] = [[] for _ in range(max(shards, 1))]
+    for indices in sorted(by_company.values(), key=len, reverse=True):
+        min(plan, key=len).extend(indices)
+    return [sorted(indices) for indices in plan if indices]
+
+
+@dataclass
+class ShardJob:
+    """Everything a worker process needs to run one shard through the pipeline."""
+
+    shard: int
+    rows: List[SpeakerRecord]
+    out_path: str
+    journal_path: str
+    dead_letter_path: str
+    resume: bool = False
+    concurrency: int = DEFAULT_CONCURRENCY
+    classify_batch_size: int = 1
+    rpm: Optional[float] = None
+    tpm: Optional[float] = None
+    max_retries: int = DEFAULT_MAX_RETRIES
+    use_cache: bool = True
+    refresh_cache: bool = False
+    preclassify: bool = True
+    email_templates: bool = False
+    template_sample_rate: float = 0.0
+    # Also write the shard as Parquet, next to `out_path`
+    parquet: bool = False
+
+
+def run_shard(job: ShardJob) -> Tuple[PipelineStats, Metrics]:
+    """
+    Run one shard on its own event loop, writing its rows to `job.out_path`.
+
+    Called in a worker process (or in-process for a single shard). Returns
+    the shard's stats and its metrics registry for the parent to combine.
+    """
+    load_dotenv()
+    configure_rate_limiter(rpm=job.rpm, tpm=job.tpm, max_retries=job.max_retries)
+    cache = open_classification_cache(refresh=job.refresh_cache) if job.use_cache else None
+    journal = CheckpointJournal(job.journal_path, resume=job.resume)
+    dead_letters = DeadLetterFile(job.dead_letter_path)
+    samples = JsonlSampleWriter(os.path.splitext(job.out_path)[0] + ".template_samples.jsonl")
+    templates = (
+        EmailTemplates(sample_rate=job.template_sample_rate, on_sample=samples) if job.email_templates else None
+    )
+    try:
+        stats = asyncio.run(
+            run_pipeline(
+                job.rows,
+                job.out_path,
+                concurrency=job.concurrency,
+                cache=cache,
+                classify_batch_size=job.classify_batch_size,
+                journal=journal,
+                dead_letters=dead_letters,
+                preclassifier=load_preclassifier() if job.preclassify else None,
+                templates=templates,
+                parquet_path=parquet_path_for(job.out_path) if job.parquet else None,
+            )
+        )
+        print(f"[shard {job.shard}] {stats.summary()}")
+        if cache:
+            print(f"[shard {job.shard}] {cache.summary()}")
+        if templates:
+            print(f"[shard {job.shard}] {templates.summary()}")
+            templates.write_json(os.path.splitext(job.out_path)[0] + ".email_templates.json")
+    finally:
+        if cache:
+            cache.close()
+        journal.close()
+        dead_letters.close()
+        samples.close()
+    return stats, get_metrics()
+
+
+def _output_paths(paths: List[Path], out_path: str, per_input: bool) -> List[str]:
+    """Merged output path, or one `<input stem>_email_output.csv` per input."""
+    if not per_input:
+        return [out_path]
+    out_dir = os.path.dirname(out_path)
+    names: List[str] = []
+    for path in paths:
+        name = f"{path.stem}_email_output.csv"
+        if name in names:
+            name = f"{path.stem}-{len(names)}_email_output.csv"
+        names.append(name)
+    return [os.path.join(out_dir, name) for name in names]
+
+
+def _output_writer(path: str, parquet: bool):
+    if parquet:
+        return WriterGroup(EmailCsvWriter(path), EmailParquetWriter(parquet_path_for(path)))
+    return EmailCsvWriter(path)
+
+
+def merge_shards(
+    inputs: InputRows,
+    shard_paths: List[str],
+    out_paths: List[str],
+    *,
+    parquet: bool = False,
+) -> None:
+    """
+    Merge shard outputs back into input order.
+
+    Rows are matched by (speaker name, company), which is unique after
+    `read_inputs`. With one output path everything goes there; otherwise
+    each row goes to the output of the input it came from. Rows missing
+    from every shard (failed rows) are skipped, as in a single-process run.
+    With `parquet`, rows are read from the shards' Parquet files (which
+    keep the company summary) and each output is written as Parquet too.
+    """
+    records: Dict[tuple, SpeakerRecord] = {}
+    for shard_path in shard_paths:
+        if parquet:
+            shard_records = read_parquet_records(parquet_path_for(shard_path))
+        else:
+            with open(shard_path, "r", newline="", encoding="utf-8") as f:
+                shard_records = [SpeakerRecord.from_output(record) for record in csv.DictReader(f)]
+        for record in shard_records:
+            records[row_key(record.name, record.company)] = record
+
+    writers = [_output_writer(path, parquet).open() for path in out_paths]
+    try:
+        for row, source in zip(inputs.rows, inputs.sources):
+            record = records.get(row_key(row.name, row.company))
+            if record is not None:
+                writers[source if len(writers) > 1 else 0].write(record)
+    except BaseException:
+        for writer in writers:
+            writer.close(commit=False)
+        raise
+    for writer in writers:
+        writer.close()
+
+
+def _merge_dead_letters(shard_paths: List[str], path: str) -> int:
+    """Concatenate the shards' dead-letter files into `path`; returns the row count."""
+    lines: List[str] = []
+    for shard_path in shard_paths:
+        if os.path.exists(shard_path):
+            with open(shard_path, "r", encoding="utf-8") as f:
+                lines.extend(line for line in f if line.strip())
+            os.remove(shard_path)
+    # Same as DeadLetterFile: no file unless a row failed in this run
+    if os.path.exists(path):
+        os.remove(path)
+    if lines:
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+    return len(lines)
+
+
+def run_sharded(
+    paths: List[Path],
+    out_path: str,
+    *,
+    workers: int,
+    per_input: bool = False,
+    limit: Optional[int] = None,
+    resume: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    classify_batch_size: int = 1,
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    use_cache: bool = True,
+    refresh_cache: bool = False,
+    preclassify: bool = True,
+    email_templates: bool = False,
+    template_sample_rate: float = 0.0,
+    parquet: bool = False,
+) -> PipelineStats:
+    """
+    Process several input files across a pool of `workers` processes.
+
+    Rows are read from all inputs, deduplicated on (name, company) and split
+    into shards by `plan_shards`. Each worker runs the usual async pipeline
+    on its shard with its own LLM clients, rate limiter (with `rpm`/`tpm`
+    divided evenly between workers), checkpoint journal and output shard
+    under `<out dir>/shards/`. The shards are then merged into `out_path`
+    in input order, or into one file per input with `per_input`. Shard
+    journals are kept for `resume`, which needs the same inputs and worker
+    count to find them. With `email_templates` each worker builds its own
+    templates, saved next to its shard. With `parquet` every output CSV
+    gets a Parquet copy (`.parquet` next to it) that includes the company
+    summary.
+    """
+    started = time.perf_counter()
+    inputs = read_inputs(paths, limit=limit)
+    plan = plan_shards(inputs.rows, workers)
+    out_dir = os.path.dirname(out_path)
+    shard_dir = os.path.join(out_dir, "shards")
+    os.makedirs(shard_dir, exist_ok=True)
+
+    jobs = [
+        ShardJob(
+            shard=shard,
+            rows=[inputs.rows[i] for i in indices],
+            out_path=os.path.join(shard_dir, f"shard-{shard}.csv"),
+            journal_path=os.path.join(shard_dir, f"shard-{shard}.checkpoint.jsonl"),
+            dead_letter_path=os.path.join(shard_dir, f"shard-{shard}.dead_letter.jsonl"),
+            resume=resume,
+            concurrency=concurrency,
+            classify_batch_size=classify_batch_size,
+            rpm=rpm / len(plan) if rpm else None,
+            tpm=tpm / len(plan) if tpm else None,
+            max_retries=max_retries,
+            use_cache=use_cache,
+            refresh_cache=refresh_cache,
+            preclassify=preclassify,
+            email_templates=email_templates,
+            template_sample_rate=template_sample_rate,
+            parquet=parquet,
+        )
+        for shard, indices in enumerate(plan)
+    ]
+    print(f"Split {len(inputs.rows)} rows from {len(paths)} input(s) into {len(jobs)} shard(s)")
+
+    if len(jobs) > 1:
+        # spawn: workers start clean instead of inheriting the parent's clients and event loop
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(jobs), mp_context=context) as pool:
+            results = list(pool.map(run_shard, jobs))
+        for _stats, metrics in results:
+            get_metrics().merge(metrics)
+    else:
+        results = [run_shard(job) for job in jobs]
+
+    merge_shards(inputs, [job.out_path for job in jobs], _output_paths(paths, out_path, per_input), parquet=parquet)
+    for job in jobs:
+        os.remove(job.out_path)
+        if parquet:
+            os.remove(parquet_path_for(job.out_path))
+    dead_letter_path = os.path.join(out_dir, "dead_letter.jsonl")
+    failed = _merge_dead_letters([job.dead_letter_path for job in jobs], dead_letter_path)
+    if failed:
+        print(f"{failed} rows failed after retries; see {dead_letter_path}")
+
+    total = PipelineStats(duplicates=inputs.duplicates, rows=inputs.duplicates)
+    for stats, _metrics in results:
+        for field in fields(PipelineStats):
+            if field.name != "elapsed":
+                setattr(total, field.name, getattr(total, field.name) + getattr(stats, field.name))
+    total.elapsed = time.perf_counter() - started
+    return total
@@ -0,0 +1,81 @@
+import sys
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench.fake_llm import FakeLLM, FakeLLMConfig, parse_latency
+import utils.clients
+import utils.metrics
+import utils.ratelimit
+
+
+class ServerThread:
+    """An aiohttp app served from its own event loop in a background thread.
+
+    Tests run their code with `asyncio.run`, one loop per test, so a server
+    shared by the whole session needs a loop of its own.
+    """
+
+    def __init__(self, app: web.Application):
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.runner = web.AppRunner(app, access_log=None)
+        self.url = ""
+
+    def start(self) -> "ServerThread":
+        self.thread.start()
+
+        async def serve() -> str:
+            await self.runner.setup()
+            site = web.TCPSite(self.runner, "127.0.0.1", 0)
+            await site.start()
+            host, port = self.runner.addresses[0][:2]
+            return f"http://{host}:{port}"
+
+        self.url = asyncio.run_coroutine_threadsafe(serve(), self.loop).result(10)
+        return self
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result(10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(10)
+
+
+@pytest.fixture(scope="session")
+def fake_llm_server():
+    fake = FakeLLM(FakeLLMConfig(latency=parse_latency("fixed:1"), seed=1))
+    server = ServerThread(fake.app()).start()
+    server.fake = fake
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fake_llm(fake_llm_server, monkeypatch, tmp_path):
+    """The fake LLM server, with the OpenAI clients pointed at it and fault injection off."""
+    fake = fake_llm_server.fake
+    fake.config = FakeLLMConfig(latency=parse_latency("fixed:1"), seed=1)
+    fake.reset()
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{fake_llm_server.url}/v1")
+    monkeypatch.setenv("MODEL_NAME", "test-model")
+    monkeypatch.setenv("CLASSIFY_CACHE_PATH", str(tmp_path / "classifications.sqlite"))
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def fresh_globals(monkeypatch):
+    """Process-wide singletons start clean for every test."""
+    monkeypatch.setattr(utils.metrics, "_metrics", utils.metrics.Metrics())
+    monkeypatch.setattr(utils.ratelimit, "_limiter", utils.ratelimit.RateLimiter(max_retries=2, base_delay=0.01))
+    yield
+    # Clients left open belong to a loop that is already closed; drop them
+    utils.clients._client = None
+    utils.clients._async_client = None
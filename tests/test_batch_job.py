@@ -0,0 +1,82 @@
+import csv
+import json
+import time
+
+from batch_job import run_batch_job
+from bench.fake_llm import FakeLLM, FakeLLMConfig
+from utils.batch_api import LocalBatchTransport
+
+ROWS = [
+    {"Speaker Name": "Ana", "Speaker Title": "CEO", "Speaker Company": "Acme Builders"},
+    {"Speaker Name": "Ben", "Speaker Title": "VP", "Speaker Company": "Trimble"},
+    {"Speaker Name": "Cai", "Speaker Title": "PM", "Speaker Company": "ACME Builders Inc."},
+    {"Speaker Name": "Dee", "Speaker Title": "CTO", "Speaker Company": "Broken Co"},
+    {"Speaker Name": "Eve", "Speaker Title": "Director", "Speaker Company": "City Airport"},
+]
+
+
+def respond_like_fake_llm(body: dict) -> dict:
+    """Chat completion bodies from the fake LLM's canned replies; fails for "Broken Co"."""
+    fake = FakeLLM(FakeLLMConfig())
+    messages = body["messages"]
+    if "Broken Co" in messages[-1]["content"]:
+        raise RuntimeError("model overloaded")
+    content = fake.content_for(fake.request_kind(messages), messages)
+    return {
+        "id": "chatcmpl-local",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model") or "test-model",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": fake.usage(messages, content),
+    }
+
+
+class SlowBatchTransport(LocalBatchTransport):
+    """Reports each batch as in progress for the first `polls` status checks."""
+
+    def __init__(self, respond, *, polls: int):
+        super().__init__(respond)
+        self.polls = polls
+        self.status_checks = 0
+
+    def status(self, batch_id: str) -> str:
+        self.status_checks += 1
+        if self.status_checks % (self.polls + 1):
+            return "in_progress"
+        return super().status(batch_id)
+
+
+def test_batch_job_submits_polls_and_merges_by_custom_id(tmp_path):
+    out = tmp_path / "email_output.csv"
+    transport = SlowBatchTransport(respond_like_fake_llm, polls=2)
+    stats = run_batch_job(
+        ROWS,
+        str(out),
+        transport=transport,
+        job_dir=tmp_path / "batch",
+        poll_interval=0,
+    )
+
+    # Spelling variants of one company share a classification request
+    with open(tmp_path / "batch" / "classify_requests.jsonl", encoding="utf-8") as f:
+        classify_ids = [json.loads(line)["custom_id"] for line in f]
+    assert len(classify_ids) == 4
+    # Competitors get no email request; the failed company never reaches the email stage
+    with open(tmp_path / "batch" / "email_requests.jsonl", encoding="utf-8") as f:
+        email_ids = [json.loads(line)["custom_id"] for line in f]
+    assert email_ids == ["email-0", "email-2", "email-4"]
+
+    with open(out, newline="", encoding="utf-8") as f:
+        output = list(csv.DictReader(f))
+    assert [row["Speaker Name"] for row in output] == ["Ana", "Ben", "Cai", "Eve"]
+    by_name = {row["Speaker Name"]: row for row in output}
+    assert by_name["Ben"]["Company Category"] == "Competitor"
+    assert by_name["Ben"]["Email Body"] == ""
+    assert by_name["Eve"]["Company Category"] == "Owner"
+    assert by_name["Eve"]["Email Subject"] == "Eve, see your jobsite from above"
+    assert by_name["Cai"]["Email Subject"] == "Cai, see your jobsite from above"
+
+    # Both stages polled until their batch completed
+    assert transport.status_checks == 6
+    assert (stats.rows, stats.emails, stats.excluded, stats.errors) == (5, 3, 1, 1)
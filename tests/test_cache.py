@@ -0,0 +1,85 @@
+import time
+import sqlite3
+
+from utils.cache import ClassificationCache
+
+CLASSIFICATION = {"company": "Acme Builders", "summary": "Builds things.", "category": "Builder"}
+
+
+def open_cache(path, **kwargs) -> ClassificationCache:
+    return ClassificationCache(path, prompt="prompt", model="model", **kwargs)
+
+
+def test_lookups_do_not_open_a_write_transaction(tmp_path):
+    cache = open_cache(tmp_path / "cache.sqlite")
+    cache.set("Acme Builders", CLASSIFICATION)
+    assert cache.get("ACME Builders Inc.") == CLASSIFICATION
+    assert not cache._db.in_transaction
+    cache.close()
+
+
+def test_access_times_are_written_back_with_the_next_write(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = open_cache(path)
+    companies = ["Acme Builders", "Beta Owners", "Gamma Partners"]
+    for company in companies:
+        cache.set(company, {**CLASSIFICATION, "company": company})
+
+    def accessed() -> list:
+        with sqlite3.connect(path) as db:
+            return [row[0] for row in db.execute("SELECT accessed FROM classifications ORDER BY company")]
+
+    before = accessed()
+    time.sleep(0.01)
+    for company in companies:
+        cache.get(company)
+    assert accessed() == before
+    cache.set("Delta Co", {**CLASSIFICATION, "company": "Delta Co"})
+    assert all(after > earlier for after, earlier in zip(accessed(), before))
+    cache.close()
+
+
+def test_hits_stay_fast_while_another_process_holds_the_write_lock(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = open_cache(path)
+    companies = [f"Company {i}" for i in range(300)]
+    for company in companies:
+        cache.set(company, {**CLASSIFICATION, "company": company})
+
+    other = sqlite3.connect(path)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.perf_counter()
+        for _ in range(2):
+            for company in companies:
+                assert cache.get(company)["company"] == company
+        assert time.perf_counter() - started < 1
+    finally:
+        other.rollback()
+        other.close()
+    assert cache.hits == 600
+    # The access times are still pending and go out with the next write
+    assert len(cache._touched) == 300
+    cache.set("Delta Co", {**CLASSIFICATION, "company": "Delta Co"})
+    assert not cache._touched
+    cache.close()
+
+
+def test_a_held_write_lock_does_not_stall_writes(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = open_cache(path, busy_timeout=0.2)
+    cache.set("Acme Builders", CLASSIFICATION)
+
+    other = sqlite3.connect(path)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.perf_counter()
+        assert cache.get("Acme Builders") == CLASSIFICATION
+        cache.set("Other Co", {**CLASSIFICATION, "company": "Other Co"})
+        assert time.perf_counter() - started < 2
+    finally:
+        other.rollback()
+        other.close()
+    # The skipped write is a miss, not an error
+    assert cache.get("Other Co") is None
+    cache.close()
@@ -0,0 +1,62 @@
+import json
+import asyncio
+from types import SimpleNamespace
+
+from classifier import _to_batch_classifications, aclassify_companies
+from utils.clients import aclose_clients
+
+ITEMS = [("Acme Builders", "CEO"), ("Trimble Inc.", None), ("City Airport", "Director")]
+
+
+def reply(results) -> SimpleNamespace:
+    message = SimpleNamespace(content=json.dumps({"results": results}))
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def result(index, company, category):
+    entry = {"company": company, "summary": f"{company} summary.", "category": category}
+    if index is not None:
+        entry["index"] = index
+    return entry
+
+
+def test_results_are_matched_by_index():
+    results = _to_batch_classifications(
+        reply([result(3, "City Airport", "Owner"), result(1, "Acme Builders", "Builder"), result(2, "Trimble", "Competitor")]),
+        ITEMS,
+    )
+    assert [r["category"] for r in results] == ["Builder", "Competitor", "Owner"]
+    assert [r["company"] for r in results] == ["Acme Builders", "Trimble Inc.", "City Airport"]
+
+
+def test_an_omitted_item_is_not_filled_from_its_neighbour():
+    # The model skipped item 2 and numbered nothing; positions no longer line up
+    results = _to_batch_classifications(
+        reply([result(None, "Acme Builders", "Builder"), result(None, "City Airport", "Owner")]),
+        ITEMS,
+    )
+    assert results[0]["category"] == "Builder"
+    assert results[1] is None
+    assert results[2]["category"] == "Owner"
+
+
+def test_a_result_echoing_another_company_is_rejected():
+    results = _to_batch_classifications(
+        reply([result(1, "Acme Builders", "Builder"), result(2, "City Airport", "Owner"), result(3, "Trimble", "Competitor")]),
+        ITEMS,
+    )
+    assert results[0]["category"] == "Builder"
+    assert results[1] is None
+    assert results[2] is None
+
+
+def test_batch_classification_through_the_fake_llm(fake_llm):
+    async def run():
+        try:
+            return await aclassify_companies([("Acme Builders", None), ("Trimble", None), ("Skyline Drone Data", None)])
+        finally:
+            await aclose_clients()
+
+    results = asyncio.run(run())
+    assert [r["category"] for r in results] == ["Builder", "Competitor", "Partner"]
+    assert fake_llm.stats()["by_kind"] == {"classify_batch": 1}
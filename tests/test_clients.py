@@ -0,0 +1,50 @@
+import asyncio
+
+from classifier import aclassify_company, classify_company
+from pipeline import run_pipeline
+from utils.clients import aclose_clients, close_clients
+
+
+def test_async_calls_reuse_pooled_connections(fake_llm):
+    async def run():
+        try:
+            for i in range(10):
+                await aclassify_company(f"Sequential Co {i}")
+            sequential = fake_llm.stats()["connections"]
+            await asyncio.gather(*(aclassify_company(f"Concurrent Co {i}") for i in range(20)))
+        finally:
+            await aclose_clients()
+        return sequential
+
+    sequential = asyncio.run(run())
+    stats = fake_llm.stats()
+    assert stats["requests"] == 30
+    # One kept-alive connection serves every sequential call
+    assert sequential == 1
+    # Concurrent calls open at most one connection each, reusing the idle one
+    assert stats["connections"] <= 20
+
+
+def test_sync_client_reuses_its_connection(fake_llm):
+    try:
+        for i in range(5):
+            classify_company(f"Sync Co {i}")
+    finally:
+        close_clients()
+    stats = fake_llm.stats()
+    assert stats["requests"] == 5
+    assert stats["connections"] == 1
+
+
+def test_a_pipeline_run_stays_within_the_connection_pool(fake_llm, tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_MAX_CONNECTIONS", "8")
+    rows = [
+        {"Speaker Name": f"Person {i}", "Speaker Title": "Engineer", "Speaker Company": f"Harper Group {i}"}
+        for i in range(300)
+    ]
+    # More workers than pooled connections, so requests queue for the pool
+    stats = asyncio.run(run_pipeline(rows, str(tmp_path / "email_output.csv"), concurrency=16))
+    assert stats.emails == 300
+    server = fake_llm.stats()
+    assert server["requests"] == 600
+    assert server["connections"] <= 8
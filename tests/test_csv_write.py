@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils.csv_write import AsyncCsvSink, EmailCsvWriter, WriterGroup
+from utils.parquet_write import EmailParquetWriter
+
+
+class SlowWriter(EmailCsvWriter):
+    def __init__(self, out_path: str):
+        super().__init__(out_path)
+        self.started = threading.Event()
+        self.writing = False
+
+    def write_many(self, records):
+        self.writing = True
+        self.started.set()
+        threading.Event().wait(0.2)
+        super().write_many(records)
+        self.writing = False
+
+
+class FailingParquetWriter(EmailParquetWriter):
+    def prepare(self):
+        raise OSError("disk full")
+
+
+class UnopenableWriter(EmailParquetWriter):
+    def open(self):
+        raise OSError("read-only file system")
+
+
+def test_writer_group_keeps_old_outputs_if_any_writer_fails_to_finish(tmp_path):
+    csv_path, parquet_path = tmp_path / "email_output.csv", tmp_path / "email_output.parquet"
+    csv_path.write_text("old run\n", encoding="utf-8")
+    group = WriterGroup(EmailCsvWriter(str(csv_path)), FailingParquetWriter(str(parquet_path))).open()
+    group.write({"Speaker Name": "Ana"})
+    with pytest.raises(OSError):
+        group.close()
+    assert csv_path.read_text(encoding="utf-8") == "old run\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["email_output.csv"]
+
+
+def test_writer_group_discards_opened_writers_if_one_fails_to_open(tmp_path):
+    group = WriterGroup(EmailCsvWriter(str(tmp_path / "email_output.csv")), UnopenableWriter(str(tmp_path / "out.parquet")))
+    with pytest.raises(OSError):
+        group.open()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sink_waits_for_the_batch_in_flight_when_the_block_fails(tmp_path):
+    out = tmp_path / "email_output.csv"
+    writer = SlowWriter(str(out))
+
+    async def run() -> None:
+        sink = AsyncCsvSink(writer)
+        with pytest.raises(RuntimeError):
+            async with sink:
+                await sink.put({"Speaker Name": "Ana"})
+                await asyncio.to_thread(writer.started.wait, 5)
+                raise RuntimeError("pipeline failed")
+        # Checked before asyncio.run joins the worker threads
+        assert sink._task.done()
+        assert not writer.writing
+
+    writer.open()
+    asyncio.run(run())
+    assert writer.rows == 1
+    writer.close(commit=False)
+    assert not out.exists()
@@ -0,0 +1,93 @@
+import json
+import asyncio
+
+import pytest
+
+from classifier import _build_batch_messages, _build_messages
+from email_generator import EMAIL_SYSTEM_PROMPT, _build_email_messages, _EmailFieldScanner, generate_email_stream
+from utils.clients import get_async_client
+from utils.metrics import get_metrics
+
+CALLS = [
+    ("Ana Lopez", "Head of Digital", {"company": "Northgate Construction", "summary": "A contractor.", "category": "Builder"}),
+    ("Cai Jones", "Estates Director", {"company": "City Airport", "summary": "Runs an airport.", "category": "Owner"}),
+    ("", "", '{"company": "Harper Ltd", "summary": "", "category": "Other"}'),
+]
+
+
+def test_email_system_message_is_a_byte_identical_prefix():
+    messages = [_build_email_messages(name, title, data) for name, title, data in CALLS]
+    systems = {m[0]["content"].encode("utf-8") for m in messages}
+    assert systems == {EMAIL_SYSTEM_PROMPT.encode("utf-8")}
+    assert all(m[0]["role"] == "system" for m in messages)
+    # Per-speaker details only ever appear after the shared prefix
+    for (name, _title, data), m in zip(CALLS, messages):
+        assert m[-1]["role"] == "user"
+        assert "City Airport" not in m[0]["content"]
+        if name:
+            assert name in m[-1]["content"]
+
+
+def test_classifier_system_messages_do_not_vary_by_company():
+    single = {_build_messages(company, title)[0]["content"] for company, title in [("Acme", "CEO"), ("City Airport", None)]}
+    batch = {
+        _build_batch_messages(items)[0]["content"]
+        for items in ([("Acme", "CEO")], [("City Airport", None), ("Harper Ltd", "CTO")])
+    }
+    assert len(single) == 1
+    assert len(batch) == 1
+    assert single.pop() in batch.pop()
+
+
+STREAMED = json.dumps(
+    {"subject": 'Zoë, "see" it from above \U0001f681', "body": "Hi Zoë,\nline two \\ done.\tBye"}
+)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 16])
+def test_scanner_reports_fields_as_chunks_arrive(size):
+    # json.dumps escapes the quotes, newline, backslash, tab and non-ASCII text, so
+    # small chunks split \" and \uXXXX escapes (and surrogate pairs) across feeds
+    seen = []
+    scanner = _EmailFieldScanner(lambda name, value: seen.append((name, value, len(scanner.text))))
+    for i in range(0, len(STREAMED), size):
+        scanner.feed(STREAMED[i : i + size])
+
+    expected = json.loads(STREAMED)
+    assert scanner.fields == expected
+    assert [(name, value) for name, value, _ in seen] == list(expected.items())
+    # The subject was reported as soon as its closing quote arrived, well before the reply ended
+    subject_end = STREAMED.index('", "body"') + 1
+    assert subject_end <= seen[0][2] < subject_end + size
+    assert seen[0][2] < len(STREAMED)
+
+
+def test_scanner_handles_raw_multibyte_text_split_across_chunks():
+    text = json.dumps({"subject": "Zoë 🚁", "body": "Grüße"}, ensure_ascii=False)
+    scanner = _EmailFieldScanner()
+    for ch in text:
+        scanner.feed(ch)
+    assert scanner.fields == {"subject": "Zoë 🚁", "body": "Grüße"}
+
+
+def test_generate_email_stream_against_the_fake_llm(fake_llm):
+    seen = []
+
+    async def run():
+        return await generate_email_stream(
+            get_async_client(),
+            speaker_name="Zoë Okafor",
+            speaker_title="CEO",
+            data={"company": "Harper Group", "summary": "Harper builds bridges.", "category": "Builder"},
+            on_field=lambda name, value: seen.append((name, value)),
+        )
+
+    email = asyncio.run(run())
+    assert email["subject"] == "Zoë Okafor, see your jobsite from above"
+    assert email["body"].startswith("Hi Zoë Okafor, DroneDeploy")
+    assert seen == [("subject", email["subject"]), ("body", email["body"])]
+    assert fake_llm.stats()["by_kind"] == {"email": 1}
+
+    metrics = get_metrics()
+    assert metrics.observed["email_ttft"] == metrics.observed["email_ttlt"] == 1
+    assert 0 < metrics.latencies["email_ttft"][0] <= metrics.latencies["email_ttlt"][0]
@@ -0,0 +1,35 @@
+import asyncio
+
+from email_templates import EmailTemplates
+
+
+def test_rows_without_a_summary_are_still_templated(fake_llm):
+    templates = EmailTemplates()
+
+    async def run() -> list:
+        return [
+            await templates.email_for("Ana Lopez", "CEO", "Northgate Construction", {"category": "Builder", "summary": ""}),
+            await templates.email_for("Ben Okafor", "CTO", "Harper Ltd", {"category": "Builder", "summary": "Harper builds bridges."}),
+        ]
+
+    first, second = asyncio.run(run())
+    assert first["body"].startswith("Hi Ana, Northgate Construction delivers construction projects.")
+    assert second["body"].startswith("Hi Ben, Harper builds bridges.")
+    assert (templates.filled, templates.fallbacks) == (2, 0)
+    assert fake_llm.stats()["by_kind"] == {"email_template": 1}
+
+
+def test_tokens_saved_is_never_negative(fake_llm):
+    templates = EmailTemplates()
+
+    async def run() -> None:
+        for category in ("Builder", "Owner", "Partner"):
+            await templates.template_for(category)
+        await templates.email_for("Ana Lopez", "CEO", "Northgate Construction", {"category": "Owner", "summary": "x"})
+
+    asyncio.run(run())
+    report = templates.report()
+    # One filled row doesn't pay for three template calls
+    assert report["email_template_tokens_avoided"] < report["email_template_tokens_spent"]
+    assert report["email_template_tokens_saved"] == 0
+    assert "more tokens than they saved" in templates.summary()
@@ -0,0 +1,23 @@
+from utils.metrics import Metrics
+
+
+def test_prometheus_sum_and_count_cover_the_whole_lifetime():
+    metrics = Metrics(max_samples=10)
+    for _ in range(100):
+        metrics.observe("email", 0.5)
+    assert len(metrics.latencies["email"]) < 20
+    text = metrics.to_prometheus()
+    assert 'dd_outreach_stage_latency_seconds_count{stage="email"} 100' in text
+    assert 'dd_outreach_stage_latency_seconds_sum{stage="email"} 50.0' in text
+    assert metrics.stage_summary("email")["count"] == 100
+
+
+def test_merge_adds_lifetime_totals():
+    worker = Metrics()
+    worker.observe("classify", 1.0)
+    worker.observe("classify", 2.0)
+    total = Metrics(max_samples=1)
+    total.observe("classify", 3.0)
+    total.merge(worker)
+    summary = total.stage_summary("classify")
+    assert (summary["count"], summary["total_s"], summary["mean_s"]) == (3, 6.0, 2.0)
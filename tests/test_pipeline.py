@@ -0,0 +1,135 @@
+import csv
+import asyncio
+
+import pytest
+
+from bench.fake_llm import parse_latency
+from pipeline import run_pipeline
+from utils.checkpoint import CheckpointJournal
+from utils.deadletter import DeadLetterFile
+
+
+def speakers(count: int, company: str = "Co {i}") -> list:
+    return [
+        {"Speaker Name": f"Person {i}", "Speaker Title": "Engineer", "Speaker Company": company.format(i=i % 5)}
+        for i in range(count)
+    ]
+
+
+def read_output(path) -> list:
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+class FailingJournal(CheckpointJournal):
+    def record(self, name, company, stage, value):
+        if stage == "record":
+            raise OSError("disk full")
+        super().record(name, company, stage, value)
+
+
+class FailingDeadLetters(DeadLetterFile):
+    def add(self, row, stage, error):
+        raise OSError("dead letter file is gone")
+
+
+def test_rows_are_written_in_input_order(fake_llm, tmp_path):
+    out = tmp_path / "email_output.csv"
+    stats = asyncio.run(run_pipeline(speakers(20), str(out), concurrency=4))
+    assert stats.emails == 20
+    assert [row["Speaker Name"] for row in read_output(out)] == [f"Person {i}" for i in range(20)]
+
+
+def test_repeated_rows_are_kept_unless_deduped(fake_llm, tmp_path):
+    rows = speakers(3) + speakers(2)
+    out = tmp_path / "email_output.csv"
+    stats = asyncio.run(run_pipeline(rows, str(out)))
+    assert (stats.emails, stats.duplicates) == (5, 0)
+    assert len(read_output(out)) == 5
+
+    stats = asyncio.run(run_pipeline(rows, str(out), dedupe=True))
+    assert (stats.emails, stats.duplicates) == (3, 2)
+    assert [row["Speaker Name"] for row in read_output(out)] == ["Person 0", "Person 1", "Person 2"]
+
+
+def test_failure_after_the_llm_call_dead_letters_the_row(fake_llm, tmp_path):
+    out = tmp_path / "email_output.csv"
+    journal = FailingJournal(str(tmp_path / "checkpoint.jsonl"))
+    dead_letters = DeadLetterFile(str(tmp_path / "dead_letter.jsonl"))
+    stats = asyncio.run(
+        asyncio.wait_for(
+            run_pipeline(speakers(10), str(out), concurrency=2, journal=journal, dead_letters=dead_letters),
+            timeout=10,
+        )
+    )
+    journal.close()
+    dead_letters.close()
+    assert stats.errors == 10
+    assert stats.emails == 0
+    assert dead_letters.count == 10
+    assert read_output(out) == []
+
+
+def test_a_dead_worker_fails_the_run_instead_of_hanging(fake_llm, tmp_path):
+    fake_llm.config.error_rate = 1.0
+    dead_letters = FailingDeadLetters(str(tmp_path / "dead_letter.jsonl"))
+    with pytest.raises((OSError, RuntimeError)):
+        asyncio.run(
+            asyncio.wait_for(
+                run_pipeline(speakers(20), str(tmp_path / "email_output.csv"), concurrency=1, dead_letters=dead_letters),
+                timeout=10,
+            )
+        )
+
+
+def test_an_async_source_is_pulled_no_faster_than_the_queue_drains(fake_llm, tmp_path):
+    fake_llm.config.latency = parse_latency("fixed:20")
+    leads = []
+
+    async def source():
+        for i in range(30):
+            # Rows handed over but not yet sent for classification
+            leads.append(i - fake_llm.stats()["by_kind"].get("classify", 0))
+            yield {"Speaker Name": f"Person {i}", "Speaker Title": "Engineer", "Speaker Company": f"Co {i}"}
+
+    out = tmp_path / "email_output.csv"
+    stats = asyncio.run(run_pipeline(source(), str(out), concurrency=1))
+    assert stats.emails == 30
+    assert [row["Speaker Name"] for row in read_output(out)] == [f"Person {i}" for i in range(30)]
+    # At most the classification queue (2 rows), the row being fed and one
+    # row a worker has taken but not sent yet
+    assert max(leads) <= 4
+
+
+def test_an_async_source_is_closed_when_a_stage_fails(fake_llm, tmp_path):
+    fake_llm.config.error_rate = 1.0
+    dead_letters = FailingDeadLetters(str(tmp_path / "dead_letter.jsonl"))
+    pulled = []
+    closed = []
+
+    async def source():
+        try:
+            for i in range(100):
+                pulled.append(i)
+                yield {"Speaker Name": f"Person {i}", "Speaker Title": "Engineer", "Speaker Company": f"Co {i}"}
+        finally:
+            closed.append(True)
+
+    async def run():
+        rows = source()
+        with pytest.raises((OSError, RuntimeError)):
+            await asyncio.wait_for(
+                run_pipeline(rows, str(tmp_path / "email_output.csv"), concurrency=1, dead_letters=dead_letters),
+                timeout=10,
+            )
+        # Closed by the run itself, not by asyncio.run's shutdown
+        assert closed == [True]
+        assert rows.ag_running is False and rows.ag_frame is None
+
+    asyncio.run(run())
+    assert len(pulled) < 100
+
+
+def test_concurrency_must_be_positive(tmp_path):
+    with pytest.raises(ValueError):
+        asyncio.run(run_pipeline(speakers(1), str(tmp_path / "email_output.csv"), concurrency=0))
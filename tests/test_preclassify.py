@@ -0,0 +1,24 @@
+import json
+
+from utils.preclassify import DEFAULT_MIN_CONFIDENCE, DEFAULT_RULES_PATH, PreClassifier
+
+
+def test_keyword_rules_fill_in_a_summary_for_the_company():
+    result = PreClassifier.from_file().lookup("Northgate Construction Ltd")
+    assert result["category"] == "Builder"
+    assert result["summary"] == "Northgate Construction Ltd is a construction contractor."
+
+
+def test_every_rule_has_a_summary_and_clears_the_threshold():
+    with open(DEFAULT_RULES_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    rules = data["aliases"] + data["keywords"]
+    assert all(rule.get("summary") for rule in rules)
+    assert all(rule["confidence"] > DEFAULT_MIN_CONFIDENCE for rule in rules)
+
+
+def test_generic_words_are_left_to_the_llm():
+    preclassifier = PreClassifier.from_file()
+    assert preclassifier.classify("Skyline Drone Services") is None
+    assert preclassifier.classify("Harper Engineering") is None
+    assert preclassifier.classify("Harper Civil Engineering").category == "Builder"
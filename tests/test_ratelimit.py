@@ -0,0 +1,20 @@
+import time
+import asyncio
+
+from utils.ratelimit import RateLimiter
+
+
+def test_limiter_is_reusable_across_event_loops():
+    limiter = RateLimiter()
+
+    async def call() -> str:
+        await asyncio.sleep(0)
+        return "ok"
+
+    async def run() -> list:
+        # Makes every caller wait, so the limiter's lock is contended on this loop
+        limiter._resume_at = time.monotonic() + 0.02
+        return await asyncio.gather(*(limiter.call(call, tokens=1) for _ in range(3)))
+
+    assert asyncio.run(run()) == ["ok"] * 3
+    assert asyncio.run(run()) == ["ok"] * 3
@@ -0,0 +1,39 @@
+import pytest
+
+from utils.metrics import get_metrics
+from utils.safeparse import decode_json, safe_parse_json
+
+EMAIL = {"subject": "a", "body": "b"}
+
+
+@pytest.mark.parametrize(
+    "content, expected, how",
+    [
+        ('{"subject": "a", "body": "b"}', EMAIL, "strict"),
+        ('  [1, 2]\n', [1, 2], "strict"),
+        ('```json\n{"subject": "a", "body": "b"}\n```', EMAIL, "fenced"),
+        ('Here you go:\n```\n{"subject": "a", "body": "b"}\n```\nEnjoy!', EMAIL, "fenced"),
+        ('Sure, here it is: {"subject": "a", "body": "b"} Let me know!', EMAIL, "scanned"),
+        ('```json {"subject":"a","body":"b"}```\nHope this helps', EMAIL, "scanned"),
+        ('Sure! ```python\nx=1\n``` then {"a":1}', {"a": 1}, "scanned"),
+        ('{"subject": "a", "bo', None, "failed"),
+        ('```json\n{"subject": "a", "body": "b"', None, "failed"),
+        ("No JSON here", None, "failed"),
+    ],
+)
+def test_decode_json(content, expected, how):
+    assert decode_json(content) == expected
+    assert get_metrics().counter("json_decode_total", result=how) == 1
+
+
+def test_decoded_values_pass_through():
+    assert decode_json(EMAIL) is EMAIL
+    assert decode_json(None) is None
+
+
+def test_safe_parse_json_falls_back_to_a_placeholder():
+    assert safe_parse_json('{"subject": "a", "bo') == {
+        "summary": '{"subject": "a", "bo',
+        "category": "Other",
+        "exclusion": "none",
+    }
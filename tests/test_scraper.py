@@ -0,0 +1,95 @@
+import asyncio
+import hashlib
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+
+from utils import scraper
+from utils.http_cache import HttpCache
+from utils.scraper import crawl_speakers
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "speakers"
+PAGES = {
+    "/speakers/": "page1.html",
+    "/speakers/page/2/": "page2.html",
+    "/speakers/page/3/": "page3.html",
+    "/speakers/ben-okafor/": "ben-okafor.html",
+}
+
+
+def fixture_app(log: list) -> web.Application:
+    """Serves the fixture pages with ETags, answering 304 when the client's copy is current."""
+
+    async def page(request: web.Request) -> web.StreamResponse:
+        name = PAGES.get(request.path)
+        if name is None:
+            log.append((request.path, 404))
+            raise web.HTTPNotFound()
+        body = (FIXTURES / name).read_text(encoding="utf-8")
+        etag = '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:16] + '"'
+        if request.headers.get("If-None-Match") == etag:
+            log.append((request.path, 304))
+            return web.Response(status=304, headers={"ETag": etag})
+        log.append((request.path, 200))
+        return web.Response(text=body, content_type="text/html", headers={"ETag": etag})
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", page)
+    return app
+
+
+async def crawl(caches: list, log: list) -> list:
+    """Crawl the fixture site once per cache, all against one server; returns each crawl's speakers."""
+    runner = web.AppRunner(fixture_app(log), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    try:
+        return [
+            await crawl_speakers(f"http://{host}:{port}/speakers/", cache=cache, follow_details=True)
+            for cache in caches
+        ]
+    finally:
+        await runner.cleanup()
+
+
+EXPECTED = [
+    {"name": "Ana Lopez", "title": "Head of Digital", "company": "Northgate Construction"},
+    {"name": "Ben Okafor", "title": "Survey Manager", "company": "Network Rail"},
+    {"name": "Cai Jones", "title": "Estates Director", "company": "City Airport"},
+    {"name": "Dee Patel", "title": "CTO", "company": "Harper Civil Engineering"},
+]
+
+
+def without_urls(speakers: list) -> list:
+    return [{key: speaker[key] for key in ("name", "title", "company")} for speaker in speakers]
+
+
+def test_crawl_follows_pagination_and_detail_pages(tmp_path):
+    log: list = []
+    [speakers] = asyncio.run(crawl([HttpCache(tmp_path / "http")], log))
+    # Page order, each speaker once, Ben's company filled in from the speaker page
+    assert without_urls(speakers) == EXPECTED
+    # Every page fetched once; the off-site pagination link is not followed
+    assert sorted(log) == sorted((path, 200) for path in PAGES)
+
+
+def test_recrawl_revalidates_unchanged_pages_with_etags(tmp_path):
+    log: list = []
+    first, second = HttpCache(tmp_path / "http"), HttpCache(tmp_path / "http")
+    _, speakers = asyncio.run(crawl([first, second], log))
+    assert without_urls(speakers) == EXPECTED
+    assert sorted(log[len(PAGES):]) == sorted((path, 304) for path in PAGES)
+    assert (first.fetched, first.revalidated) == (len(PAGES), 0)
+    assert (second.fetched, second.revalidated) == (0, len(PAGES))
+
+
+def test_a_broken_detail_page_fails_the_crawl(tmp_path, monkeypatch):
+    def broken(html):
+        raise ValueError("unexpected speaker page layout")
+
+    monkeypatch.setattr(scraper, "_parse_speaker_detail", broken)
+    with pytest.raises(ValueError, match="unexpected speaker page layout"):
+        asyncio.run(crawl([HttpCache(tmp_path / "http")], []))
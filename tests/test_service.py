@@ -0,0 +1,178 @@
+import io
+import csv
+import sys
+import asyncio
+import threading
+
+from aiohttp.test_utils import TestClient, TestServer
+
+import service
+from bench.fake_llm import parse_latency
+from service import Service
+from utils.ratelimit import DEFAULT_MAX_RETRIES, get_rate_limiter
+
+ROWS = [
+    {"name": "Ana Lopez", "title": "CEO", "company": "Harper Group"},
+    {"name": "Ben Okafor", "title": "VP", "company": "Trimble"},
+    {"name": "Cai Jones", "title": "Director", "company": "City Airport"},
+]
+
+
+def run_with_client(service_: Service, test):
+    """Serve `service_` on a local port and run `test(client)` against it."""
+
+    async def run():
+        async with TestClient(TestServer(service_.app())) as client:
+            return await test(client)
+
+    return asyncio.run(run())
+
+
+async def wait_for_job(client: TestClient, job_id: str, *statuses: str) -> dict:
+    for _ in range(500):
+        resp = await client.get(f"/jobs/{job_id}")
+        job = await resp.json()
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job stayed {job['status']}")
+
+
+def test_classify(fake_llm, tmp_path):
+    async def test(client):
+        resp = await client.post("/classify", json=ROWS[0])
+        assert resp.status == 200
+        body = await resp.json()
+        assert body["classification"]["company"] == "Harper Group"
+        assert body["classification"]["category"] == "Builder"
+        assert body["excluded"] is False
+
+        resp = await client.post("/classify", json={"title": "CEO"})
+        assert resp.status == 400
+        assert "company" in (await resp.json())["error"]
+
+    run_with_client(Service(out_dir=str(tmp_path)), test)
+    assert fake_llm.stats()["by_kind"] == {"classify": 1}
+
+
+def test_generate_email_reuses_a_passed_classification(fake_llm, tmp_path):
+    classification = {"company": "Harper Group", "summary": "Harper builds bridges.", "category": "Builder"}
+
+    async def test(client):
+        resp = await client.post("/generate-email", json={**ROWS[0], "classification": classification})
+        assert resp.status == 200
+        body = await resp.json()
+        assert body["classification"] == classification
+        assert body["excluded"] is False
+        assert body["email"]["subject"] == "Ana Lopez, see your jobsite from above"
+
+    run_with_client(Service(out_dir=str(tmp_path)), test)
+    assert fake_llm.stats()["by_kind"] == {"email": 1}
+
+
+def test_generate_email_skips_excluded_companies(fake_llm, tmp_path):
+    async def test(client):
+        resp = await client.post("/generate-email", json=ROWS[1])
+        assert resp.status == 200
+        body = await resp.json()
+        assert body["classification"]["category"] == "Competitor"
+        assert body["excluded"] is True
+        assert body["email"] is None
+
+    run_with_client(Service(out_dir=str(tmp_path)), test)
+    # Trimble is pre-classified, so nothing reached the LLM
+    assert fake_llm.stats()["requests"] == 0
+
+
+def test_job_lifecycle_and_output(fake_llm, tmp_path):
+    async def test(client):
+        resp = await client.post("/jobs", json={"rows": ROWS})
+        assert resp.status == 202
+        job = await resp.json()
+        assert resp.headers["Location"] == f"/jobs/{job['id']}"
+        assert (job["status"], job["rows"]) == ("queued", 3)
+
+        job = await wait_for_job(client, job["id"], "done", "failed")
+        assert job["status"] == "done", job["error"]
+        assert job["stats"]["emails"] == 2
+        assert job["output"] == f"/jobs/{job['id']}/output"
+
+        resp = await client.get(job["output"])
+        assert resp.status == 200
+        output = list(csv.DictReader(io.StringIO(await resp.text())))
+        assert [row["Speaker Name"] for row in output] == ["Ana Lopez", "Ben Okafor", "Cai Jones"]
+        assert output[1]["Email Body"] == ""
+
+        assert (await client.get("/jobs/nope")).status == 404
+
+    run_with_client(Service(out_dir=str(tmp_path)), test)
+
+
+def test_full_job_queue_is_rejected_with_503(fake_llm, tmp_path):
+    fake_llm.config.latency = parse_latency("fixed:300")
+
+    async def test(client):
+        resp = await client.post("/jobs", json={"rows": ROWS[:1]})
+        await wait_for_job(client, (await resp.json())["id"], "running")
+        # The only worker is busy; one job fits in the queue and the next is turned away
+        assert (await client.post("/jobs", json={"rows": ROWS[:1]})).status == 202
+        resp = await client.post("/jobs", json={"rows": ROWS[:1]})
+        assert resp.status == 503
+        assert resp.headers["Retry-After"] == "30"
+        assert "queue is full" in (await resp.json())["error"]
+
+    run_with_client(Service(out_dir=str(tmp_path), job_workers=1, job_queue_size=1), test)
+
+
+def test_failed_warm_up_fails_queued_jobs_and_answers_503(fake_llm, tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def broken_import() -> None:
+        release.wait(5)
+        raise ImportError("No module named 'openai'")
+
+    monkeypatch.setattr(service, "_import_llm_modules", broken_import)
+    service_ = Service(out_dir=str(tmp_path), job_workers=1)
+
+    async def test(client):
+        # Accepted while the warm-up is still running
+        resp = await client.post("/jobs", json={"rows": ROWS})
+        assert resp.status == 202
+        first = await resp.json()
+        release.set()
+
+        job = await wait_for_job(client, first["id"], "failed", "done")
+        assert job["status"] == "failed"
+        assert "No module named 'openai'" in job["error"]
+        # The worker survived the failed job
+        assert not any(task.done() for task in service_._workers)
+
+        for path, body in [("/classify", ROWS[0]), ("/generate-email", ROWS[0]), ("/jobs", {"rows": ROWS})]:
+            resp = await client.post(path, json=body)
+            assert resp.status == 503, path
+            assert "failed to start" in (await resp.json())["error"]
+
+        resp = await client.get("/health")
+        assert resp.status == 503
+        assert (await resp.json())["ready"] is False
+
+    run_with_client(service_, test)
+    assert fake_llm.stats()["requests"] == 0
+
+
+def test_zero_max_retries_reaches_the_rate_limiter(fake_llm, tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    monkeypatch.setattr(sys, "argv", ["service.py"])
+    args = service.parse_args()
+    assert args.max_retries == 0
+
+    async def test(client):
+        assert (await client.post("/classify", json=ROWS[0])).status == 200
+
+    run_with_client(Service(out_dir=str(tmp_path), max_retries=args.max_retries), test)
+    assert get_rate_limiter().max_retries == 0
+
+    monkeypatch.delenv("LLM_MAX_RETRIES")
+    assert service.parse_args().max_retries is None
+    run_with_client(Service(out_dir=str(tmp_path)), test)
+    assert get_rate_limiter().max_retries == DEFAULT_MAX_RETRIES
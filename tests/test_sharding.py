@@ -0,0 +1,65 @@
+import csv
+
+from sharding import plan_shards, read_inputs, run_sharded
+from utils.normalize import normalize_company
+from utils.records import SpeakerRecord
+
+FIELDS = ["Speaker Name", "Speaker Title", "Speaker Company"]
+
+
+def write_input(path, rows) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        writer.writerows(rows)
+
+
+def read_names(path) -> list:
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row["Speaker Name"] for row in csv.DictReader(f)]
+
+
+def test_each_company_lands_in_one_shard():
+    companies = ["Acme Builders", "ACME Builders Inc.", "Harper Group", "City Airport", "Harper Group Ltd"]
+    rows = [SpeakerRecord(name=f"Person {i}", title="", company=companies[i % len(companies)]) for i in range(40)]
+    plan = plan_shards(rows, 3)
+
+    assert len(plan) == 3
+    assert sorted(i for shard in plan for i in shard) == list(range(40))
+    assert all(shard == sorted(shard) for shard in plan)
+    shard_of = {}
+    for number, shard in enumerate(plan):
+        for i in shard:
+            key = normalize_company(rows[i].company)
+            assert shard_of.setdefault(key, number) == number
+
+
+def inputs(tmp_path) -> list:
+    first, second = tmp_path / "day1.csv", tmp_path / "day2.csv"
+    write_input(first, [(f"A{i}", "Engineer", f"Harper Group {i % 4}") for i in range(12)])
+    # A2 repeats a row from the first file
+    write_input(second, [(f"B{i}", "Director", f"Oak Holdings {i % 3}") for i in range(8)] + [("A2", "Engineer", "Harper Group 2")])
+    return [first, second]
+
+
+def test_merged_output_keeps_input_order_without_duplicates(fake_llm, tmp_path):
+    paths = inputs(tmp_path)
+    assert read_inputs(paths).duplicates == 1
+    out = tmp_path / "out" / "email_output.csv"
+
+    stats = run_sharded(paths, str(out), workers=2, concurrency=2)
+
+    expected = [f"A{i}" for i in range(12)] + [f"B{i}" for i in range(8)]
+    assert read_names(out) == expected
+    assert (stats.rows, stats.duplicates, stats.emails) == (21, 1, 20)
+
+
+def test_output_per_input_sends_rows_to_their_own_file(fake_llm, tmp_path):
+    paths = inputs(tmp_path)
+    out = tmp_path / "out" / "email_output.csv"
+
+    run_sharded(paths, str(out), workers=2, per_input=True, concurrency=2)
+
+    assert not out.exists()
+    assert read_names(tmp_path / "out" / "day1_email_output.csv") == [f"A{i}" for i in range(12)]
+    assert read_names(tmp_path / "out" / "day2_email_output.csv") == [f"B{i}" for i in range(8)]
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+def test_concurrent_spelling_variants_share_one_call():
+    flight = SingleFlight()
+    started = []
+
+    async def classify():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return {"category": "Builder"}
+
+    async def run():
+        names = ["ACME Builders Inc.", "Acme Builders", "acme builders, inc", "ACME  BUILDERS"]
+        return await asyncio.gather(*(flight.do(name, classify) for name in names))
+
+    results = asyncio.run(run())
+    assert len(started) == 1
+    assert results == [{"category": "Builder"}] * 4
+    assert (flight.calls, flight.saved) == (1, 3)
+
+
+def test_memoized_results_answer_later_callers():
+    flight = SingleFlight()
+    calls = []
+
+    async def classify():
+        calls.append(1)
+        return "Builder"
+
+    async def run():
+        assert await flight.do("Harper Group", classify) == "Builder"
+        assert await flight.do("harper group", classify) == "Builder"
+
+    asyncio.run(run())
+    assert len(calls) == 1
+    assert (flight.calls, flight.saved) == (1, 1)
+
+
+def test_failures_reach_every_waiter_and_are_not_memoized():
+    flight = SingleFlight()
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return "Builder"
+
+    async def run():
+        results = await asyncio.gather(
+            flight.do("Harper Group", flaky), flight.do("Harper Group", flaky), return_exceptions=True
+        )
+        assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+        # The failed call wasn't kept, so the next caller retries
+        assert await flight.do("Harper Group", flaky) == "Builder"
+
+    asyncio.run(run())
+    assert len(attempts) == 2
+
+
+@pytest.mark.parametrize("name", ["", "   "])
+def test_names_without_a_key_are_never_coalesced(name):
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        return "x"
+
+    async def run():
+        return await asyncio.gather(flight.do(name, call), flight.do(name, call))
+
+    assert asyncio.run(run()) == ["x", "x"]
+    assert (flight.calls, flight.saved) == (2, 0)
@@ -0,0 +1,97 @@
+import json
+import itertools
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Protocol
+
+from openai import OpenAI
+from utils.clients import get_client
+
+# Batch statuses after which polling stops
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchTransport(Protocol):
+    """Submits an OpenAI Batch API request file and retrieves its results."""
+
+    def submit(self, requests_path: Path) -> str:
+        """Upload the JSONL request file, start a batch and return its id."""
+        ...
+
+    def status(self, batch_id: str) -> str:
+        """Return the batch status (e.g. "in_progress", "completed")."""
+        ...
+
+    def results(self, batch_id: str) -> List[dict]:
+        """Return the batch output lines (successes and errors) as dicts."""
+        ...
+
+
+class OpenAIBatchTransport:
+    """Transport backed by the OpenAI Files and Batches APIs."""
+
+    def __init__(self, client: Optional[OpenAI] = None, *, completion_window: str = "24h"):
+        self.client = client or get_client()
+        self.completion_window = completion_window
+
+    def submit(self, requests_path: Path) -> str:
+        with open(requests_path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> List[dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        lines: List[dict] = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            text = self.client.files.content(file_id).text
+            lines.extend(json.loads(line) for line in text.splitlines() if line.strip())
+        return lines
+
+
+class LocalBatchTransport:
+    """
+    In-process stand-in for the Batch API, for offline runs and tests.
+
+    Each request body is passed to `respond`, which returns a chat
+    completion body. Batches complete as soon as they are submitted. An
+    exception from `respond` becomes an error line for that request.
+    """
+
+    def __init__(self, respond: Callable[[dict], dict]):
+        self.respond = respond
+        self._ids = itertools.count(1)
+        self._batches: Dict[str, List[dict]] = {}
+
+    def submit(self, requests_path: Path) -> str:
+        batch_id = f"batch_local_{next(self._ids)}"
+        lines: List[dict] = []
+        with open(requests_path, "r", encoding="utf-8") as f:
+            for raw in f:
+                if not raw.strip():
+                    continue
+                request = json.loads(raw)
+                line = {"id": f"{batch_id}_req_{len(lines)}", "custom_id": request["custom_id"]}
+                try:
+                    line["response"] = {"status_code": 200, "body": self.respond(request["body"])}
+                    line["error"] = None
+                except Exception as e:
+                    line["response"] = None
+                    line["error"] = {"code": "local_error", "message": str(e)}
+                lines.append(line)
+        self._batches[batch_id] = lines
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        return "completed" if batch_id in self._batches else "failed"
+
+    def results(self, batch_id: str) -> List[dict]:
+        return list(self._batches.get(batch_id, []))
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+
+class MicroBatcher:
+    """
+    Group individual async requests into batched calls.
+
+    Callers `submit` one item and await its result. Items are collected until
+    `batch_size` are waiting or `max_wait` seconds have passed since the first
+    one arrived, then `fn` is called once with the whole batch. `fn` must
+    return one result per item, in order. If `fn` raises, every caller in
+    that batch receives the exception.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[Sequence[Any]], Awaitable[List[Any]]],
+        *,
+        batch_size: int,
+        max_wait: float = 0.05,
+    ):
+        self.fn = fn
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def submit(self, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[: self.batch_size], self._pending[self.batch_size :]
+        if not batch:
+            return
+        self.batches += 1
+        task = asyncio.ensure_future(self._run(batch))
+        # Keep a reference so the task isn't garbage-collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self.fn([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from prompts import CLASSIFIER_PROMPT
+from utils.normalize import normalize_company
+from utils.metrics import get_metrics
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "classifications.sqlite"
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 50_000
+# How long a write waits for another process's write lock before giving up
+DEFAULT_BUSY_TIMEOUT = 1.0
+
+
+def prompt_version(prompt: str) -> str:
+    """Short content hash identifying a prompt revision."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+class ClassificationCache:
+    """
+    Persistent SQLite cache of company classifications.
+
+    Entries are keyed by the normalized company name, the classifier prompt
+    version and the model name, so editing the prompt or switching models
+    never serves stale results. Entries expire after `ttl_seconds`, and the
+    least recently used entries are evicted once `max_entries` is exceeded.
+
+    With `refresh=True` every lookup misses, but fresh results are still
+    written back.
+
+    Lookups run on the event loop, so they must never wait on a lock: they
+    only read, and never commit. The access times that drive LRU eviction
+    are kept in memory and written back with the next `set` (which is the
+    only place eviction runs) or on `close`. Writes wait at most
+    `busy_timeout` seconds for another process holding the write lock. If
+    it is still held, that write is skipped and counted as
+    `classify_cache_errors_total`, since a cache miss only costs an LLM
+    call; pending access times are retried with the next write.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CACHE_PATH,
+        *,
+        prompt: str,
+        model: str | None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        refresh: bool = False,
+        busy_timeout: float = DEFAULT_BUSY_TIMEOUT,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._namespace = f"{prompt_version(prompt)}|{model or ''}"
+        # key -> last access time, not yet written back
+        self._touched: Dict[str, float] = {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Sharded runs and the service open the cache from several processes
+        # at once: WAL lets readers proceed during a write, and writers wait
+        # briefly for each other. Setup waits longer, as it only runs once.
+        self._db = sqlite3.connect(str(self.path), timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS classifications ("
+            " key TEXT PRIMARY KEY,"
+            " company TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS classifications_accessed ON classifications (accessed)"
+        )
+        self._db.commit()
+        self._db.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
+
+    def key(self, company: str) -> str:
+        raw = f"{normalize_company(company)}|{self._namespace}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, company: str) -> Optional[dict]:
+        if self.refresh or not normalize_company(company):
+            self._miss()
+            return None
+        key = self.key(company)
+        row = self._db.execute(
+            "SELECT value, created FROM classifications WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > self.ttl_seconds:
+            self._miss()
+            return None
+        self._touched[key] = now
+        self.hits += 1
+        get_metrics().inc("classify_cache_lookups_total", result="hit")
+        return json.loads(row[0])
+
+    def _miss(self) -> None:
+        self.misses += 1
+        get_metrics().inc("classify_cache_lookups_total", result="miss")
+
+    def set(self, company: str, value: dict) -> None:
+        if not normalize_company(company):
+            return
+        now = time.time()
+        row = (self.key(company), company, json.dumps(value, ensure_ascii=False), now, now)
+
+        def store() -> None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO classifications (key, company, value, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?)",
+                row,
+            )
+            self._flush_touches()
+            self._evict(now)
+
+        self._write(store)
+
+    def _write(self, fn: Callable[[], None]) -> None:
+        """Run `fn` and commit; give up if another process holds the lock past the busy timeout."""
+        try:
+            fn()
+            self._db.commit()
+        except sqlite3.OperationalError as e:
+            self._db.rollback()
+            get_metrics().inc("classify_cache_errors_total")
+            print(f"Classification cache write skipped: {e}")
+
+    def _flush_touches(self) -> None:
+        if self._touched:
+            self._db.executemany(
+                "UPDATE classifications SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _evict(self, now: float) -> None:
+        self._db.execute(
+            "DELETE FROM classifications WHERE created < ?", (now - self.ttl_seconds,)
+        )
+        (count,) = self._db.execute("SELECT COUNT(*) FROM classifications").fetchone()
+        if count > self.max_entries:
+            self._db.execute(
+                "DELETE FROM classifications WHERE key IN ("
+                " SELECT key FROM classifications ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> str:
+        return f"Classification cache: {self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate)"
+
+    def close(self) -> None:
+        self._write(self._flush_touches)
+        self._db.close()
+
+
+def open_classification_cache(*, refresh: bool = False) -> ClassificationCache:
+    """Open the classification cache configured by environment variables."""
+    return ClassificationCache(
+        os.getenv("CLASSIFY_CACHE_PATH") or DEFAULT_CACHE_PATH,
+        prompt=CLASSIFIER_PROMPT,
+        model=os.getenv("MODEL_NAME"),
+        ttl_seconds=float(os.getenv("CLASSIFY_CACHE_TTL") or DEFAULT_TTL_SECONDS),
+        max_entries=int(os.getenv("CLASSIFY_CACHE_MAX_ENTRIES") or DEFAULT_MAX_ENTRIES),
+        refresh=refresh,
+        busy_timeout=float(os.getenv("CLASSIFY_CACHE_BUSY_TIMEOUT") or DEFAULT_BUSY_TIMEOUT),
+    )
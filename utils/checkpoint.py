@@ -0,0 +1,54 @@
+import os
+import json
+from typing import Any, Dict, Tuple
+
+
+def row_key(name: str, company: str) -> Tuple[str, str]:
+    """Identify a speaker row by (speaker name, company), ignoring case and padding."""
+    return ((name or "").strip().casefold(), (company or "").strip().casefold())
+
+
+class CheckpointJournal:
+    """
+    Append-only JSONL journal of finished stage outputs.
+
+    Each line records one stage result for a row keyed by (speaker name,
+    company), e.g. its classification or its final output record. Lines are
+    flushed as they are written, so a crashed run loses at most the rows in
+    flight. Opening with `resume=True` loads existing entries; otherwise the
+    journal starts empty. A torn last line from a crash is ignored.
+    """
+
+    def __init__(self, path: str, *, resume: bool = False):
+        self.path = path
+        self._entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        if resume and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    key = row_key(entry["name"], entry["company"])
+                    self._entries.setdefault(key, {})[entry["stage"]] = entry["value"]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        if resume and self._file.tell() > 0:
+            # Terminate a torn last line so the next entry starts cleanly
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def get(self, name: str, company: str) -> Dict[str, Any]:
+        """Return the finished stages for a row as {stage: value}."""
+        return self._entries.get(row_key(name, company), {})
+
+    def record(self, name: str, company: str, stage: str, value: Any) -> None:
+        self._entries.setdefault(row_key(name, company), {})[stage] = value
+        line = {"name": name, "company": company, "stage": stage, "value": value}
+        self._file.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
@@ -0,0 +1,77 @@
+import os
+from typing import Optional
+
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+from utils.ratelimit import get_rate_limiter
+
+# Connection-pool defaults; override with OPENAI_MAX_CONNECTIONS,
+# OPENAI_MAX_KEEPALIVE and OPENAI_KEEPALIVE_EXPIRY.
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE = 100
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+_client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
+
+
+def pool_limits() -> httpx.Limits:
+    """HTTP connection-pool limits shared by the sync and async clients."""
+    return httpx.Limits(
+        max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS") or DEFAULT_MAX_CONNECTIONS),
+        max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE") or DEFAULT_MAX_KEEPALIVE),
+        keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY") or DEFAULT_KEEPALIVE_EXPIRY),
+    )
+
+
+def get_client() -> OpenAI:
+    """Return the process-wide sync OpenAI client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=DefaultHttpxClient(limits=pool_limits()),
+        )
+    return _client
+
+
+async def _observe_rate_limits(response: httpx.Response) -> None:
+    get_rate_limiter().observe(response.headers)
+
+
+def get_async_client() -> AsyncOpenAI:
+    """Return the process-wide async OpenAI client, creating it on first use.
+
+    Retries are left to the shared rate limiter (`utils.ratelimit`), which
+    also sees the rate-limit headers of every response. The underlying
+    connections belong to the event loop that first uses them, so call
+    `aclose_clients` before that loop shuts down.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(
+                limits=pool_limits(),
+                event_hooks={"response": [_observe_rate_limits]},
+            ),
+        )
+    return _async_client
+
+
+def close_clients() -> None:
+    """Close the sync client, if one was created."""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+async def aclose_clients() -> None:
+    """Close both shared clients, if they were created."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+    close_clients()
@@ -1,6 +1,28 @@
 # utils.py
 import os
 import csv
+import asyncio
+import contextlib
+import tempfile
+from typing import Iterable, List, Optional, Union
+from utils.metrics import get_metrics
+from utils.records import SpeakerRecord
+
+EMAIL_OUTPUT_HEADERS = [
+    "Speaker Name",
+    "Speaker Title",
+    "Speaker Company",
+    "Company Category",
+    "Email Subject",
+    "Email Body",
+]
+
+
+def _output_row(record: Union[dict, SpeakerRecord]) -> dict:
+    if isinstance(record, SpeakerRecord):
+        record = record.as_output()
+    return {header: record.get(header, "") for header in EMAIL_OUTPUT_HEADERS}
+
 
 def write_email_output_csv(out_path: str, record: dict):
     """
@@ -8,27 +30,235 @@ def write_email_output_csv(out_path: str, record: dict):
     Automatically creates the directory and writes headers if needed.
     """
 
-    headers = [
-        "Speaker Name",
-        "Speaker Title",
-        "Speaker Company",
-        "Company Category",
-        "Email Subject",
-        "Email Body",
-    ]
-
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     file_exists = os.path.exists(out_path)
 
     with open(out_path, "a", newline="", encoding="utf-8") as outfile:
-        writer = csv.DictWriter(outfile, fieldnames=headers)
+        writer = csv.DictWriter(outfile, fieldnames=EMAIL_OUTPUT_HEADERS)
         if not file_exists:
             writer.writeheader()
-        writer.writerow({
-            "Speaker Name": record.get("Speaker Name", ""),
-            "Speaker Title": record.get("Speaker Title", ""),
-            "Speaker Company": record.get("Speaker Company", ""),
-            "Company Category": record.get("Company Category", ""),
-            "Email Subject": record.get("Email Subject", ""),
-            "Email Body": record.get("Email Body", ""),
-        })
+        writer.writerow(_output_row(record))
+
+
+class EmailCsvWriter:
+    """
+    Writes email_output.csv through a single open handle for a whole run.
+
+    Rows go to a temp file next to `out_path` and are flushed every
+    `flush_every` rows. On a clean exit the temp file atomically replaces
+    `out_path`. If the run fails, the temp file is removed and any existing
+    output is left untouched, so a half-finished run never leaves a partial
+    file behind.
+
+    With `atomic=False` rows are written straight to `out_path` instead, so
+    tools tailing the file see each row as soon as it is flushed; a failed
+    run then leaves the rows written so far.
+
+        with EmailCsvWriter(out_path) as writer:
+            writer.write(record)
+    """
+
+    def __init__(self, out_path: str, *, flush_every: int = 100, atomic: bool = True):
+        self.out_path = out_path
+        self.flush_every = flush_every
+        self.atomic = atomic
+        self.rows = 0
+        self._unflushed = 0
+        self._file = None
+        self._writer: Optional[csv.DictWriter] = None
+        self._tmp_path: Optional[str] = None
+
+    def open(self) -> "EmailCsvWriter":
+        out_dir = os.path.dirname(os.path.abspath(self.out_path))
+        os.makedirs(out_dir, exist_ok=True)
+        if not self.atomic:
+            self._file = open(self.out_path, "w", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._file, fieldnames=EMAIL_OUTPUT_HEADERS)
+            self._writer.writeheader()
+            self._file.flush()
+            return self
+        fd, self._tmp_path = tempfile.mkstemp(
+            dir=out_dir, prefix=f".{os.path.basename(self.out_path)}.", suffix=".tmp"
+        )
+        # mkstemp creates the file 0600; give it the permissions open() would
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(self._tmp_path, 0o666 & ~umask)
+        self._file = os.fdopen(fd, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=EMAIL_OUTPUT_HEADERS)
+        self._writer.writeheader()
+        return self
+
+    def write(self, record: Union[dict, SpeakerRecord]) -> None:
+        with get_metrics().time("csv_write"):
+            self._writer.writerow(_output_row(record))
+            self.rows += 1
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self.flush()
+
+    def write_many(self, records: Iterable[dict]) -> None:
+        for record in records:
+            self.write(record)
+
+    def flush(self) -> None:
+        self._file.flush()
+        self._unflushed = 0
+
+    def prepare(self) -> None:
+        """Write everything out and close the file, leaving only the rename to `close`."""
+        if self._file is None or self._file.closed:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+    def close(self, *, commit: bool = True) -> None:
+        """Finish the run; replace `out_path` if `commit`, else discard the rows."""
+        if self._file is None:
+            return
+        try:
+            if commit:
+                self.prepare()
+            self._file.close()
+            if commit and self._tmp_path:
+                os.replace(self._tmp_path, self.out_path)
+        finally:
+            self._file = None
+            if self._tmp_path and os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+    def __enter__(self) -> "EmailCsvWriter":
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(commit=exc_type is None)
+
+
+class WriterGroup:
+    """
+    Several output writers (e.g. CSV and Parquet) used as one.
+
+    Every record goes to each writer; they are opened together and closed
+    together. On commit every writer is `prepare`d first, so a failure
+    while finishing any file (e.g. the last Parquet row group) discards
+    them all before any output is replaced; after that only the renames
+    are left. If one writer fails to open, those already open are
+    discarded.
+    """
+
+    def __init__(self, *writers):
+        self.writers = writers
+
+    def open(self) -> "WriterGroup":
+        opened = []
+        try:
+            for writer in self.writers:
+                writer.open()
+                opened.append(writer)
+        except BaseException:
+            for writer in opened:
+                writer.close(commit=False)
+            raise
+        return self
+
+    def write(self, record: Union[dict, SpeakerRecord]) -> None:
+        for writer in self.writers:
+            writer.write(record)
+
+    def write_many(self, records: Iterable[Union[dict, SpeakerRecord]]) -> None:
+        records = list(records)
+        for writer in self.writers:
+            writer.write_many(records)
+
+    def close(self, *, commit: bool = True) -> None:
+        if commit:
+            try:
+                for writer in self.writers:
+                    writer.prepare()
+            except BaseException:
+                for writer in self.writers:
+                    with contextlib.suppress(Exception):
+                        writer.close(commit=False)
+                raise
+        error = None
+        for writer in self.writers:
+            try:
+                writer.close(commit=commit and error is None)
+            except BaseException as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+    def __enter__(self) -> "WriterGroup":
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(commit=exc_type is None)
+
+
+# Marks the end of the sink queue
+_CLOSE = object()
+
+
+class AsyncCsvSink:
+    """
+    Hands rows from the event loop to an `EmailCsvWriter` without blocking it.
+
+    `put` enqueues a record on a bounded queue; a background task drains it
+    and writes batches of up to `batch_size` rows in a worker thread. Rows
+    are written in the order they were put. If the block raises, rows still
+    queued are dropped, but a batch already being written finishes before
+    the sink exits, so the writer can be closed safely afterwards.
+
+        async with AsyncCsvSink(writer) as sink:
+            await sink.put(record)
+    """
+
+    def __init__(self, writer: EmailCsvWriter, *, maxsize: int = 1000, batch_size: int = 100):
+        self.writer = writer
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._task: Optional[asyncio.Task] = None
+
+    async def put(self, record: dict) -> None:
+        if self._task.done():
+            # Surface a writer failure instead of blocking on a full queue
+            self._task.result()
+        await self._queue.put(record)
+
+    async def _drain(self) -> None:
+        while True:
+            batch: List[dict] = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            closing = batch[-1] is _CLOSE
+            if closing:
+                batch.pop()
+            if batch:
+                write = asyncio.ensure_future(asyncio.to_thread(self.writer.write_many, batch))
+                try:
+                    await asyncio.shield(write)
+                except asyncio.CancelledError:
+                    # The thread can't be interrupted; let the batch finish
+                    # so the writer isn't closed under it
+                    await write
+                    raise
+            if closing:
+                return
+
+    async def __aenter__(self) -> "AsyncCsvSink":
+        self._task = asyncio.create_task(self._drain())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._task.done():
+            self._task.result()
+            return
+        if exc_type is None:
+            await self._queue.put(_CLOSE)
+            await self._task
+        else:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
@@ -0,0 +1,34 @@
+import os
+import json
+from typing import Dict
+
+
+class DeadLetterFile:
+    """
+    JSONL file of rows that still failed after all retries.
+
+    Each line holds the input row, the stage that failed and the error, so
+    the rows can be inspected and rerun (see `--resume`). The file is only
+    created once a row fails; a leftover file from an earlier run is removed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = None
+        if os.path.exists(path):
+            os.remove(path)
+
+    def add(self, row: Dict[str, str], stage: str, error: Exception) -> None:
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, "w", encoding="utf-8")
+        line = {"row": row, "stage": stage, "error": f"{type(error).__name__}: {error}"}
+        self._file.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
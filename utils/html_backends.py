@@ -0,0 +1,168 @@
+import os
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, Tag
+
+# Preference order when SCRAPER_PARSER is unset or "auto"
+BACKEND_ORDER = ("selectolax", "lxml", "bs4")
+
+# Strings under these tags are not page text (BeautifulSoup's get_text skips them too)
+_NON_TEXT_TAGS = frozenset({"script", "style", "template", "rt", "rp"})
+
+
+def _normalize_space(parts) -> str:
+    return " ".join(" ".join(parts).split())
+
+
+class Bs4Backend:
+    """BeautifulSoup with html.parser: always available, and the reference output."""
+
+    name = "bs4"
+
+    def parse(self, html: str) -> list:
+        return self.children(BeautifulSoup(html, "html.parser"))
+
+    def children(self, el) -> list:
+        return [c for c in el.contents if isinstance(c, Tag)]
+
+    def tag(self, el) -> str:
+        return el.name
+
+    def classes(self, el) -> List[str]:
+        return el.get("class") or []
+
+    def get(self, el, name: str) -> Optional[str]:
+        value = el.get(name)
+        return " ".join(value) if isinstance(value, list) else value
+
+    def text(self, el) -> str:
+        return " ".join(el.get_text(" ", strip=True).split())
+
+
+class LxmlBackend:
+    """lxml's libxml2 HTML parser."""
+
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+
+        self._document_fromstring = lxml.html.document_fromstring
+
+    def parse(self, html: str) -> list:
+        if not html.strip():
+            return []
+        return [self._document_fromstring(html)]
+
+    def children(self, el) -> list:
+        # Skip comments and processing instructions, whose tag is not a string
+        return [c for c in el if isinstance(c.tag, str)]
+
+    def tag(self, el) -> str:
+        return el.tag
+
+    def classes(self, el) -> List[str]:
+        return (el.get("class") or "").split()
+
+    def get(self, el, name: str) -> Optional[str]:
+        return el.get(name)
+
+    def text(self, el) -> str:
+        parts: List[str] = []
+        stack = [el]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+                continue
+            if node.text and node.tag not in _NON_TEXT_TAGS:
+                parts.append(node.text)
+            for child in reversed(node):
+                if child.tail:
+                    stack.append(child.tail)
+                if isinstance(child.tag, str) and child.tag not in _NON_TEXT_TAGS:
+                    stack.append(child)
+        return _normalize_space(parts)
+
+
+class SelectolaxBackend:
+    """selectolax's lexbor engine (an HTML5 parser written in C)."""
+
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+
+        self._parser = LexborHTMLParser
+
+    def parse(self, html: str) -> list:
+        root = self._parser(html).root
+        return [root] if root is not None else []
+
+    def children(self, el) -> list:
+        return [c for c in el.iter(include_text=False) if c.is_element_node]
+
+    def tag(self, el) -> str:
+        return el.tag
+
+    def classes(self, el) -> List[str]:
+        return (el.attributes.get("class") or "").split()
+
+    def get(self, el, name: str) -> Optional[str]:
+        attributes = el.attributes
+        if name not in attributes:
+            return None
+        return attributes[name] or ""
+
+    def text(self, el) -> str:
+        parts: List[str] = []
+        stack = [el]
+        while stack:
+            node = stack.pop()
+            if node.is_text_node:
+                parts.append(node.text_content or "")
+            elif node.is_element_node and node.tag not in _NON_TEXT_TAGS:
+                stack.extend(reversed(list(node.iter(include_text=True))))
+        return _normalize_space(parts)
+
+
+_BACKENDS = {
+    "bs4": Bs4Backend,
+    "lxml": LxmlBackend,
+    "selectolax": SelectolaxBackend,
+}
+_instances: Dict[str, object] = {}
+
+
+def available_backends() -> List[str]:
+    """Backends whose parser library is importable, in preference order."""
+    names = []
+    for name in BACKEND_ORDER:
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_backend(name: Optional[str] = None):
+    """
+    Return the HTML backend `name` ("selectolax", "lxml" or "bs4").
+
+    With no name, SCRAPER_PARSER picks one; unset or "auto" uses the first
+    of selectolax, lxml and bs4 that is installed. Naming a backend whose
+    library is missing raises ImportError.
+    """
+    name = (name or os.getenv("SCRAPER_PARSER") or "auto").lower()
+    if name == "auto":
+        for candidate in BACKEND_ORDER:
+            try:
+                return get_backend(candidate)
+            except ImportError:
+                continue
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend {name!r}; expected one of {', '.join(BACKEND_ORDER)}")
+    if name not in _instances:
+        _instances[name] = _BACKENDS[name]()
+    return _instances[name]
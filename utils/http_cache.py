@@ -0,0 +1,63 @@
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Mapping, Optional
+
+DEFAULT_HTTP_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "http"
+
+
+class HttpCache:
+    """
+    On-disk cache of fetched pages for conditional re-requests.
+
+    Each URL maps to one JSON file holding the body and the response's
+    ETag / Last-Modified validators. `conditional_headers` turns those into
+    If-None-Match / If-Modified-Since, so a re-fetch of an unchanged page
+    costs a 304 with no body.
+    """
+
+    def __init__(self, directory: str | Path = DEFAULT_HTTP_CACHE_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fetched = 0
+        self.revalidated = 0
+
+    def _path(self, url: str) -> Path:
+        return self.directory / (hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str) -> Optional[dict]:
+        try:
+            with self._path(url).open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def conditional_headers(self, entry: Optional[dict]) -> dict:
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, body: str, headers: Mapping[str, str]) -> None:
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            # Nothing to revalidate against; a later fetch would be a full GET anyway
+            return
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+            "body": body,
+        }
+        tmp = self._path(url).with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        tmp.replace(self._path(url))
+
+    def summary(self) -> str:
+        return f"HTTP cache: {self.fetched} pages fetched, {self.revalidated} unchanged (304)"
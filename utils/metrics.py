@@ -0,0 +1,169 @@
+import os
+import json
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def _label_str(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Metrics:
+    """
+    In-process run metrics: per-stage latency samples and labelled counters.
+
+    Stages are timed with `time(stage)`; token usage from `response.usage`
+    is added with `record_usage`. `report` summarizes latencies as
+    p50/p95/p99 and `to_prometheus` renders the same data in the Prometheus
+    text exposition format.
+
+    With `max_samples` set, only the most recent samples of each stage are
+    kept, so a long-running process (the HTTP service) reports recent
+    percentiles in bounded memory. Each stage's count and total time, like
+    the counters, always cover the whole lifetime, so Prometheus `_sum` and
+    `_count` stay monotonic.
+    """
+
+    def __init__(self, *, max_samples: Optional[int] = None):
+        self.max_samples = max_samples
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        # Lifetime sample count and sum per stage, unaffected by trimming
+        self.observed: Dict[str, int] = defaultdict(int)
+        self.observed_s: Dict[str, float] = defaultdict(float)
+        self.counters: Dict[Tuple[str, Labels], float] = defaultdict(float)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        self.counters[(name, tuple(sorted(labels.items())))] += value
+
+    def counter(self, name: str, **labels: str) -> float:
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0.0)
+
+    def merge(self, other: "Metrics") -> None:
+        """Add another registry's samples and counters, e.g. from a worker process."""
+        for stage, values in other.latencies.items():
+            self.latencies[stage].extend(values)
+            self.observed[stage] += other.observed[stage]
+            self.observed_s[stage] += other.observed_s[stage]
+            self._trim(stage)
+        for key, value in other.counters.items():
+            self.counters[key] += value
+
+    def observe(self, stage: str, seconds: float) -> None:
+        self.latencies[stage].append(seconds)
+        self.observed[stage] += 1
+        self.observed_s[stage] += seconds
+        self._trim(stage)
+
+    def _trim(self, stage: str) -> None:
+        values = self.latencies[stage]
+        # Trim in chunks rather than on every sample to keep observe() O(1) amortized
+        if self.max_samples and len(values) >= 2 * self.max_samples:
+            del values[: -self.max_samples]
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Record the wall time of the enclosed block under `stage`, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def record_usage(self, stage: str, usage: Any) -> None:
+        """Add prompt/completion token counts from an OpenAI `usage` object.
+
+        Prompt tokens served from the provider's prompt cache
+        (`usage.prompt_tokens_details.cached_tokens`) are also counted under
+        kind="cached"; they are a subset of kind="prompt".
+        """
+        if usage is None:
+            return
+        self.inc("llm_requests_total", stage=stage)
+        self.inc("llm_tokens_total", getattr(usage, "prompt_tokens", 0) or 0, stage=stage, kind="prompt")
+        self.inc("llm_tokens_total", getattr(usage, "completion_tokens", 0) or 0, stage=stage, kind="completion")
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.inc("llm_tokens_total", getattr(details, "cached_tokens", 0) or 0, stage=stage, kind="cached")
+
+    def stage_summary(self, stage: str) -> Dict[str, float]:
+        values = sorted(self.latencies.get(stage, []))
+        count, total = self.observed.get(stage, 0), self.observed_s.get(stage, 0.0)
+        summary = {
+            "count": count,
+            "total_s": total,
+            "mean_s": total / count if count else 0.0,
+            "max_s": values[-1] if values else 0.0,
+        }
+        for q in QUANTILES:
+            summary[f"p{int(q * 100)}_s"] = _percentile(values, q)
+        return summary
+
+    def report(self, **extra: Any) -> Dict[str, Any]:
+        """JSON-serializable summary of the run; `extra` is merged in at the top level."""
+        return {
+            **extra,
+            "stages": {stage: self.stage_summary(stage) for stage in sorted(self.latencies)},
+            "counters": {
+                f"{name}{_label_str(labels)}": value
+                for (name, labels), value in sorted(self.counters.items())
+            },
+        }
+
+    def write_json(self, path: str, **extra: Any) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(**extra), f, indent=2)
+
+    def to_prometheus(self, prefix: str = "dd_outreach", **gauges: float) -> str:
+        """Render latencies as summaries, counters as counters and `gauges` as gauges."""
+        lines: List[str] = []
+        latency = f"{prefix}_stage_latency_seconds"
+        lines.append(f"# TYPE {latency} summary")
+        for stage in sorted(self.latencies):
+            values = sorted(self.latencies[stage])
+            for q in QUANTILES:
+                lines.append(f'{latency}{{stage="{stage}",quantile="{q}"}} {_percentile(values, q)}')
+            lines.append(f'{latency}_sum{{stage="{stage}"}} {self.observed_s[stage]}')
+            lines.append(f'{latency}_count{{stage="{stage}"}} {self.observed[stage]}')
+
+        declared = set()
+        for (name, labels), value in sorted(self.counters.items()):
+            metric = f"{prefix}_{name}"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{_label_str(labels)} {value}")
+
+        for name, value in sorted(gauges.items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, **gauges: float) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(**gauges))
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics registry."""
+    return _metrics
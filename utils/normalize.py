@@ -0,0 +1,24 @@
+import re
+
+# Legal-entity suffixes that don't change which company a name refers to
+_LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "plc",
+    "corp", "corporation", "co", "company", "gmbh", "ag", "sa", "bv", "pty",
+}
+
+_NON_WORD = re.compile(r"[^\w\s&]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_company(name: str) -> str:
+    """
+    Normalize a company name for use as a lookup key.
+
+    Lowercases, drops punctuation and trailing legal suffixes, and collapses
+    whitespace, so "AECOM" and "Aecom Ltd." map to the same key.
+    """
+    text = _NON_WORD.sub(" ", (name or "").lower())
+    words = _SPACES.sub(" ", text).strip().split(" ")
+    while len(words) > 1 and words[-1] in _LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(w for w in words if w)
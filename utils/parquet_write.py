@@ -0,0 +1,129 @@
+import os
+import tempfile
+from typing import Dict, Iterable, List, Optional, Union
+
+from utils.csv_write import EMAIL_OUTPUT_HEADERS
+from utils.metrics import get_metrics
+from utils.records import SUMMARY_COLUMN, SpeakerRecord
+
+# CSV columns plus the classification summary, which the CSV leaves out
+PARQUET_COLUMNS = EMAIL_OUTPUT_HEADERS[:4] + [SUMMARY_COLUMN] + EMAIL_OUTPUT_HEADERS[4:]
+DEFAULT_ROW_GROUP_SIZE = 10_000
+
+
+def require_pyarrow():
+    """Import pyarrow on first use; it is only needed for Parquet output."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+def parquet_path_for(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def read_parquet_records(path: str) -> List[SpeakerRecord]:
+    """Records from a file written by `EmailParquetWriter`."""
+    _pa, pq = require_pyarrow()
+    return [SpeakerRecord.from_output(row) for row in pq.read_table(path).to_pylist()]
+
+
+class EmailParquetWriter:
+    """
+    Writes the output rows to a Parquet file, a row group at a time.
+
+    Same interface as `EmailCsvWriter`, so both can be used together
+    through `WriterGroup`. Columns are the CSV's plus the company summary.
+    Rows are buffered column by column and written as a row group every
+    `row_group_size` rows, so memory stays bounded however long the run.
+    The file is written next to `out_path` and renamed into place on a
+    clean close; a failed run leaves any existing file untouched.
+    """
+
+    def __init__(
+        self,
+        out_path: str,
+        *,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = "zstd",
+    ):
+        self.out_path = out_path
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.rows = 0
+        self.row_groups = 0
+        self._columns: Dict[str, List[str]] = {name: [] for name in PARQUET_COLUMNS}
+        self._writer = None
+        self._schema = None
+        self._tmp_path: Optional[str] = None
+
+    def open(self) -> "EmailParquetWriter":
+        pa, pq = require_pyarrow()
+        out_dir = os.path.dirname(os.path.abspath(self.out_path))
+        os.makedirs(out_dir, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(
+            dir=out_dir, prefix=f".{os.path.basename(self.out_path)}.", suffix=".tmp"
+        )
+        os.close(fd)
+        # mkstemp creates the file 0600; give it the permissions open() would
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(self._tmp_path, 0o666 & ~umask)
+        self._schema = pa.schema([(name, pa.string()) for name in PARQUET_COLUMNS])
+        self._writer = pq.ParquetWriter(self._tmp_path, self._schema, compression=self.compression)
+        return self
+
+    def write(self, record: Union[dict, SpeakerRecord]) -> None:
+        values = record.as_output() if isinstance(record, SpeakerRecord) else record
+        for name, column in self._columns.items():
+            column.append(values.get(name) or "")
+        self.rows += 1
+        if len(self._columns[PARQUET_COLUMNS[0]]) >= self.row_group_size:
+            self.flush()
+
+    def write_many(self, records: Iterable[Union[dict, SpeakerRecord]]) -> None:
+        for record in records:
+            self.write(record)
+
+    def flush(self) -> None:
+        """Write buffered rows as a row group."""
+        if not self._columns[PARQUET_COLUMNS[0]]:
+            return
+        pa, _pq = require_pyarrow()
+        with get_metrics().time("parquet_write"):
+            table = pa.Table.from_pydict(self._columns, schema=self._schema)
+            self._writer.write_table(table)
+        self.row_groups += 1
+        for column in self._columns.values():
+            column.clear()
+
+    def prepare(self) -> None:
+        """Write the last row group and the footer, leaving only the rename to `close`."""
+        if self._writer is None:
+            return
+        self.flush()
+        self._writer.close()
+
+    def close(self, *, commit: bool = True) -> None:
+        """Finish the run; replace `out_path` if `commit`, else discard the rows."""
+        if self._writer is None:
+            return
+        try:
+            if commit:
+                self.prepare()
+            self._writer.close()
+            if commit:
+                os.replace(self._tmp_path, self.out_path)
+        finally:
+            self._writer = None
+            if self._tmp_path and os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+    def __enter__(self) -> "EmailParquetWriter":
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(commit=exc_type is None)
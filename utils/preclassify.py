@@ -0,0 +1,121 @@
+import os
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.normalize import normalize_company
+from utils.metrics import get_metrics
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent.parent / "data" / "company_rules.json"
+DEFAULT_MIN_CONFIDENCE = 0.8
+# Competing categories closer than this make a match ambiguous
+DEFAULT_MARGIN = 0.1
+
+# Trie key holding the rules that end at a node
+_END = ""
+
+
+@dataclass(frozen=True)
+class Rule:
+    phrase: str
+    category: str
+    confidence: float
+    summary: str = ""
+
+
+@dataclass(frozen=True)
+class PreClassification:
+    category: str
+    confidence: float
+    rule: Rule
+
+
+class PreClassifier:
+    """
+    Local, rule-based classifier that answers for well-known companies.
+
+    Rules are whole-word phrases over normalized company names, compiled
+    into a token trie so each name is matched in one pass over its words.
+    The best-scoring category wins when it reaches `min_confidence` and no
+    other category scores within `margin` of it; anything else is left to
+    the LLM. A rule's summary may name the company as `{company}`, which
+    keyword rules use to describe any matching company.
+    """
+
+    def __init__(
+        self,
+        rules: List[Rule],
+        *,
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+        margin: float = DEFAULT_MARGIN,
+    ):
+        self.min_confidence = min_confidence
+        self.margin = margin
+        self._trie: Dict[str, dict] = {}
+        for rule in rules:
+            node = self._trie
+            for token in normalize_company(rule.phrase).split():
+                node = node.setdefault(token, {})
+            node.setdefault(_END, []).append(rule)
+
+    @classmethod
+    def from_file(cls, path: str | Path = DEFAULT_RULES_PATH, **kwargs) -> "PreClassifier":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        rules = [
+            Rule(
+                phrase=entry["phrase"],
+                category=entry["category"],
+                confidence=float(entry["confidence"]),
+                summary=entry.get("summary", ""),
+            )
+            for section in ("aliases", "keywords")
+            for entry in data.get(section, [])
+        ]
+        return cls(rules, **kwargs)
+
+    def matches(self, company: str) -> List[Rule]:
+        """All rules whose phrase appears in the normalized company name."""
+        tokens = normalize_company(company).split()
+        found: List[Rule] = []
+        for start in range(len(tokens)):
+            node = self._trie
+            for token in tokens[start:]:
+                node = node.get(token)
+                if node is None:
+                    break
+                found.extend(node.get(_END, ()))
+        return found
+
+    def classify(self, company: str) -> Optional[PreClassification]:
+        """Return a confident local classification, or None to defer to the LLM."""
+        best: Dict[str, Rule] = {}
+        for rule in self.matches(company):
+            current = best.get(rule.category)
+            if current is None or rule.confidence > current.confidence:
+                best[rule.category] = rule
+        ranked = sorted(best.values(), key=lambda r: r.confidence, reverse=True)
+        if not ranked or ranked[0].confidence < self.min_confidence:
+            return None
+        if len(ranked) > 1 and ranked[0].confidence - ranked[1].confidence < self.margin:
+            return None
+        top = ranked[0]
+        return PreClassification(category=top.category, confidence=top.confidence, rule=top)
+
+    def lookup(self, company: str) -> Optional[dict]:
+        """`classify` shaped like a `CompanyClassification`, counted in the run metrics."""
+        hit = self.classify(company)
+        get_metrics().inc("preclassify_total", result="hit" if hit else "miss")
+        if hit is None:
+            return None
+        summary = hit.rule.summary.replace("{company}", company.strip())
+        return {"company": company, "summary": summary, "category": hit.category}
+
+
+def load_preclassifier() -> PreClassifier:
+    """Load the pre-classifier from PRECLASSIFY_RULES (default: data/company_rules.json)."""
+    return PreClassifier.from_file(
+        os.getenv("PRECLASSIFY_RULES") or DEFAULT_RULES_PATH,
+        min_confidence=float(os.getenv("PRECLASSIFY_MIN_CONFIDENCE") or DEFAULT_MIN_CONFIDENCE),
+    )
@@ -0,0 +1,229 @@
+import os
+import re
+import time
+import random
+import asyncio
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Iterable, Mapping, Optional
+
+import openai
+from utils.metrics import get_metrics
+
+DEFAULT_MAX_RETRIES = 6
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+
+# Rough completion size reserved per request when budgeting tokens per minute
+COMPLETION_TOKEN_ALLOWANCE = 300
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+_RETRYABLE = (
+    openai.RateLimitError,
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.InternalServerError,
+)
+
+
+def estimate_tokens(messages: Iterable[Mapping[str, str]]) -> int:
+    """Cheap token estimate (~4 characters per token) plus a completion allowance."""
+    chars = sum(len(m.get("content") or "") for m in messages)
+    return chars // 4 + COMPLETION_TOKEN_ALLOWANCE
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse rate-limit reset durations such as "20ms", "1s" or "6m0s"."""
+    parts = _DURATION_PART.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in parts)
+
+
+def _retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds the server asked us to wait, from retry-after-ms or Retry-After."""
+    if not headers:
+        return None
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return float(ms) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+
+class TokenBucket:
+    """Continuously refilling budget of `per_minute` units."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.level = per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float, factor: float) -> None:
+        rate = self.per_minute * factor / 60.0
+        self.level = min(self.per_minute, self.level + (now - self._updated) * rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, factor: float) -> float:
+        """Seconds until `amount` units are available at the current rate."""
+        self._refill(time.monotonic(), factor)
+        amount = min(amount, self.per_minute)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / (self.per_minute * factor / 60.0)
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.per_minute)
+
+    def cap(self, remaining: float) -> None:
+        """Lower the level to what the server reports is left."""
+        self.level = min(self.level, remaining)
+
+
+class RateLimiter:
+    """
+    Scheduler shared by every LLM call in the process.
+
+    Calls wait for a request-per-minute and token-per-minute budget (either
+    may be None for no local limit) before they run. Retryable failures
+    (429s, connection errors, 5xx) are retried with jittered exponential
+    backoff, or after the server's Retry-After when it sends one. A 429
+    pauses every caller and halves the effective rate; each success wins a
+    little of it back, so the run settles near the highest rate the account
+    allows. `observe` reads the x-ratelimit-* headers of every response to
+    pause before the server starts rejecting requests.
+    """
+
+    def __init__(
+        self,
+        *,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+    ):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.factor = 1.0
+        self.retries = 0
+        self.throttled = 0
+        self._resume_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _acquire(self, tokens: int) -> None:
+        # The limiter outlives event loops (one asyncio.run per pipeline run),
+        # but a lock is bound to the loop it was first contended on
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        # One waiter at a time keeps callers served in arrival order
+        async with self._lock:
+            while True:
+                wait = self._resume_at - time.monotonic()
+                if self.requests:
+                    wait = max(wait, self.requests.wait_time(1, self.factor))
+                if self.tokens:
+                    wait = max(wait, self.tokens.wait_time(tokens, self.factor))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+
+    def _backoff(self, error: Exception, attempt: int) -> float:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        delay = _retry_after(headers)
+        if delay is None:
+            # Full jitter: spread retries so callers don't stampede together
+            return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return min(delay, self.max_delay) + random.uniform(0, self.base_delay / 2)
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Track the server's view of our remaining budget from response headers."""
+        now = time.monotonic()
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            try:
+                remaining_value = float(remaining)
+            except ValueError:
+                continue
+            if bucket:
+                bucket.cap(remaining_value)
+            if remaining_value <= 0:
+                reset = _parse_duration(headers.get(f"x-ratelimit-reset-{kind}", ""))
+                if reset:
+                    self._resume_at = max(self._resume_at, now + reset)
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], *, tokens: int, stage: str = "llm") -> Any:
+        """Run `fn` within the rate budget, retrying retryable failures.
+
+        `stage` labels the retry counters in the run metrics.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(tokens)
+            try:
+                result = await fn()
+            except _RETRYABLE as e:
+                if getattr(e, "code", None) == "insufficient_quota" or attempt == self.max_retries:
+                    raise
+                delay = self._backoff(e, attempt)
+                if isinstance(e, openai.RateLimitError):
+                    self.throttled += 1
+                    get_metrics().inc("llm_rate_limited_total", stage=stage)
+                    self.factor = max(self.factor / 2, 0.05)
+                    self._resume_at = max(self._resume_at, time.monotonic() + delay)
+                self.retries += 1
+                get_metrics().inc("llm_retries_total", stage=stage)
+                await asyncio.sleep(delay)
+                continue
+            self.factor = min(self.factor + 0.05, 1.0)
+            return result
+
+    def summary(self) -> str:
+        return (
+            f"Rate limiter: {self.retries} retries, {self.throttled} rate-limited responses, "
+            f"rate factor {self.factor:.2f}"
+        )
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def configure_rate_limiter(**kwargs) -> RateLimiter:
+    """Replace the process-wide limiter, e.g. with limits from the CLI."""
+    global _limiter
+    _limiter = RateLimiter(**kwargs)
+    return _limiter
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide limiter, configured from LLM_RPM/LLM_TPM/LLM_MAX_RETRIES."""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(
+            rpm=float(os.getenv("LLM_RPM") or 0) or None,
+            tpm=float(os.getenv("LLM_TPM") or 0) or None,
+            max_retries=int(os.getenv("LLM_MAX_RETRIES") or DEFAULT_MAX_RETRIES),
+        )
+    return _limiter
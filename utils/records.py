@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+from typing import Dict, Mapping
+
+# Optional input column; a truthy value asks for a fully generated email
+PERSONALIZE_COLUMN = "Personalize"
+_TRUTHY = {"1", "true", "yes", "y", "x"}
+
+# Output column for the classification summary (Parquet output and checkpoints; not in the CSV)
+SUMMARY_COLUMN = "Company Summary"
+
+
+def wants_personalization(row: Mapping[str, str]) -> bool:
+    return str(row.get(PERSONALIZE_COLUMN) or "").strip().lower() in _TRUTHY
+
+
+@dataclass(slots=True)
+class SpeakerRecord:
+    """
+    One speaker as it moves through the pipeline, from input row to output.
+
+    Created once from the input row and filled in by each stage
+    (classification, then email), instead of building a new dict per stage.
+    Slots keep it to a fixed set of references, a fraction of the size of
+    the equivalent dicts, which adds up when a run holds 100k rows.
+    """
+
+    name: str
+    title: str
+    company: str
+    personalize: bool = False
+    category: str = ""
+    summary: str = ""
+    subject: str = ""
+    body: str = ""
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, str]) -> "SpeakerRecord":
+        """From an input row (CSV `DictReader` or scraper row)."""
+        return cls(
+            name=(row.get("Speaker Name") or "").strip(),
+            title=(row.get("Speaker Title") or "").strip(),
+            company=(row.get("Speaker Company") or "").strip(),
+            personalize=wants_personalization(row),
+        )
+
+    @classmethod
+    def from_output(cls, record: Mapping[str, str]) -> "SpeakerRecord":
+        """From an output record, e.g. a checkpointed row or a line of a previous output file."""
+        return cls(
+            name=record.get("Speaker Name") or "",
+            title=record.get("Speaker Title") or "",
+            company=record.get("Speaker Company") or "",
+            category=record.get("Company Category") or "",
+            summary=record.get(SUMMARY_COLUMN) or "",
+            subject=record.get("Email Subject") or "",
+            body=record.get("Email Body") or "",
+        )
+
+    def input_row(self) -> Dict[str, str]:
+        row = {"Speaker Name": self.name, "Speaker Title": self.title, "Speaker Company": self.company}
+        if self.personalize:
+            row[PERSONALIZE_COLUMN] = "yes"
+        return row
+
+    def as_output(self) -> Dict[str, str]:
+        """Output columns, including the summary; the CSV writer drops what it doesn't use."""
+        return {
+            "Speaker Name": self.name,
+            "Speaker Title": self.title,
+            "Speaker Company": self.company,
+            "Company Category": self.category,
+            SUMMARY_COLUMN: self.summary,
+            "Email Subject": self.subject,
+            "Email Body": self.body,
+        }
@@ -1,19 +1,124 @@
-import re
+import os
 import json
+import time
+from typing import Any, Dict, Optional
+from utils.metrics import get_metrics
+
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib decoder gives the same results
+    orjson = None
+
+_FENCE = "```"
+
+
+def loads(text: str) -> Any:
+    """Strict JSON decode, with orjson when it is installed. Raises ValueError."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _strip_fences(text: str) -> Optional[str]:
+    """Contents of the first ```/```json block, or None if there is no fence."""
+    start = text.find(_FENCE)
+    if start < 0:
+        return None
+    # Skip the info string ("json") on the opening fence line
+    newline = text.find("\n", start)
+    body_start = newline + 1 if newline >= 0 else start + len(_FENCE)
+    end = text.find(_FENCE, body_start)
+    return text[body_start:end if end >= 0 else len(text)].strip()
+
+
+_scanner = json.JSONDecoder()
+
+
+def _first_object(text: str) -> Optional[Any]:
+    """First `{...}` in `text` that decodes on its own, ignoring anything around it."""
+    start = text.find("{")
+    while start >= 0:
+        try:
+            return _scanner.raw_decode(text, start)[0]
+        except ValueError:
+            start = text.find("{", start + 1)
+    return None
+
+
+def _decode(content: str) -> tuple:
+    # Only a reply that starts like JSON is worth a strict attempt; a failed
+    # decode costs more than the check
+    if content[:1] in ("{", "["):
+        try:
+            return loads(content), "strict"
+        except ValueError:
+            pass
+    fenced = _strip_fences(content)
+    data = None
+    if fenced is not None:
+        try:
+            return loads(fenced), "fenced"
+        except ValueError:
+            data = _first_object(fenced)
+    if data is None:
+        # The fence may hold something else (code, or prose when the JSON
+        # shares the fence's opening line); look at the whole reply too
+        data = _first_object(content)
+    return data, "failed" if data is None else "scanned"
+
+
+def decode_json(content: Any) -> Optional[Any]:
+    """
+    Decode an LLM response into JSON, or return None if there is none.
+
+    Tries a strict decode of the whole response first, which succeeds for
+    every well-formed reply (always the case with structured outputs), so
+    the common path costs one `loads` and no copies. Only then does it strip
+    a markdown code fence and, failing that, scan for the first `{...}`
+    object that decodes on its own, inside the fence and then across the
+    whole response, so prose before or after the JSON is ignored. Already-decoded dicts and lists are returned unchanged. How
+    each response was decoded is counted as `json_decode_total{result=...}`.
+    """
+    if isinstance(content, (dict, list)):
+        return content
+    if not isinstance(content, str):
+        return None
+    started = time.perf_counter()
+    data, how = _decode(content.strip())
+    metrics = get_metrics()
+    metrics.observe("json_decode", time.perf_counter() - started)
+    metrics.inc("json_decode_total", result=how)
+    return data
+
 
 def safe_parse_json(content):
-    # If classifier already returned a dict/list, return it directly
-    
+    """
+    Decode a classification-style JSON object.
+
+    Anything that doesn't decode to an object becomes a placeholder
+    classification whose summary is the raw content.
+    """
+    data = decode_json(content)
+    if isinstance(data, dict):
+        return data
     if isinstance(content, (dict, list)):
         return content
-    if isinstance(content, str):
-        # Extract inner JSON block if model wrapped it in markdown
-        cleaned = re.sub(r"```(?:json)?", "", content).strip("` \n")
-        match = re.search(r"\{[\s\S]*\}", cleaned)
-        if match:
-            try:
-                return json.loads(match.group())
-            except json.JSONDecodeError:
-                pass
-        return {"summary": content, "category": "Other", "exclusion": "none"}
-    return {"summary": str(content), "category": "Other", "exclusion": "none"}
\ No newline at end of file
+    return {"summary": str(content), "category": "Other", "exclusion": "none"}
+
+
+def structured_outputs_enabled() -> bool:
+    return (os.getenv("LLM_STRUCTURED_OUTPUTS") or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def response_format(name: str, schema: Dict[str, Any], *, default: Optional[dict] = None) -> Optional[dict]:
+    """
+    `response_format` for a request whose reply should match `schema`.
+
+    With LLM_STRUCTURED_OUTPUTS set, asks for the provider's strict
+    json_schema mode, so replies are guaranteed to decode on the fast path;
+    otherwise returns `default` (e.g. plain JSON mode, or None for no
+    constraint).
+    """
+    if structured_outputs_enabled():
+        return {"type": "json_schema", "json_schema": {"name": name, "schema": schema, "strict": True}}
+    return default
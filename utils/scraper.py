@@ -2,61 +2,247 @@ import asyncio
 import argparse
 import csv
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Callable, List, Dict, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
 import aiohttp
 from aiohttp.client_exceptions import ClientConnectorCertificateError
 from bs4 import BeautifulSoup
+from utils.http_cache import HttpCache
+from utils.html_backends import get_backend
 
+DEFAULT_SPEAKERS_URL = "https://www.digitalconstructionweek.com/all-speakers/"
+DEFAULT_MAX_PAGES = 50
+DEFAULT_LIMIT_PER_HOST = 4
+SPEAKER_CSV_HEADERS = ["Speaker Name", "Speaker Title", "Speaker Company"]
 
-async def fetch_html(url: str, session: aiohttp.ClientSession, *, timeout: int = 30) -> str:
-    async with session.get(url, timeout=timeout) as resp:
+
+async def fetch_html(
+    url: str,
+    session: aiohttp.ClientSession,
+    *,
+    timeout: int = 30,
+    cache: Optional[HttpCache] = None,
+    insecure: bool = False,
+) -> str:
+    """
+    GET a page and return its text.
+
+    With `cache`, the request carries If-None-Match / If-Modified-Since from
+    the cached copy and a 304 returns the cached body. `insecure` skips SSL
+    verification for this request only.
+    """
+    entry = cache.get(url) if cache else None
+    headers = cache.conditional_headers(entry) if cache else {}
+    kwargs = {"ssl": False} if insecure else {}
+    async with session.get(
+        url, timeout=aiohttp.ClientTimeout(total=timeout), headers=headers, **kwargs
+    ) as resp:
+        if resp.status == 304 and entry:
+            cache.revalidated += 1
+            return entry["body"]
         resp.raise_for_status()
-        return await resp.text()
+        text = await resp.text()
+        if cache:
+            cache.fetched += 1
+            cache.put(url, text, resp.headers)
+        return text
 
 
 def _extract_text(el) -> str:
     return " ".join(el.get_text(" ", strip=True).split()) if el else ""
 
 
-def _parse_speakers_dc_week(html: str) -> List[Dict[str, str]]:
+# Fallback card selectors, in the order their matches are collected:
+# ".speaker-card", ".presenter-card", ".speaker", ".presenter", "article",
+# "li", "div[class*='speaker']", "div[class*='presenter']"
+_CARD_SELECTOR_COUNT = 8
+
+_NAME_CLASSES = frozenset({"speaker-name", "presenter-name", "name"})
+_TITLE_CLASSES = frozenset({"speaker-title", "presenter-title", "title"})
+_COMPANY_CLASSES = frozenset({"speaker-company", "presenter-company", "company"})
+# Containers whose links count as pagination (".pagination a[href]", ...)
+_PAGER_CLASSES = frozenset({"pagination", "nav-links", "pager"})
+
+
+def _card_selectors(tag: str, classes: List[str]) -> List[int]:
+    """Indices of the fallback card selectors this element matches."""
+    matched = []
+    if "speaker-card" in classes:
+        matched.append(0)
+    if "presenter-card" in classes:
+        matched.append(1)
+    if "speaker" in classes:
+        matched.append(2)
+    if "presenter" in classes:
+        matched.append(3)
+    if tag == "article":
+        matched.append(4)
+    elif tag == "li":
+        matched.append(5)
+    elif tag == "div" and classes:
+        class_attr = " ".join(classes)
+        if "speaker" in class_attr:
+            matched.append(6)
+        if "presenter" in class_attr:
+            matched.append(7)
+    return matched
+
+
+class _Card:
+    """First descendant of a candidate card for each field the parser reads."""
+
+    __slots__ = ("name", "title", "company", "link", "grid_name", "h3", "img", "job_p", "job")
+
+    def __init__(self):
+        self.name = self.title = self.company = self.link = None
+        self.grid_name = self.h3 = self.img = self.job_p = self.job = None
+
+
+class _PageScan:
+    """Everything the speaker parsers need from one walk over a page."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.grid: List[_Card] = []
+        self.cards: List[List[_Card]] = [[] for _ in range(_CARD_SELECTOR_COUNT)]
+        self.pagination: List[str] = []
+
+    def text(self, el) -> str:
+        return self.backend.text(el) if el is not None else ""
+
+
+# Stack marker for the end of a grid card's subtree
+_CARD_END = object()
+
+
+def _scan_page(
+    html: str,
+    backend=None,
+    *,
+    on_grid_card: Optional[Callable[[_PageScan, _Card], None]] = None,
+) -> _PageScan:
     """
-    Parse Digital Construction Week speakers page.
+    Walk the document once, collecting speaker cards and pagination links.
 
-    The site may change; this parser tries a few reasonable selectors.
-    Returns list of dicts with keys: name, title, company.
+    Each card records the first descendant matching each field selector
+    (the same element `select_one` would return), so no subtree is searched
+    twice. Cards are filed per fallback selector in document order, which
+    is the order the selector-by-selector parser saw them in.
+
+    `on_grid_card` is called with each grid card as soon as its subtree has
+    been walked, before the rest of the page is parsed.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    backend = backend or get_backend()
+    scan = _PageScan(backend)
+    # (element, inside .speaker-grid-details, inside a pager container, open ancestor cards)
+    stack = [(el, False, False, ()) for el in reversed(backend.parse(html))]
+    while stack:
+        el, in_details, in_pager, open_cards = stack.pop()
+        if el is _CARD_END:
+            on_grid_card(scan, open_cards[-1])
+            continue
+        tag = backend.tag(el)
+        classes = backend.classes(el)
+
+        href = backend.get(el, "href") if tag == "a" else None
+        if tag == "a" and (
+            (href is not None and (in_pager or "page-numbers" in classes or "next" in classes))
+            or "next" in (backend.get(el, "rel") or "").split()
+        ):
+            scan.pagination.append(href or "")
+
+        if open_cards:
+            is_name = (
+                tag in ("h3", "h2")
+                or not _NAME_CLASSES.isdisjoint(classes)
+                or backend.get(el, "itemprop") == "name"
+            )
+            is_title = not _TITLE_CLASSES.isdisjoint(classes) or backend.get(el, "itemprop") == "jobTitle"
+            is_company = not _COMPANY_CLASSES.isdisjoint(classes) or backend.get(el, "itemprop") in (
+                "affiliation",
+                "worksFor",
+            )
+            is_job = "speaker-job" in classes
+            for card in open_cards:
+                if is_name and card.name is None:
+                    card.name = el
+                if is_title and card.title is None:
+                    card.title = el
+                if is_company and card.company is None:
+                    card.company = el
+                if href is not None and card.link is None:
+                    card.link = href
+                if tag == "h3":
+                    if card.h3 is None:
+                        card.h3 = el
+                    if in_details and card.grid_name is None:
+                        card.grid_name = el
+                elif tag == "img" and card.img is None:
+                    card.img = el
+                if is_job:
+                    if card.job is None:
+                        card.job = el
+                    if tag == "p" and card.job_p is None:
+                        card.job_p = el
+
+        selectors = _card_selectors(tag, classes)
+        is_grid = "speaker-grid-item" in classes
+        if selectors or is_grid:
+            card = _Card()
+            open_cards = open_cards + (card,)
+            if is_grid:
+                scan.grid.append(card)
+                if on_grid_card:
+                    stack.append((_CARD_END, False, False, open_cards))
+            for index in selectors:
+                scan.cards[index].append(card)
+
+        child_details = in_details or "speaker-grid-details" in classes
+        child_pager = in_pager or not _PAGER_CLASSES.isdisjoint(classes)
+        stack.extend(
+            (child, child_details, child_pager, open_cards) for child in reversed(backend.children(el))
+        )
+    return scan
+
+
+def _grid_speaker(scan: _PageScan, card: _Card) -> Optional[Dict[str, str]]:
+    """Speaker from a DCW grid card, or None if the card has no name."""
+    # Name: usually in h3 or fallback to image alt
+    name = scan.text(card.grid_name if card.grid_name is not None else card.h3)
+    if not name:
+        name = (scan.backend.get(card.img, "alt") or "").strip() if card.img is not None else ""
+
+    job_text = scan.text(card.job_p if card.job_p is not None else card.job)
+
+    title_text = job_text
+    company_text = ""
+    if job_text:
+        # Split on the last ' at ' to avoid splitting role names that contain 'at'
+        lower = job_text.lower()
+        idx = lower.rfind(' at ')
+        if idx != -1:
+            title_text = job_text[:idx].strip(' ,')
+            company_text = job_text[idx + 4 :].strip(' ,')
+
+    if not name:
+        return None
+    return {
+        'name': name,
+        'title': title_text,
+        'company': company_text,
+        'url': card.link or '',
+    }
+
+
+def _speakers_from_scan(scan: _PageScan) -> List[Dict[str, str]]:
     results: List[Dict[str, str]] = []
 
     # Prefer the current DCW grid structure if present
-    grid_items = soup.select('.speaker-grid-item')
-    results: List[Dict[str, str]] = []
-    if grid_items:
-        for card in grid_items:
-            # Name: usually in h3 or fallback to image alt
-            name = _extract_text(card.select_one('.speaker-grid-details h3') or card.select_one('h3'))
-            if not name:
-                alt = card.select_one('img')
-                name = (alt.get('alt', '').strip() if alt else '')
-
-            job_text = _extract_text(card.select_one('p.speaker-job') or card.select_one('.speaker-job'))
-
-            title_text = job_text
-            company_text = ""
-            if job_text:
-                # Split on the last ' at ' to avoid splitting role names that contain 'at'
-                lower = job_text.lower()
-                idx = lower.rfind(' at ')
-                if idx != -1:
-                    title_text = job_text[:idx].strip(' ,')
-                    company_text = job_text[idx + 4 :].strip(' ,')
-
-            if name:
-                results.append({
-                    'name': name,
-                    'title': title_text,
-                    'company': company_text,
-                })
+    if scan.grid:
+        for card in scan.grid:
+            speaker = _grid_speaker(scan, card)
+            if speaker:
+                results.append(speaker)
 
         # Deduplicate by name+company
         uniq = {}
@@ -64,35 +250,13 @@ def _parse_speakers_dc_week(html: str) -> List[Dict[str, str]]:
             uniq[(r['name'], r['company'].lower())] = r
         return list(uniq.values())
 
-    # Common patterns to try (fallbacks included) when grid structure not found
-    card_selectors = [
-        ".speaker-card",  
-        ".presenter-card",
-        ".speaker",
-        ".presenter",
-        "article",  # generic containers
-        "li",
-        "div[class*='speaker']",
-        "div[class*='presenter']",
-    ]
+    # Fallback patterns when grid structure not found, one selector at a time
     seen = set()
-    for sel in card_selectors:
-        for card in soup.select(sel):
-            # Heuristics for name
-            name = _extract_text(
-                card.select_one(".speaker-name, .presenter-name, h3, h2, .name, [itemprop='name']")
-            )
-            # Heuristics for title/company block
-            title_text = _extract_text(
-                card.select_one(
-                    ".speaker-title, .presenter-title, .title, [itemprop='jobTitle']"
-                )
-            )
-            company_text = _extract_text(
-                card.select_one(
-                    ".speaker-company, .presenter-company, .company, [itemprop='affiliation'], [itemprop='worksFor']"
-                )
-            )
+    for cards in scan.cards:
+        for card in cards:
+            name = scan.text(card.name)
+            title_text = scan.text(card.title)
+            company_text = scan.text(card.company)
 
             # Some sites use a single block like "Title, Company"
             if not company_text and "," in title_text:
@@ -105,7 +269,12 @@ def _parse_speakers_dc_week(html: str) -> List[Dict[str, str]]:
             if not name or key in seen:
                 continue
             seen.add(key)
-            results.append({"name": name, "title": title_text, "company": company_text})
+            results.append({
+                "name": name,
+                "title": title_text,
+                "company": company_text,
+                "url": card.link or "",
+            })
 
     # Deduplicate by name+company fallback
     if results:
@@ -118,6 +287,277 @@ def _parse_speakers_dc_week(html: str) -> List[Dict[str, str]]:
     return results
 
 
+def _pagination_from_scan(scan: _PageScan, base_url: str) -> List[str]:
+    host = urlparse(base_url).netloc
+    links: List[str] = []
+    for href in scan.pagination:
+        href = urljoin(base_url, href).split("#", 1)[0]
+        if urlparse(href).netloc == host and href not in links:
+            links.append(href)
+    return links
+
+
+def _parse_speakers_dc_week(html: str, backend=None) -> List[Dict[str, str]]:
+    """
+    Parse Digital Construction Week speakers page.
+
+    The site may change; this parser tries a few reasonable selectors.
+    Returns list of dicts with keys: name, title, company, url (the card's
+    first link, possibly relative, or '').
+
+    `backend` is an HTML backend from utils.html_backends (default: the
+    fastest installed one, see SCRAPER_PARSER).
+    """
+    return _speakers_from_scan(_scan_page(html, backend))
+
+
+def _parse_pagination_links(html: str, base_url: str, backend=None) -> List[str]:
+    """Absolute URLs of other listing pages on the same host, in document order."""
+    return _pagination_from_scan(_scan_page(html, backend), base_url)
+
+
+def _parse_speaker_detail(html: str) -> Dict[str, str]:
+    """Title and company from a speaker's own page (empty strings if not found)."""
+    soup = BeautifulSoup(html, "html.parser")
+    title = _extract_text(
+        soup.select_one(".speaker-title, .presenter-title, [itemprop='jobTitle'], .job-title")
+    )
+    company = _extract_text(
+        soup.select_one(
+            ".speaker-company, .presenter-company, [itemprop='worksFor'], [itemprop='affiliation'], .company"
+        )
+    )
+    job_text = _extract_text(soup.select_one("p.speaker-job, .speaker-job"))
+    if job_text and not (title and company):
+        idx = job_text.lower().rfind(" at ")
+        if idx != -1:
+            title = title or job_text[:idx].strip(" ,")
+            company = company or job_text[idx + 4 :].strip(" ,")
+        else:
+            title = title or job_text
+    return {"title": title, "company": company}
+
+
+def make_session(
+    *, insecure: bool = False, limit_per_host: int = DEFAULT_LIMIT_PER_HOST
+) -> aiohttp.ClientSession:
+    """One pooled session for a whole crawl, with a per-host connection limit."""
+    connector = aiohttp.TCPConnector(limit_per_host=limit_per_host, ssl=not insecure)
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def iter_speakers(
+    start_url: str,
+    session: aiohttp.ClientSession,
+    *,
+    cache: Optional[HttpCache] = None,
+    crawl: bool = True,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    follow_details: bool = False,
+    insecure: bool = False,
+) -> AsyncIterator[Tuple[Tuple[int, int], Dict[str, str]]]:
+    """
+    Scrape a speaker listing, yielding (position, speaker) as soon as each
+    speaker is parsed. `position` is (page_number, index on the page), so
+    sorting by it restores page and document order.
+
+    Pages are parsed in a worker thread, so the event loop (and anything
+    consuming this generator, such as LLM calls for earlier speakers) keeps
+    running while a large page is parsed. Grid-layout cards are yielded
+    while the rest of their page is still being parsed; pages that need the
+    fallback selectors are yielded once the page is done.
+
+    With `crawl`, pagination links are followed up to `max_pages` pages,
+    and discovered pages are fetched concurrently over `session` (its
+    connector bounds the connections per host). With `follow_details`,
+    speakers missing a title or company have their detail page fetched to
+    fill the gaps. Page numbers follow discovery order and speakers arrive
+    in completion order. A speaker listed more than once (same name and
+    company) is yielded once, with its first entry.
+    """
+    loop = asyncio.get_running_loop()
+    # (kind, page url, value) from page loads, parse threads and detail fetches
+    events: asyncio.Queue = asyncio.Queue()
+    page_numbers: Dict[str, int] = {start_url: 0}
+    page_counts: Dict[str, int] = {}
+    tasks: Set[asyncio.Task] = set()
+    seen: Set[Tuple[str, str]] = set()
+    state = {"insecure": insecure}
+
+    async def fetch(url: str) -> str:
+        try:
+            return await fetch_html(url, session, cache=cache, insecure=state["insecure"])
+        except ClientConnectorCertificateError:
+            # Same fallback as scrape_speakers, remembered for the rest of the crawl
+            state["insecure"] = True
+            return await fetch_html(url, session, cache=cache, insecure=True)
+
+    def parse(url: str, html: str) -> None:
+        # Runs in a worker thread; hands results back to the event loop
+        def publish(kind: str, value) -> None:
+            loop.call_soon_threadsafe(events.put_nowait, (kind, url, value))
+
+        def grid_card(scan: _PageScan, card: _Card) -> None:
+            speaker = _grid_speaker(scan, card)
+            if speaker:
+                publish("speaker", speaker)
+
+        scan = _scan_page(html, on_grid_card=grid_card)
+        if not scan.grid:
+            for speaker in _speakers_from_scan(scan):
+                publish("speaker", speaker)
+        if crawl:
+            publish("links", _pagination_from_scan(scan, url))
+
+    async def load_page(url: str) -> None:
+        try:
+            await asyncio.to_thread(parse, url, await fetch(url))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Could not fetch {url}: {e}")
+        except Exception as e:
+            events.put_nowait(("error", url, e))
+        finally:
+            events.put_nowait(("done", url, None))
+
+    async def fill_from_detail(page_url: str, position: Tuple[int, int], speaker: Dict[str, str]) -> None:
+        try:
+            detail = _parse_speaker_detail(await fetch(urljoin(page_url, speaker["url"])))
+            speaker["title"] = speaker["title"] or detail["title"]
+            speaker["company"] = speaker["company"] or detail["company"]
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Could not fetch speaker page {speaker['url']}: {e}")
+        except Exception as e:
+            events.put_nowait(("error", page_url, e))
+        finally:
+            events.put_nowait(("detail", page_url, (position, speaker)))
+            events.put_nowait(("done", page_url, None))
+
+    def start(coro) -> None:
+        task = asyncio.create_task(coro)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    outstanding = 1
+    start(load_page(start_url))
+    try:
+        while outstanding:
+            kind, url, value = await events.get()
+            if kind == "done":
+                outstanding -= 1
+            elif kind == "error":
+                raise value
+            elif kind == "links":
+                for link in value:
+                    if link not in page_numbers and len(page_numbers) < max_pages:
+                        page_numbers[link] = len(page_numbers)
+                        outstanding += 1
+                        start(load_page(link))
+            elif kind == "speaker":
+                key = (value["name"], value.get("company", "").lower())
+                if key in seen:
+                    continue
+                seen.add(key)
+                position = (page_numbers[url], page_counts.get(url, 0))
+                page_counts[url] = position[1] + 1
+                if follow_details and value.get("url") and not (value["title"] and value["company"]):
+                    outstanding += 1
+                    start(fill_from_detail(url, position, value))
+                else:
+                    yield position, value
+            elif kind == "detail":
+                yield value
+    finally:
+        for task in list(tasks):
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def crawl_speakers(
+    start_url: str,
+    *,
+    session: Optional[aiohttp.ClientSession] = None,
+    cache: Optional[HttpCache] = None,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    follow_details: bool = False,
+    insecure: bool = False,
+    limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+) -> List[Dict[str, str]]:
+    """
+    Crawl every page of a speaker listing and return speakers in page order.
+
+    See `iter_speakers`; this collects its output and orders it by page so
+    the result is deterministic.
+    """
+    owns_session = session is None
+    if session is None:
+        session = make_session(insecure=insecure, limit_per_host=limit_per_host)
+    try:
+        found: List[Tuple[Tuple[int, int], Dict[str, str]]] = [
+            item
+            async for item in iter_speakers(
+                start_url,
+                session,
+                cache=cache,
+                max_pages=max_pages,
+                follow_details=follow_details,
+                insecure=insecure,
+            )
+        ]
+        found.sort(key=lambda item: item[0])
+        return [speaker for _position, speaker in found]
+    finally:
+        if owns_session:
+            await session.close()
+
+
+async def iter_speaker_rows(
+    url: str = DEFAULT_SPEAKERS_URL,
+    *,
+    crawl: bool = False,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    follow_details: bool = False,
+    insecure: bool = False,
+    http_cache: Optional[HttpCache] = None,
+    save_to: Optional[Path] = None,
+) -> AsyncIterator[Dict[str, str]]:
+    """
+    Stream scraped speakers as input rows ("Speaker Name", "Speaker Title",
+    "Speaker Company") as they are parsed, for feeding `run_pipeline`
+    directly. Options are as for `scrape_dcw_speakers`.
+
+    With `save_to`, each row is also appended to that CSV as it is yielded
+    (the same format `write_speakers_csv` writes, in scrape order).
+    """
+    session = make_session(insecure=insecure)
+    speakers = iter_speakers(
+        url,
+        session,
+        cache=http_cache,
+        crawl=crawl,
+        max_pages=max_pages,
+        follow_details=follow_details,
+        insecure=insecure,
+    )
+    out = None
+    try:
+        if save_to:
+            _ensure_parent(save_to)
+            out = save_to.open("w", newline="", encoding="utf-8")
+            writer = csv.DictWriter(out, fieldnames=SPEAKER_CSV_HEADERS)
+            writer.writeheader()
+        async for _position, speaker in speakers:
+            row = to_speaker_row(speaker)
+            if out:
+                writer.writerow(row)
+            yield row
+    finally:
+        # Stop in-flight fetches before the session they use is closed
+        await speakers.aclose()
+        if out:
+            out.close()
+        await session.close()
+
+
 async def scrape_speakers(
     url: str,
     session: Optional[aiohttp.ClientSession] = None,
@@ -130,29 +570,37 @@ async def scrape_speakers(
     """
     owns_session = False
     if session is None:
-        connector = aiohttp.TCPConnector(ssl=not insecure) if insecure else None
-        session = aiohttp.ClientSession(connector=connector)
+        session = make_session(insecure=insecure)
         owns_session = True
     try:
         try:
-            html = await fetch_html(url, session)
+            html = await fetch_html(url, session, insecure=insecure)
         except ClientConnectorCertificateError:
             # Automatic fallback: if SSL verification fails, retry with ssl disabled
-            fallback = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False))
-            try:
-                html = await fetch_html(url, fallback)
-            finally:
-                await fallback.close()
+            html = await fetch_html(url, session, insecure=True)
         return _parse_speakers_dc_week(html)
     finally:
         if owns_session:
             await session.close()
 
 
+def to_speaker_row(r: Dict[str, str]) -> Dict[str, str]:
+    """Map a parsed speaker (name/title/company) to the input CSV columns."""
+    return {
+        "Speaker Name": r.get("name", "").strip(),
+        "Speaker Title": r.get("title", "").strip(),
+        "Speaker Company": r.get("company", "").strip(),
+    }
+
+
 async def scrape_dcw_speakers(
-    url: str = "https://www.digitalconstructionweek.com/all-speakers/",
+    url: str = DEFAULT_SPEAKERS_URL,
     *,
     insecure: bool = False,
+    crawl: bool = False,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    follow_details: bool = False,
+    http_cache: Optional[HttpCache] = None,
 ) -> List[Dict[str, str]]:
     """
     Scrape the Digital Construction Week speakers page and return a list of
@@ -162,19 +610,22 @@ async def scrape_dcw_speakers(
     - "Speaker Title"
     - "Speaker Company"
 
-    This function targets a single page and does not paginate.
-    """
-    base = await scrape_speakers(url, insecure=insecure)
-    normalized: List[Dict[str, str]] = []
-    for r in base:
-        normalized.append(
-            {
-                "Speaker Name": r.get("name", "").strip(),
-                "Speaker Title": r.get("title", "").strip(),
-                "Speaker Company": r.get("company", "").strip(),
-            }
+    By default this targets a single page and does not paginate. With
+    `crawl=True` it follows pagination (and, with `follow_details`, speaker
+    detail pages) via `crawl_speakers`, revalidating pages held in
+    `http_cache` instead of downloading them again.
+    """
+    if crawl:
+        base = await crawl_speakers(
+            url,
+            cache=http_cache,
+            max_pages=max_pages,
+            follow_details=follow_details,
+            insecure=insecure,
         )
-    return normalized
+    else:
+        base = await scrape_speakers(url, insecure=insecure)
+    return [to_speaker_row(r) for r in base]
 
 
 def _ensure_parent(path: Path) -> None:
@@ -183,10 +634,9 @@ def _ensure_parent(path: Path) -> None:
 
 def write_speakers_csv(rows: List[Dict[str, str]], out_path: Path) -> None:
     """Write speaker rows to CSV with required headers."""
-    headers = ["Speaker Name", "Speaker Title", "Speaker Company"]
     _ensure_parent(out_path)
     with out_path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
+        writer = csv.DictWriter(f, fieldnames=SPEAKER_CSV_HEADERS)
         writer.writeheader()
         for r in rows:
             writer.writerow({
@@ -201,7 +651,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--url",
         type=str,
-        default="https://www.digitalconstructionweek.com/all-speakers/",
+        default=DEFAULT_SPEAKERS_URL,
         help="Speakers page URL to scrape",
     )
     parser.add_argument(
@@ -211,6 +661,18 @@ def parse_args() -> argparse.Namespace:
         help="Output CSV path (default: <repo>/dd_gtm_ai_eng_exercise/in/speakers.csv)",
     )
     parser.add_argument("--insecure", action="store_true", help="Skip SSL verification for scraping")
+    parser.add_argument("--crawl", action="store_true", help="Follow pagination links across listing pages")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES, help="Page limit for --crawl")
+    parser.add_argument(
+        "--details",
+        action="store_true",
+        help="With --crawl, fetch speaker detail pages to fill in missing titles/companies",
+    )
+    parser.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="With --crawl, don't use the on-disk HTTP cache (.cache/http)",
+    )
     args = parser.parse_args()
     if args.out is None:
         # Default relative to this file's directory to avoid CWD confusion
@@ -220,9 +682,21 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> None:
     args = parse_args()
-    rows: List[Dict[str, str]] = asyncio.run(scrape_dcw_speakers(args.url, insecure=args.insecure))
+    http_cache = None if args.no_http_cache else HttpCache()
+    rows: List[Dict[str, str]] = asyncio.run(
+        scrape_dcw_speakers(
+            args.url,
+            insecure=args.insecure,
+            crawl=args.crawl,
+            max_pages=args.max_pages,
+            follow_details=args.details,
+            http_cache=http_cache,
+        )
+    )
     write_speakers_csv(rows, args.out)
     print(f"Wrote {len(rows)} speakers to {args.out}")
+    if args.crawl and http_cache:
+        print(http_cache.summary())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils.normalize import normalize_company
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent async calls that share a key.
+
+    The first caller for a key runs the call; callers that arrive while it is
+    in flight await the same future instead of starting their own. With
+    `memoize=True` successful results are also kept for the rest of the run,
+    so later callers are answered without another call. Failures are never
+    memoized.
+
+    Keys are derived with `normalizer` (company-name normalization by
+    default), so spelling variants share one call. `saved` counts the calls
+    that were avoided.
+    """
+
+    def __init__(
+        self,
+        normalizer: Callable[[str], str] = normalize_company,
+        *,
+        memoize: bool = True,
+    ):
+        self.normalizer = normalizer
+        self.memoize = memoize
+        self.calls = 0
+        self.saved = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._results: Dict[str, Any] = {}
+
+    async def do(self, name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        key = self.normalizer(name)
+        if not key:
+            # Nothing to coalesce on; always make the call
+            self.calls += 1
+            return await fn()
+        if key in self._results:
+            self.saved += 1
+            return self._results[key]
+        future: Optional[asyncio.Future] = self._inflight.get(key)
+        if future is not None:
+            self.saved += 1
+            # Shield so one cancelled waiter doesn't cancel the shared call
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.calls += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure isn't logged as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if self.memoize:
+                self._results[key] = result
+            return result
+        finally:
+            self._inflight.pop(key, None)